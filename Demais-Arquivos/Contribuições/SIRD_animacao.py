@@ -1,8 +1,21 @@
+import base64
+import io
+import sys
+import tempfile
+import time
+from pathlib import Path
+
 import numpy as np
-import matplotlib.pyplot as plt
-from scipy.integrate import odeint
 import streamlit as st
-import time
+from matplotlib import animation
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from PIL import Image
+
+#Permite importar o núcleo de simulação e a exportação localizados na raiz do repositório
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from simulacao import simular_em_cache
+from exportacao import cache_exportacoes
 
 # Configuração da página
 st.set_page_config(page_title='Modelo SIR de Epidemias', layout='wide')
@@ -26,60 +39,112 @@ with st.sidebar:
     gamma = st.slider('Taxa de recuperação (γ)', 0.0, 1.0, 0.1, 0.01)
     mi = st.slider('Taxa de mortalidade (μ)', 0.0, 0.5, 0.01, 0.01)
     dias = st.slider('Dias de simulação', 1, 360, 160, 1)
-    
-# Período de tempo para simulação
-t = np.linspace(0, dias, dias)
-
-def modelo_sir(vetor, t):   
-    S, I, R, D = vetor
-    #Aqui definimos a função que fará os cálculos a partir dos dados imputados pelo usuário. O vetor de transmissão
-    #é definido por três componentes, S, I e R respectivamente, que correspondem ao número de indivíduos sucetíveis a 
-    #infecção (S), indivíduos infectados (I) e indivíduos recuperados, agora imunes à doença em questão (R)
-
-    dotS = -beta * S * I / N
-    #Aqui temos a primeira equação diferencial, em que se calcula a derivada de S em relação ao tempo, ou seja,
-    #quantas pessoas deixam de ser sucetíveis a infecção ao longo do tempo, logo, a fórmula representa os novos 
-    #infectados. Beta representa a taxa de transmissão, e , nessa equação, está negativo pois o número de sucetíveis
-    #está diminuindo. N é a população total
-
-    dotI = beta * S * I / N - gamma * I - mi * I # -> ADICIONAR COMENTÁRIOS SOBRE -mi * I
-    #Aqui temos a segunda equação diferencial, em que se calcula a derivada de I, ou seja, como o número de
-    #infectados muda com o tempo. O primeiro termo (beta * S * I / N) calcula o número de indivíduos sendo infectados.
-    #Já o segundo termo (-gamma * I) calcula o número de pessoas se recuperando, ou seja, saindo do grupo dos 
-    #infecados. Gamma é a taxa de recuperação.
 
-    dotR = gamma * I
-    #Aqui temos a terceira equação diferencial, em que se calcula a derivada de R, ou seja, quantas pessoas se
-    #recuperam por unidade de tempo. Isso implica que R é proporcional a I.
+    st.header('Animação')
+    fps = st.slider('Quadros por segundo', 1, 60, 20, 1)
+    dias_por_quadro = st.slider('Dias por quadro', 1, 10, 2, 1)
 
-    dotD = mi * I
-    # ADICIONAR COMENTÁRIOS
-
-    return np.array([dotS, dotI, dotR, dotD])
+# A trajetória é integrada uma única vez (e reaproveitada do cache nas reexecuções);
+# a animação apenas revela partes dela
+t, resultado = simular_em_cache('SIRD', dias, N=N, I0=I0, beta=beta, gamma=gamma, mu=mi)
+S, I, R, D = resultado.T
 
-# Condições iniciais
-v_inicial = [S0, I0, R0, D0]
+# Rótulo e cor de cada compartimento, na ordem das colunas do resultado
+CURVAS = (('Suscetíveis', 'b'), ('Infectados', 'r'), ('Recuperados', 'g'), ('Falecidos', 'y'))
+
+# Dias exibidos em cada quadro da animação; o último dia sempre aparece
+quadros = list(range(0, len(t), dias_por_quadro))
+if quadros[-1] != len(t) - 1:
+    quadros.append(len(t) - 1)
+
+
+def criar_figura(dpi=100):
+    """Cria a figura da animação uma única vez, com eixos fixos e uma linha vazia por compartimento.
+    Retorna a figura e os artistas que são atualizados a cada quadro"""
+    #A figura não passa pelo pyplot, então não fica registrada no processo do servidor
+    fig = Figure(figsize=(10, 6), dpi=dpi)
+    FigureCanvasAgg(fig)
+    ax = fig.subplots()
+    linhas = [ax.plot([], [], cor, label=rotulo)[0] for rotulo, cor in CURVAS]
+    rotulo_dia = ax.text(0.02, 0.95, '', transform=ax.transAxes)
+
+    ax.set_xlim(0, t[-1])
+    ax.set_ylim(0, resultado.max() * 1.05)
+    ax.set_title('Evolução da Epidemia - Modelo SIR')
+    ax.set_xlabel('Dias')
+    ax.set_ylabel('Número de Indivíduos')
+    ax.legend(loc='upper right')
+    ax.grid(True)
+    return fig, [*linhas, rotulo_dia]
+
+
+def atualizar(dia, artistas):
+    """Revela a trajetória até o dia informado trocando apenas os dados das linhas já existentes"""
+    *linhas, rotulo_dia = artistas
+    for linha, valores in zip(linhas, resultado.T):
+        linha.set_data(t[:dia + 1], valores[:dia + 1])
+    rotulo_dia.set_text(f'Dia {int(t[dia])}')
+    return artistas
+
+
+def renderizar_quadros(dpi=100):
+    """Gera as imagens RGB dos quadros com blitting: o fundo (eixos, grade e legenda) é desenhado uma
+    única vez e, a cada quadro, é restaurado e apenas as linhas são redesenhadas.
+    Cada imagem é uma vista do buffer da figura, válida até o próximo quadro"""
+    fig, artistas = criar_figura(dpi)
+    for artista in artistas:
+        artista.set_animated(True)
+    fig.canvas.draw()
+    fundo = fig.canvas.copy_from_bbox(fig.bbox)
+
+    for dia in quadros:
+        fig.canvas.restore_region(fundo)
+        for artista in atualizar(dia, artistas):
+            fig.draw_artist(artista)
+        yield np.asarray(fig.canvas.buffer_rgba())[:, :, :3]
+
+
+def exportar_animacao(formato):
+    """Gera a animação completa em um único arquivo. Retorna o conteúdo do arquivo em bytes"""
+    if formato == 'mp4':
+        #O FFmpeg recebe os quadros pelo próprio escritor do Matplotlib
+        fig, artistas = criar_figura(dpi=80)
+        animacao = animation.FuncAnimation(fig, atualizar, frames=quadros, fargs=(artistas,),
+                                           init_func=lambda: atualizar(0, artistas), blit=True)
+        with tempfile.TemporaryDirectory() as diretorio:
+            caminho = Path(diretorio) / 'animacao.mp4'
+            animacao.save(caminho, writer=animation.FFMpegWriter(fps=fps))
+            return caminho.read_bytes()
+
+    #Paleta fixa de cores, tirada do gráfico completo, para não recalcular a quantização a cada quadro
+    fig, artistas = criar_figura(dpi=80)
+    atualizar(len(t) - 1, artistas)
+    fig.canvas.draw()
+    paleta = Image.fromarray(np.asarray(fig.canvas.buffer_rgba())[:, :, :3]).quantize(colors=64)
+
+    #Os quadros são convertidos e gravados um a um, sem manter a animação inteira na memória
+    imagens = (Image.fromarray(quadro).quantize(palette=paleta, dither=Image.Dither.NONE)
+               for quadro in renderizar_quadros(dpi=80))
+    primeira = next(imagens)
+    buf = io.BytesIO()
+    primeira.save(buf, format='GIF', save_all=True, append_images=imagens, duration=1000 / fps, loop=0)
+    if formato == 'gif':
+        return buf.getvalue()
+
+    #Página HTML5 independente, com a animação embutida
+    gif = base64.b64encode(buf.getvalue()).decode('ascii')
+    return (f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>Evolução da Epidemia</title></head>'
+            f'<body><img src="data:image/gif;base64,{gif}" alt="Evolução da Epidemia"></body></html>').encode('utf-8')
 
-# Integração das equações
-resultado = odeint(modelo_sir, v_inicial, t)
-S, I, R, D = resultado.T
 
 # Cálculo do número básico de reprodução
 R0_basic = beta / (gamma + mi)
 st.subheader(f'Número básico de reprodução (R₀): {R0_basic:.2f}')
 
-# Plotagem do gráfico
-fig, ax = plt.subplots(figsize=(10, 6))
-ax.plot(t, S, 'b', label='Suscetíveis')
-ax.plot(t, I, 'r', label='Infectados')
-ax.plot(t, R, 'g', label='Recuperados')
-ax.plot(t, D, 'y', label='Falecidos')
-
-ax.set_title('Evolução da Epidemia - Modelo SIR')
-ax.set_xlabel('Dias')
-ax.set_ylabel('Número de Indivíduos')
-ax.legend()
-ax.grid(True)
+# Plotagem do gráfico completo
+fig, artistas = criar_figura()
+atualizar(len(t) - 1, artistas)
+artistas[-1].set_text('')
 
 # Exibição do gráfico no Streamlit
 st.pyplot(fig)
@@ -89,8 +154,6 @@ st.pyplot(fig)
 st.subheader("Animação da evolução da epidemia")
 frame_placeholder = st.empty()  # Reservamos espaço para o gráfico animado
 
-
-
 # Inicializa o estado da animação
 if "animar" not in st.session_state:
     st.session_state.animar = False
@@ -103,26 +166,32 @@ if st.button("Iniciar Animação"):
 if st.button("Parar Animação"):
     st.session_state.animar = False
 
-# Se o estado da animação estiver ativado, roda a animação
+# Se o estado da animação estiver ativado, transmite os quadros no ritmo escolhido,
+# descontando do intervalo o tempo gasto para desenhar e enviar cada quadro
 if st.session_state.animar:
-    st.subheader("Animação da evolução da epidemia")
-    frame_placeholder = st.empty()
-
-    for dia in range(1, len(t), 2):
-        fig, ax = plt.subplots(figsize=(10, 6))
-        ax.plot(t[:dia], S[:dia], 'b', label='Suscetíveis')
-        ax.plot(t[:dia], I[:dia], 'r', label='Infectados')
-        ax.plot(t[:dia], R[:dia], 'g', label='Recuperados')
-        ax.plot(t[:dia], D[:dia], 'y', label='Falecidos')
-
-        ax.set_title(f'Evolução da Epidemia até o Dia {int(t[dia])}')
-        ax.set_xlabel('Dias')
-        ax.set_ylabel('Número de Indivíduos')
-        ax.legend()
-        ax.grid(True)
-
-        frame_placeholder.pyplot(fig)
-        time.sleep(0.05)
+    intervalo = 1 / fps
+    inicio = time.perf_counter()
+    for quadro in renderizar_quadros():
+        frame_placeholder.image(quadro, output_format='JPEG')
+        time.sleep(max(0.0, intervalo - (time.perf_counter() - inicio)))
+        inicio = time.perf_counter()
+    st.session_state.animar = False
+
+# Exportação da animação em arquivo, gerada apenas quando o botão é clicado
+formatos = {'gif': ('🎞️ Download GIF', 'image/gif'), 'html': ('🌐 Download HTML', 'text/html')}
+if animation.writers.is_available('ffmpeg'):
+    formatos['mp4'] = ('🎬 Download MP4', 'video/mp4')
+
+chave = ('animacao', N, I0, beta, gamma, mi, dias, fps, dias_por_quadro)
+for coluna, (formato, (rotulo, mime)) in zip(st.columns(len(formatos)), formatos.items()):
+    with coluna:
+        st.download_button(
+            label=rotulo,
+            data=lambda formato=formato: cache_exportacoes.obter((*chave, formato),
+                                                                 lambda: exportar_animacao(formato)),
+            file_name=f'animacao_epidemia.{formato}',
+            mime=mime
+        )
 
 
 
@@ -1,3 +1,11 @@
+import sys
+from pathlib import Path
+
+#Permite importar o núcleo de simulação localizado na raiz do repositório
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from simulacao import matriz_mobilidade, simular_metapopulacao
+
+
 def obter_dados_varias_cidades():
     """Obtém os dados iniciais para a simulação SIR em múltiplas cidades."""
     num_cidades = int(input("Quantas cidades participarão da simulação? "))
@@ -42,86 +50,32 @@ def obter_dados_varias_cidades():
     return cidades, parametros, mobilidade, beta, gamma
 
 def simulador_sir(cidades, parametros, mobilidade, beta, gamma, dias):
-    """Essa função inicializa os estados para cada cidade. Para cada dia de simulação:
-    01.Calcula infectados importados de outras cidades
+    """Essa função inicializa os estados para cada cidade e simula todas elas em conjunto. Para cada dia de simulação:
+    01.Calcula infectados importados de outras cidades (um produto matriz-vetor com a matriz de mobilidade)
     02.Aplica o modelo SIR tradicional
     03.Atualiza os compartimentos S, I, R
     04.Armazena os resultados diários
     Retorna toda a evolução temporal"""
 
-    #cria dicionário vazio para armazenar dados da simulação
+    #Converte os dados das cidades em arrays e o dicionário de mobilidade em matriz esparsa
+    S0 = [parametros[cidade]["S"] for cidade in cidades]
+    I0 = [parametros[cidade]["I"] for cidade in cidades]
+    R0 = [parametros[cidade]["R"] for cidade in cidades]
+    matriz = matriz_mobilidade(cidades, mobilidade, esparsa=True)
+
+    #Simula todas as cidades de uma vez; o formato do resultado é [dias + 1, cidades, 3]
+    evolucao = simular_metapopulacao(S0, I0, R0, matriz, beta, gamma, dias)
+
+    #Mantém o formato de saída anterior, com o histórico de cada cidade em listas
     resultados = {}
- 
-    #Para cada cidade, extrai os valores iniciais e calcula a população total.
-    for cidade in cidades:
-        S = parametros[cidade]["S"]
-        I = parametros[cidade]["I"]
-        R = parametros[cidade]["R"]
-        N = S + I + R
- 
-    #Cria estruturas para armazenar a evolução dos compartimentos S, I, R ao longo do tempo.
-        historico = {
-            "S": [S],
-            "I": [I],
-            "R": [R]
-        }
- 
+    for i, cidade in enumerate(cidades):
         resultados[cidade] = {
-            "S": [S],
-            "I": [I],
-            "R": [R],
-            "N": N
+            "S": evolucao[:, i, 0].tolist(),
+            "I": evolucao[:, i, 1].tolist(),
+            "R": evolucao[:, i, 2].tolist(),
+            "N": S0[i] + I0[i] + R0[i]
         }
- 
-    #Inicia o loop principal que simula cada dia, criando um dicionário temporário para os novos valores.
-    for t in range(dias):
-        novos_parametros = {}
- 
-        for cidade in cidades:
-            S = resultados[cidade]["S"][-1]
-            I = resultados[cidade]["I"][-1]
-            R = resultados[cidade]["R"][-1]
-            N = resultados[cidade]["N"]
- 
-          
-    """Calcula infectados que chegam de outras cidades:
-    01.Para cada cidade de origem diferente
-    02.Obtém número de viajantes da matriz de mobilidade
-    03.Calcula proporção de infectados na cidade de origem
-    04.Adiciona ao contador de importados"""
-
-    importados = 0
-    for origem in cidades:
-        if origem != cidade:
-            viajantes = mobilidade.get((origem, cidade), 0)
-            I_origem = resultados[origem]["I"][-1]
-            N_origem = resultados[origem]["N"]
-            if N_origem > 0:
-                prop_inf = I_origem / N_origem
-                importados += viajantes * prop_inf
- 
-    #Define as fórmulas da dinâmica SIR básica
-            novos_infectados = beta * S * I / N
-            novos_recuperados = gamma * I
- 
-    """Atualiza os valores para o próximo dia, considerando:
-    01.Suscetíveis diminuem pelos novos infectados
-    02.Infectados recebem novos casos e subtraem recuperados, mais importados
-    03.Recuperados aumentam com os novos recuperados"""
-
-    S_novo = S - novos_infectados
-    I_novo = I + novos_infectados - novos_recuperados + importados
-    R_novo = R + novos_recuperados
- 
-    novos_parametros[cidade] = (S_novo, I_novo, R_novo)
- 
-    # Atualiza os dados após o dia
-    for cidade in cidades:
-        S_novo, I_novo, R_novo = novos_parametros[cidade]
-        resultados[cidade]["S"].append(S_novo)
-        resultados[cidade]["I"].append(I_novo)
-        resultados[cidade]["R"].append(R_novo)
- 
+
     return resultados
 
 def main():
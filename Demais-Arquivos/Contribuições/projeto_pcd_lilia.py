@@ -1,59 +1,31 @@
+import sys
+from pathlib import Path
+
+#Permite importar o núcleo de simulação localizado na raiz do repositório
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from simulacao import matriz_mobilidade, simular_metapopulacao
+
+
 def simulador_sir(cidades, parametros, mobilidade, beta, gamma, dias):
+    """Simula o modelo SIR para várias cidades acopladas pela mobilidade de infectados.
+    Retorna um dicionário com o histórico de S, I e R de cada cidade"""
+    #Converte os dados das cidades em arrays e o dicionário de mobilidade em matriz esparsa
+    S0 = [parametros[cidade]["S"] for cidade in cidades]
+    I0 = [parametros[cidade]["I"] for cidade in cidades]
+    R0 = [parametros[cidade]["R"] for cidade in cidades]
+    matriz = matriz_mobilidade(cidades, mobilidade, esparsa=True)
+
+    #Simula todas as cidades de uma vez; o formato do resultado é [dias + 1, cidades, 3]
+    evolucao = simular_metapopulacao(S0, I0, R0, matriz, beta, gamma, dias)
+
+    #Mantém o formato de saída anterior, com o histórico de cada cidade em listas
     resultados = {}
- 
-    for cidade in cidades:
-        S = parametros[cidade]["S"]
-        I = parametros[cidade]["I"]
-        R = parametros[cidade]["R"]
-        N = S + I + R
- 
-        historico = {
-            "S": [S],
-            "I": [I],
-            "R": [R]
-        }
- 
+    for i, cidade in enumerate(cidades):
         resultados[cidade] = {
-            "S": [S],
-            "I": [I],
-            "R": [R],
-            "N": N
+            "S": evolucao[:, i, 0].tolist(),
+            "I": evolucao[:, i, 1].tolist(),
+            "R": evolucao[:, i, 2].tolist(),
+            "N": S0[i] + I0[i] + R0[i]
         }
- 
-    for t in range(dias):
-        novos_parametros = {}
- 
-        for cidade in cidades:
-            S = resultados[cidade]["S"][-1]
-            I = resultados[cidade]["I"][-1]
-            R = resultados[cidade]["R"][-1]
-            N = resultados[cidade]["N"]
- 
-          
-            importados = 0
-            for origem in cidades:
-                if origem != cidade:
-                    viajantes = mobilidade.get((origem, cidade), 0)
-                    I_origem = resultados[origem]["I"][-1]
-                    N_origem = resultados[origem]["N"]
-                    if N_origem > 0:
-                        prop_inf = I_origem / N_origem
-                        importados += viajantes * prop_inf
- 
-            novos_infectados = beta * S * I / N
-            novos_recuperados = gamma * I
- 
-            S_novo = S - novos_infectados
-            I_novo = I + novos_infectados - novos_recuperados + importados
-            R_novo = R + novos_recuperados
- 
-            novos_parametros[cidade] = (S_novo, I_novo, R_novo)
- 
-        # Atualiza os dados após o dia
-        for cidade in cidades:
-            S_novo, I_novo, R_novo = novos_parametros[cidade]
-            resultados[cidade]["S"].append(S_novo)
-            resultados[cidade]["I"].append(I_novo)
-            resultados[cidade]["R"].append(R_novo)
- 
-    return resultados
\ No newline at end of file
+
+    return resultados
@@ -1,12 +1,11 @@
 import numpy as np
-import pandas as pd
-from scipy.integrate import odeint
 import streamlit as st
-import matplotlib.pyplot as plt
-import io
+from simulacao import simular_em_cache, conjunto_em_cache
+from graficos import grafico_interativo
+from exportacao import FORMATOS_BINARIOS, nova_figura, png_sob_demanda, csv_sob_demanda, dados_sob_demanda
 
 
-def executar_sir():
+def executar_sir(interativo=False):
     """"
     Executa o modelo epidemiológico SIR clássico quando chamada no main
     """
@@ -24,56 +23,65 @@ def executar_sir():
         gamma = st.slider(f'Taxa de Recuperação ($\gamma$)', 0.0, 1.0, 0.1, 0.01)
         dias = st.slider('Dias de simulação', 1, 365, 100, 1)
 
-        # Seleção das curvas exibidas no gráfico
-        st.subheader('Curvas exibidas:')
-        mostrar_S = st.checkbox('Susceptíveis', value=True)
-        mostrar_I = st.checkbox('Infectados', value=True)
-        mostrar_R = st.checkbox('Recuperados', value=True)
+        # Bandas de incerteza: conjunto de execuções com os parâmetros variando em torno dos escolhidos
+        st.header('Incerteza')
+        incerteza = st.checkbox('Mostrar faixa de 5% a 95%', value=False)
+        if incerteza:
+            variacao = st.slider('Variação dos parâmetros (±%)', 1, 50, 20, 1)
+            execucoes = st.select_slider('Execuções do conjunto', [100, 250, 500, 1000, 2000, 5000], 500)
 
+        # Seleção das curvas exibidas no gráfico; no gráfico interativo ela é feita pela legenda
+        mostrar_S = mostrar_I = mostrar_R = True
+        if not interativo:
+            st.subheader('Curvas exibidas:')
+            mostrar_S = st.checkbox('Susceptíveis', value=True)
+            mostrar_I = st.checkbox('Infectados', value=True)
+            mostrar_R = st.checkbox('Recuperados', value=True)
 
-    def modelo_sir(vetor, t):
-        """
-        Calcula as derivadas das variáveis do modelo epidemiológico SIR
-
-        Parâmetros:
-        vetor: lista ou array contendo os valores atuais de [S, I, R] no tempo t
-        t: tempo atual (passado automaticamente por odeint e não usado diretamente nessa função)
-
-        Retorna:
-        Lista com as derivadas correspondentes aos compartimentos:
-        [dS/dt, dI/dt, dR/dt, dD/dt]
-        """
-
-        S, I, R = vetor
-        dS = -beta * S * I / N
-        dI = beta * S * I / N - gamma * I
-        dR = gamma * I
-        return [dS, dI, dR]
-
-    # Período de simulação (dias)
-    t = np.linspace(0, dias, dias)
 
     # Integra numericamente o sistema de equações diferenciais ao longo do período definido (t)
-    resultado = odeint(modelo_sir, [S0, I0, R0], t)
+    t, resultado = simular_em_cache('SIR', dias, N=N, I0=I0, beta=beta, gamma=gamma)
     # Transposição matricial para a plotagem dos dados
     S, I, R = resultado.T
 
+    # Quantis diários do conjunto, calculados em fluxo sem guardar as trajetórias
+    bandas = None
+    if incerteza:
+        def faixa(valor):
+            return (valor * (1 - variacao / 100), valor * (1 + variacao / 100))
+
+        _, bandas = conjunto_em_cache('SIR', {'N': N, 'I0': I0}, {'beta': faixa(beta), 'gamma': faixa(gamma)},
+                                      dias, execucoes)
 
     # Plotagem das curvas selecionadas
-    fig, ax = plt.subplots(figsize=(12,6))
-    if mostrar_S:
-        ax.plot(t, S, 'b', label='Susceptíveis')
-    if mostrar_I:
-        ax.plot(t, I, 'r', label='Infectados')
-    if mostrar_R:
-        ax.plot(t, R, 'g', label='Recuperados')
-
-    ax.set_title('Modelo SIR')
-    ax.set_xlabel('Dias')
-    ax.set_ylabel('Número de Indivíduos')
-    ax.grid(True)
-    ax.legend()
-    st.pyplot(fig) # Exibe o gráfico
+    def desenhar_grafico():
+        fig, ax = nova_figura()
+        if mostrar_S:
+            ax.plot(t, S, 'b', label='Susceptíveis')
+        if mostrar_I:
+            ax.plot(t, I, 'r', label='Infectados')
+        if mostrar_R:
+            ax.plot(t, R, 'g', label='Recuperados')
+
+        if bandas is not None:
+            for mostrar, cor, c in ((mostrar_S, 'b', 0), (mostrar_I, 'r', 1), (mostrar_R, 'g', 2)):
+                if mostrar:
+                    ax.fill_between(t, bandas[0, :, c], bandas[-1, :, c], color=cor, alpha=0.2)
+
+        ax.set_title('Modelo SIR')
+        ax.set_xlabel('Dias')
+        ax.set_ylabel('Número de Indivíduos')
+        ax.grid(True)
+        ax.legend()
+        return fig
+
+    if interativo:
+        curvas = [('Susceptíveis', S, 'b', False), ('Infectados', I, 'r', False), ('Recuperados', R, 'g', False)]
+        faixas = [] if bandas is None else [(rotulo, bandas[0, :, c], bandas[-1, :, c]) for c, (rotulo, *_) in enumerate(curvas)]
+        grafico = grafico_interativo(t, curvas, 'Modelo SIR', bandas=faixas)
+        st.altair_chart(grafico, width='stretch')
+    else:
+        st.pyplot(desenhar_grafico()) # Exibe o gráfico
 
 
     # Encontra o dia e o valor correspondente ao pico de infecções
@@ -108,29 +116,41 @@ def executar_sir():
 
 
     st.subheader('Download dos Dados')
-    # Botão de download do gráfico em PNG
-    buf = io.BytesIO()
-    fig.savefig(buf, format='png')
-    buf.seek(0)
+    # Os arquivos só são gerados quando o botão é clicado e ficam guardados para este resultado
+    chave = ('SIR', dias, N, I0, beta, gamma)
     st.download_button(
         label='📊 Download Gráfico',
-        data=buf.getvalue(),
+        data=png_sob_demanda(chave + (mostrar_S, mostrar_I, mostrar_R, incerteza and (variacao, execucoes)),
+                             desenhar_grafico),
         file_name='grafico_epidemia.png',
         mime='image/png'
     )
 
     # Botão de download dos dados em CSV
-    df_dados = pd.DataFrame({
+    colunas = {
         'Dia': t,
         'Susceptíveis': S,
         'Infectados': I,
         'Recuperados': R,
-    })
-
-    csv_data = df_dados.to_csv(index=False).encode('utf-8')
+    }
     st.download_button(
         label='📄 Download CSV',
-        data=csv_data,
+        data=csv_sob_demanda(chave, colunas),
         file_name='dados_epidemia.csv',
         mime='text/csv'
     )
+
+    # Os mesmos dados em formato binário, com o modelo e os parâmetros gravados nos metadados
+    col_formato, col_precisao = st.columns(2)
+    with col_formato:
+        rotulo = st.selectbox('Formato binário', list(FORMATOS_BINARIOS))
+    with col_precisao:
+        float32 = st.checkbox('Precisão simples (float32)', value=False)
+    formato, mime = FORMATOS_BINARIOS[rotulo]
+    parametros = {'N': N, 'I0': I0, 'beta': beta, 'gamma': gamma, 'dias': dias}
+    st.download_button(
+        label=f'📦 Download {rotulo}',
+        data=dados_sob_demanda(chave, colunas, formato, 'SIR', parametros, float32),
+        file_name=f'dados_epidemia.{formato}',
+        mime=mime
+    )
@@ -1,12 +1,11 @@
 import numpy as np
-import pandas as pd
-from scipy.integrate import odeint
 import streamlit as st
-import matplotlib.pyplot as plt
-import io
+from simulacao import simular_em_cache, simular_intervencoes, conjunto_em_cache
+from graficos import grafico_interativo
+from exportacao import FORMATOS_BINARIOS, nova_figura, png_sob_demanda, csv_sob_demanda, dados_sob_demanda
 
 
-def executar_sird():
+def executar_sird(interativo=False):
     """"
     Executa o modelo epidemiológico SIRD clássico quando chamada no main
     """
@@ -29,77 +28,93 @@ def executar_sird():
         mu = st.slider(f'Taxa de mortalidade ($\mu$)', 0.0, 1.0, 0.01, 0.01)
         dias = st.slider('Dias de simulação', 1, 365, 100, 1)
 
-        # Seleção das curvas exibidas no gráfico
-        st.subheader('Curvas exibidas')
-        mostrar_S = st.checkbox('Susceptíveis', value=True)
-        mostrar_I = st.checkbox('Infectados', value=True)
-        mostrar_R = st.checkbox('Recuperados', value=True)
-        mostrar_D = st.checkbox('Mortos', value=True)
+        # Intervenção opcional: a partir do dia escolhido, a transmissão passa a ter outro valor
+        st.header('Intervenção')
+        intervencao = st.checkbox('Aplicar intervenção (ex.: isolamento)', value=False)
+        if intervencao:
+            dia_intervencao = st.slider('Dia de início da intervenção', 0, dias, min(30, dias), 1)
+            beta_intervencao = st.slider(r'Taxa de transmissão durante a intervenção ($\beta$)', 0.0, 1.0, 0.1, 0.01)
+
+        # Bandas de incerteza: conjunto de execuções com os parâmetros variando em torno dos escolhidos
+        st.header('Incerteza')
+        incerteza = st.checkbox('Mostrar faixa de 5% a 95%', value=False, disabled=intervencao)
+        if intervencao:
+            st.caption('As faixas de incerteza não estão disponíveis com intervenção.')
+            incerteza = False
+        if incerteza:
+            variacao = st.slider('Variação dos parâmetros (±%)', 1, 50, 20, 1)
+            execucoes = st.select_slider('Execuções do conjunto', [100, 250, 500, 1000, 2000, 5000], 500)
+
+        # Seleção das curvas exibidas no gráfico; no gráfico interativo ela é feita pela legenda
+        mostrar_S = mostrar_I = mostrar_R = mostrar_D = True
+        if not interativo:
+            st.subheader('Curvas exibidas')
+            mostrar_S = st.checkbox('Susceptíveis', value=True)
+            mostrar_I = st.checkbox('Infectados', value=True)
+            mostrar_R = st.checkbox('Recuperados', value=True)
+            mostrar_D = st.checkbox('Mortos', value=True)
         
-    # Período de simulação (dias)
-    t = np.linspace(0, dias, dias)
-
-    def modelo_sird(vetor, t):
-        """
-        Calcula as derivadas das variáveis do modelo epidemiológico SIRD
-
-        Parâmetros:
-        vetor: lista ou array contendo os valores atuais de [S, I, R, D] no tempo t
-        t: tempo atual (passado automaticamente por odeint e não usado diretamente nessa função)
-
-        Retorna:
-        Lista com as derivadas correspondentes aos compartimentos:
-        [dS/dt, dI/dt, dR/dt, dD/dt]
-        """
-        S, I, R, D = vetor
-
-        # O número de susceptíveis reduz, por isso beta está negativo
-        dS = -beta * S * I / N 
-    
-        # O primeiro termo calcula o número de novas infecções e o segundo, o número de recuperações
-        # O termo (gamma * I) corresponde à recuperação dos infectados
-        # O termo (mu * I) representa a redução de infectados devido a óbitos causados pela doença
-        dI = beta * S * I / N - gamma * I - mu * I
-
-        # O número de recuperados aumenta conforme os infectados se recuperam
-        dR = gamma * I
-
-        # O número de mortos aumenta proporcionalmente ao número de infectados (mu)
-        dD = mu * I
-
-        return np.array([dS, dI, dR, dD])
-
-    # Condições iniciais
-    vetor_inicial = [S0, I0, R0, D0]
-
     # Integra numericamente o sistema de equações diferenciais ao longo do período definido (t)
-    resultado = odeint(modelo_sird, vetor_inicial, t)
+    if intervencao:
+        # beta por trechos; os dias anteriores à intervenção são reaproveitados do cache
+        cronograma = ((0, beta), (dia_intervencao, beta_intervencao)) if dia_intervencao > 0 else beta_intervencao
+        t, resultado = simular_intervencoes('SIRD', {'N': N, 'I0': I0},
+                                            {'beta': cronograma, 'gamma': gamma, 'mu': mu}, dias)
+    else:
+        t, resultado = simular_em_cache('SIRD', dias, N=N, I0=I0, beta=beta, gamma=gamma, mu=mu)
     # Transoição matricial para a plotagem dos dados
     S, I, R, D = resultado.T
 
+    # Quantis diários do conjunto, calculados em fluxo sem guardar as trajetórias
+    bandas = None
+    if incerteza:
+        def faixa(valor):
+            return (valor * (1 - variacao / 100), valor * (1 + variacao / 100))
+
+        _, bandas = conjunto_em_cache('SIRD', {'N': N, 'I0': I0},
+                                      {'beta': faixa(beta), 'gamma': faixa(gamma), 'mu': faixa(mu)}, dias, execucoes)
+
     # Cálculo e exibição do número básico de reprodução
     R0_basic = beta / (gamma + mu)
     st.write(f'Número básico de reprodução ($R_0$): {R0_basic:.2f}')
 
 
     # Plotagem das curvas selecionadas
-    fig, ax = plt.subplots(figsize=(12, 6))
-    if mostrar_S:
-        ax.plot(t, S, 'b', label='Susceptíveis')
-    if mostrar_I:
-        ax.plot(t, I, 'r', label='Infectados')
-    if mostrar_R:
-        ax.plot(t, R, 'g', label='Recuperados')
-    if mostrar_D:
-        ax.plot(t, D, 'k', label='Mortos')
-
-    # Configurações do gráfico
-    ax.set_title('Evolução da Epidemia - Modelo SIR')
-    ax.set_xlabel('Dias')
-    ax.set_ylabel('Número de Indivíduos')
-    ax.legend()
-    ax.grid(True)
-    st.pyplot(fig) # Exibe o gráfico
+    def desenhar_grafico():
+        fig, ax = nova_figura()
+        if mostrar_S:
+            ax.plot(t, S, 'b', label='Susceptíveis')
+        if mostrar_I:
+            ax.plot(t, I, 'r', label='Infectados')
+        if mostrar_R:
+            ax.plot(t, R, 'g', label='Recuperados')
+        if mostrar_D:
+            ax.plot(t, D, 'k', label='Mortos')
+        if bandas is not None:
+            for mostrar, cor, c in ((mostrar_S, 'b', 0), (mostrar_I, 'r', 1), (mostrar_R, 'g', 2), (mostrar_D, 'k', 3)):
+                if mostrar:
+                    ax.fill_between(t, bandas[0, :, c], bandas[-1, :, c], color=cor, alpha=0.2)
+        if intervencao:
+            ax.axvline(dia_intervencao, color='gray', linestyle='--', label='Início da intervenção')
+
+        # Configurações do gráfico
+        ax.set_title('Evolução da Epidemia - Modelo SIR')
+        ax.set_xlabel('Dias')
+        ax.set_ylabel('Número de Indivíduos')
+        ax.legend()
+        ax.grid(True)
+        return fig
+
+    if interativo:
+        curvas = [('Susceptíveis', S, 'b', False), ('Infectados', I, 'r', False),
+                  ('Recuperados', R, 'g', False), ('Mortos', D, 'k', False)]
+        faixas = [] if bandas is None else [(rotulo, bandas[0, :, c], bandas[-1, :, c]) for c, (rotulo, *_) in enumerate(curvas)]
+        grafico = grafico_interativo(t, curvas, 'Evolução da Epidemia - Modelo SIRD',
+                                     marcos=[dia_intervencao] if intervencao else [],
+                                     bandas=faixas)
+        st.altair_chart(grafico, width='stretch')
+    else:
+        st.pyplot(desenhar_grafico()) # Exibe o gráfico
 
 
     # Encontra o dia e o valor correspondente ao pico de infecções
@@ -138,29 +153,44 @@ def executar_sird():
 
 
     st.subheader('Download dos Dados')
-    # Botão de download do gráfico em PNG
-    buf = io.BytesIO()
-    fig.savefig(buf, format='png')
-    buf.seek(0)
+    # Os arquivos só são gerados quando o botão é clicado e ficam guardados para este resultado
+    chave = ('SIRD', dias, N, I0, beta, gamma, mu,
+             (dia_intervencao, beta_intervencao) if intervencao else None)
     st.download_button(
         label='📊 Download Gráfico',
-        data=buf.getvalue(),
+        data=png_sob_demanda(chave + (mostrar_S, mostrar_I, mostrar_R, mostrar_D, incerteza and (variacao, execucoes)),
+                             desenhar_grafico),
         file_name='grafico_epidemia.png',
         mime='image/png'
     )
 
     # Botão de download dos dados em CSV
-    df_dados = pd.DataFrame({
+    colunas = {
         'Dia': t,
         'Susceptíveis': S,
         'Infectados': I,
         'Recuperados': R,
-    })
-
-    csv_data = df_dados.to_csv(index=False).encode('utf-8')
+        'Mortos': D,
+    }
     st.download_button(
         label='📄 Download CSV',
-        data=csv_data,
+        data=csv_sob_demanda(chave, colunas),
         file_name='dados_epidemia.csv',
         mime='text/csv'
     )
+
+    # Os mesmos dados em formato binário, com o modelo e os parâmetros gravados nos metadados
+    col_formato, col_precisao = st.columns(2)
+    with col_formato:
+        rotulo = st.selectbox('Formato binário', list(FORMATOS_BINARIOS))
+    with col_precisao:
+        float32 = st.checkbox('Precisão simples (float32)', value=False)
+    formato, mime = FORMATOS_BINARIOS[rotulo]
+    parametros = {'N': N, 'I0': I0, 'beta': beta, 'gamma': gamma, 'mu': mu, 'dias': dias,
+                  'intervencao': {'dia': dia_intervencao, 'beta': beta_intervencao} if intervencao else None}
+    st.download_button(
+        label=f'📦 Download {rotulo}',
+        data=dados_sob_demanda(chave, colunas, formato, 'SIRD', parametros, float32),
+        file_name=f'dados_epidemia.{formato}',
+        mime=mime
+    )
@@ -1,12 +1,11 @@
 import numpy as np
-import pandas as pd
-from scipy.integrate import odeint
 import streamlit as st
-import matplotlib.pyplot as plt
-import io
+from simulacao import simular_em_cache
+from graficos import grafico_interativo
+from exportacao import FORMATOS_BINARIOS, nova_figura, png_sob_demanda, csv_sob_demanda, dados_sob_demanda
 
 
-def executar_sird_duplo():
+def executar_sird_duplo(interativo=False):
     """"
     Executa o modelo epidemiológico SIRD de dupla população interagente quando chamada no main
     """
@@ -38,98 +37,28 @@ def executar_sird_duplo():
         k_BA = st.slider('Fator de Transmissão de B → A', 0.0, 1.0, 0.05, 0.01)
         dias = st.slider('Dias de simulação', 1, 365, 100, 1)
 
-        # Seleção das curvas exibidas no gráfico
-        st.header('Curvas Exibidas')
-        st.write('População A')
-        mostrar_S_A = st.checkbox('Susceptíveis', value=True, key='mostrar_S_A')
-        mostrar_I_A = st.checkbox('Infectados', value=True, key='mostrar_I_A')
-        mostrar_R_A = st.checkbox('Recuperados', value=True, key='mostrar_R_A')
-        mostrar_D_A = st.checkbox('Mortos', value=True, key='mostrar_D_A')
-
-        st.write('População B')
-        mostrar_S_B = st.checkbox('Susceptíveis', value=True, key='mostrar_S_B')
-        mostrar_I_B = st.checkbox('Infectados', value=True, key='mostrar_I_B')
-        mostrar_R_B = st.checkbox('Recuperados', value=True, key='mostrar_R_B')
-        mostrar_D_B = st.checkbox('Mortos', value=True, key='mostrar_D_B')
-
-    # Condições iniciais de cada população
-    S0_A = N_A - I0_A
-    R0_A = 0
-    D0_A = 0
-
-    S0_B = N_B - I0_B
-    R0_B = 0
-    D0_B = 0
-
-    # Condições iniciais
-    vetor_inicial = [S0_A, I0_A, R0_A, D0_A, S0_B, I0_B, R0_B, D0_B]
-
-    # Período de simulação (dias)
-    t = np.linspace(0, dias, dias)
-
-    def modelo_sir_duplo(vetor, t):
-        """
-        Calcula as derivadas das variáveis do modelo epidemiológico SIRD acoplado a duas populações interagentes
-
-        Parâmetros:
-        vetor: lista ou array contendo os valores atuais dos compartimentos, na seguinte ordem:
-        [S_A, I_A, R_A, D_A, S_B, I_B, R_B, D_B]
-
-        t: tempo atual (passado automaticamente por odeint e não usado diretamente nessa função)
-
-        Retorna:
-        Uma lista com as derivadas correspondentes aos compartimentos:
-        [dS_A/dt, dI_A/dt, dR_A/dt, dD_A/dt, dS_B/dt, dI_B/dt, dR_B/dt, dD_B/dt]
-        """
-        S_A, I_A, R_A, D_A, S_B, I_B, R_B, D_B = vetor
-
-        # ----- POPULAÇÃO A -----
-        # Taxa de variação dos suscetíveis de A
-        dS_A = - beta_A * S_A * I_A / N_A - k_BA * S_A * I_B / N_B
-        # Infecção interna: - beta_A * S_A * I_A / N_A
-        # Infecção cruzada (de B para A): - k_BA * S_A * I_B / N_B
-
-        # Taxa de variação dos infectados de A
-        dI_A = beta_A * S_A * I_A / N_A + k_BA * S_A * I_B / N_B - gamma_A * I_A - mu_A * I_A
-        # Infecção interna: + beta_A * S_A * I_A / N_A
-        # Infecção cruzada: + k_BA * S_A * I_B / N_B
-        # Recuperação: - gamma_A * I_A
-        # Mortalidade da doença: - mu_A * I_A
-
-        # Taxa de variação dos recuperados de A
-        dR_A = gamma_A * I_A
-        # Recuperação: + gamma_A * I_A
-
-        # Taxa de variação dos óbitos de A
-        dD_A = mu_A * I_A
-        # Mortalidade da doença: + mu_A * I_A
-
-        # ----- POPULAÇÃO B -----
-
-        # Taxa de variação dos suscetíveis de B
-        dS_B = - beta_B * S_B * I_B / N_B - k_AB * S_B * I_A / N_A
-        # Infecção interna: - beta_B * S_B * I_B / N_B
-        # Infecção cruzada (de A para B): - k_AB * S_B * I_A / N_A
-
-        # Taxa de variação dos infectados de B
-        dI_B = beta_B * S_B * I_B / N_B + k_AB * S_B * I_A / N_A - gamma_B * I_B - mu_B * I_B
-        # Infecção interna: + beta_B * S_B * I_B / N_B
-        # Infecção cruzada: + k_AB * S_B * I_A / N_A
-        # Recuperação: - gamma_B * I_B
-        # Mortalidade da doença: - mu_B * I_B
-
-        # Taxa de variação dos recuperados de B
-        dR_B = gamma_B * I_B
-        # Recuperação: + gamma_B * I_B
-
-        # Taxa de variação dos óbitos de B
-        dD_B = mu_B * I_B
-        # Mortalidade da doença: + mu_B * I_B
-
-        return [dS_A, dI_A, dR_A, dD_A, dS_B, dI_B, dR_B, dD_B]
+        # Seleção das curvas exibidas no gráfico; no gráfico interativo ela é feita pela legenda
+        mostrar_S_A = mostrar_I_A = mostrar_R_A = mostrar_D_A = True
+        mostrar_S_B = mostrar_I_B = mostrar_R_B = mostrar_D_B = True
+        if not interativo:
+            st.header('Curvas Exibidas')
+            st.write('População A')
+            mostrar_S_A = st.checkbox('Susceptíveis', value=True, key='mostrar_S_A')
+            mostrar_I_A = st.checkbox('Infectados', value=True, key='mostrar_I_A')
+            mostrar_R_A = st.checkbox('Recuperados', value=True, key='mostrar_R_A')
+            mostrar_D_A = st.checkbox('Mortos', value=True, key='mostrar_D_A')
+
+            st.write('População B')
+            mostrar_S_B = st.checkbox('Susceptíveis', value=True, key='mostrar_S_B')
+            mostrar_I_B = st.checkbox('Infectados', value=True, key='mostrar_I_B')
+            mostrar_R_B = st.checkbox('Recuperados', value=True, key='mostrar_R_B')
+            mostrar_D_B = st.checkbox('Mortos', value=True, key='mostrar_D_B')
 
     # Integra numericamente o sistema de equações diferenciais ao longo do período definido (t)
-    resultado = odeint(modelo_sir_duplo, vetor_inicial, t)
+    t, resultado = simular_em_cache('SIRD_duplo', dias,
+                                    N_A=N_A, I0_A=I0_A, beta_A=beta_A, gamma_A=gamma_A, mu_A=mu_A,
+                                    N_B=N_B, I0_B=I0_B, beta_B=beta_B, gamma_B=gamma_B, mu_B=mu_B,
+                                    k_AB=k_AB, k_BA=k_BA)
     # Transposição matricial para a plotagem dos dados
     S_A, I_A, R_A, D_A, S_B, I_B, R_B, D_B = resultado.T
 
@@ -141,32 +70,43 @@ def executar_sird_duplo():
     st.markdown(f'- População B: $R_0$ = {R0_B_val:.2f}')
 
     # Plotagem das curvas selecionadas
-    fig, ax = plt.subplots(figsize=(12, 6))
-    if mostrar_S_A:
-        ax.plot(t, S_A, 'b', label='Susceptíveis A')
-    if mostrar_I_A:
-        ax.plot(t, I_A, 'r', label='Infectados A')
-    if mostrar_R_A:
-        ax.plot(t, R_A, 'g', label='Recuperados A')
-    if mostrar_D_A:
-        ax.plot(t, D_A, 'k', label='Mortos A')
-
-    if mostrar_S_B:
-        ax.plot(t, S_B, 'b', label='Susceptíveis B', linestyle='dashed')
-    if mostrar_I_B:
-        ax.plot(t, I_B, 'r', label='Infectados B', linestyle='dashed')
-    if mostrar_R_B:
-        ax.plot(t, R_B, 'g', label='Recuperados B', linestyle='dashed')
-    if mostrar_D_B:
-        ax.plot(t, D_B, 'k', label='Mortos B', linestyle='dashed')
-    
-    # Configurações do gráfico
-    ax.set_title('Evolução da Epidemia - Duas Populações Interagentes')
-    ax.set_xlabel('Dias')
-    ax.set_ylabel('Número de Indivíduos')
-    ax.grid(True)
-    ax.legend()
-    st.pyplot(fig)
+    def desenhar_grafico():
+        fig, ax = nova_figura()
+        if mostrar_S_A:
+            ax.plot(t, S_A, 'b', label='Susceptíveis A')
+        if mostrar_I_A:
+            ax.plot(t, I_A, 'r', label='Infectados A')
+        if mostrar_R_A:
+            ax.plot(t, R_A, 'g', label='Recuperados A')
+        if mostrar_D_A:
+            ax.plot(t, D_A, 'k', label='Mortos A')
+
+        if mostrar_S_B:
+            ax.plot(t, S_B, 'b', label='Susceptíveis B', linestyle='dashed')
+        if mostrar_I_B:
+            ax.plot(t, I_B, 'r', label='Infectados B', linestyle='dashed')
+        if mostrar_R_B:
+            ax.plot(t, R_B, 'g', label='Recuperados B', linestyle='dashed')
+        if mostrar_D_B:
+            ax.plot(t, D_B, 'k', label='Mortos B', linestyle='dashed')
+
+        # Configurações do gráfico
+        ax.set_title('Evolução da Epidemia - Duas Populações Interagentes')
+        ax.set_xlabel('Dias')
+        ax.set_ylabel('Número de Indivíduos')
+        ax.grid(True)
+        ax.legend()
+        return fig
+
+    if interativo:
+        curvas = [('Susceptíveis A', S_A, 'b', False), ('Infectados A', I_A, 'r', False),
+                  ('Recuperados A', R_A, 'g', False), ('Mortos A', D_A, 'k', False),
+                  ('Susceptíveis B', S_B, 'b', True), ('Infectados B', I_B, 'r', True),
+                  ('Recuperados B', R_B, 'g', True), ('Mortos B', D_B, 'k', True)]
+        grafico = grafico_interativo(t, curvas, 'Evolução da Epidemia - Duas Populações Interagentes')
+        st.altair_chart(grafico, width='stretch')
+    else:
+        st.pyplot(desenhar_grafico())
 
     # Encontra o dia e o valor correspondente ao pico de infecções
     pico_A = t[np.argmax(I_A)]
@@ -210,18 +150,18 @@ def executar_sird_duplo():
 
 
     st.subheader('Download dos Dados')
-    # Botão de download do gráfico em PNG
-    buf = io.BytesIO()
-    fig.savefig(buf, format='png')
-    buf.seek(0)
+    # Os arquivos só são gerados quando o botão é clicado e ficam guardados para este resultado
+    chave = ('SIRD_duplo', dias, N_A, I0_A, beta_A, gamma_A, mu_A, N_B, I0_B, beta_B, gamma_B, mu_B, k_AB, k_BA)
+    curvas = (mostrar_S_A, mostrar_I_A, mostrar_R_A, mostrar_D_A, mostrar_S_B, mostrar_I_B, mostrar_R_B, mostrar_D_B)
     st.download_button(
         label='📊 Download Gráfico',
-        data=buf.getvalue(),
+        data=png_sob_demanda(chave + curvas, desenhar_grafico),
         file_name='grafico_epidemia.png',
         mime='image/png'
     )
-    #  Botão de download dos dados em CSV
-    df_dados = pd.DataFrame({
+
+    # Botão de download dos dados em CSV
+    colunas = {
         'Dia': t,
         'Susceptíveis A': S_A,
         'Infectados A': I_A,
@@ -231,12 +171,27 @@ def executar_sird_duplo():
         'Infectados B': I_B,
         'Recuperados B': R_B,
         'Mortos B': D_B,
-    })
-
-    csv_data = df_dados.to_csv(index=False).encode('utf-8')
+    }
     st.download_button(
         label='📄 Download CSV',
-        data=csv_data,
+        data=csv_sob_demanda(chave, colunas),
         file_name='dados_epidemia.csv',
         mime='text/csv'
     )
+
+    # Os mesmos dados em formato binário, com o modelo e os parâmetros gravados nos metadados
+    col_formato, col_precisao = st.columns(2)
+    with col_formato:
+        rotulo = st.selectbox('Formato binário', list(FORMATOS_BINARIOS))
+    with col_precisao:
+        float32 = st.checkbox('Precisão simples (float32)', value=False)
+    formato, mime = FORMATOS_BINARIOS[rotulo]
+    parametros = {'N_A': N_A, 'I0_A': I0_A, 'beta_A': beta_A, 'gamma_A': gamma_A, 'mu_A': mu_A,
+                  'N_B': N_B, 'I0_B': I0_B, 'beta_B': beta_B, 'gamma_B': gamma_B, 'mu_B': mu_B,
+                  'k_AB': k_AB, 'k_BA': k_BA, 'dias': dias}
+    st.download_button(
+        label=f'📦 Download {rotulo}',
+        data=dados_sob_demanda(chave, colunas, formato, 'SIRD_duplo', parametros, float32),
+        file_name=f'dados_epidemia.{formato}',
+        mime=mime
+    )
@@ -1,12 +1,11 @@
 import numpy as np
-import pandas as pd
-from scipy.integrate import odeint
 import streamlit as st
-import matplotlib.pyplot as plt
-import io
+from simulacao import simular_em_cache
+from graficos import grafico_interativo
+from exportacao import FORMATOS_BINARIOS, nova_figura, png_sob_demanda, csv_sob_demanda, dados_sob_demanda
 
 
-def executar_sird_vital():
+def executar_sird_vital(interativo=False):
     """"
     Executa o modelo epidemiológico SIRD de dinâmica vital quando chamada no main
     """
@@ -29,61 +28,18 @@ def executar_sird_vital():
         mu = st.slider(f'Taxa de mortalidade ($\mu$)', 0.0, 1.0, 0.01, 0.01)
         dias = st.slider('Dias de simulação', 1, 365, 100, 1)
 
-        # Seleção das curvas exibidas no gráfico
-        st.subheader('Curvas exibidas:')
-        mostrar_S = st.checkbox('Susceptíveis', value=True)
-        mostrar_I = st.checkbox('Infectados', value=True)
-        mostrar_R = st.checkbox('Recuperados', value=True)
-        mostrar_D = st.checkbox('Falecidos', value=True)
-
-    vetor_inicial = [S0, I0, R0, D0]
-
-    # Período de simulação (dias)
-    t = np.linspace(0, dias, dias)
-
-    def modelo_sird_vital(vetor, t):
-        """
-        Calcula as derivadas do modelo epidemiológico SIRD com dinâmica vital (natalidade e mortalidade natural)
-
-        Parâmetros:
-        vetor: lista ou array contendo os valores atuais de [S, I, R, D] no tempo t
-        t: tempo atual (passado automaticamente por odeint e não usado diretamente nessa função)
-
-        Retorna:
-        Lista com as derivadas de cada compartimento:
-        [dS/dt, dI/dt, dR/dt, dD/dt]
-        """
-
-        S, I, R, D = vetor
-
-        # População viva, isto é, não inclui os mortos
-        N = S + I + R 
-
-        # Taxa de variação dos susceptíveis
-        dS = mu * N - beta * S * I / N - mu * S
-        # Natalidade: mu * N
-        # Infecção: - beta * S * I / N
-        # Mortalidade natural: - mu * S
-
-        # Taxa de variação dos infectados
-        dI = beta * S * I / N - gamma * I - mu * I - delta * I
-        # Infecção: + beta * S * I / N
-        # Recuperação: - gamma * I
-        # Mortalidade natural: - mu * I
-        # Mortalidade por doença: - delta * I
-        
-        # Taxa de variação dos recuperados
-        dR = gamma * I - mu * R
-        # Recuperação: + gamma * I
-        # Mortalidade natural: - mu * R
-
-        # Taxa de variação dos óbitos causados pela doença
-        dD = delta * I
-
-        return [dS, dI, dR, dD]
+        # Seleção das curvas exibidas no gráfico; no gráfico interativo ela é feita pela legenda
+        mostrar_S = mostrar_I = mostrar_R = mostrar_D = True
+        if not interativo:
+            st.subheader('Curvas exibidas:')
+            mostrar_S = st.checkbox('Susceptíveis', value=True)
+            mostrar_I = st.checkbox('Infectados', value=True)
+            mostrar_R = st.checkbox('Recuperados', value=True)
+            mostrar_D = st.checkbox('Falecidos', value=True)
 
     # Integra numericamente o sistema de equações diferenciais ao longo do período definido (t)
-    resultado = odeint(modelo_sird_vital, vetor_inicial, t)
+    t, resultado = simular_em_cache('SIRD_vital', dias, N=N, I0=I0, beta=beta, gamma=gamma,
+                                    delta=delta, mu=mu)
     # Transposição matricial para a plotagem dos dados 
     S, I, R, D = resultado.T
 
@@ -93,23 +49,32 @@ def executar_sird_vital():
     st.write(f'Número básico de reprodução ($R_0$): {R0_basic:.2f}')
 
     # Plotagem das curvas selecionadas
-    fig, ax = plt.subplots(figsize=(12, 6))
-    if mostrar_S:
-        ax.plot(t, S, 'b', label='Suscetíveis')
-    if mostrar_I:
-        ax.plot(t, I, 'r', label='Infectados')
-    if mostrar_R:
-        ax.plot(t, R, 'g', label='Recuperados')
-    if mostrar_D:
-        ax.plot(t, D, 'k', label='Falecidos')
-
-    # Configurações do gráfico
-    ax.set_title('Evolução da Epidemia - Modelo SIRD com Dinâmica Vital')
-    ax.set_xlabel('Dias')
-    ax.set_ylabel('Número de Indivíduos')
-    ax.legend()
-    ax.grid(True)
-    st.pyplot(fig)
+    def desenhar_grafico():
+        fig, ax = nova_figura()
+        if mostrar_S:
+            ax.plot(t, S, 'b', label='Suscetíveis')
+        if mostrar_I:
+            ax.plot(t, I, 'r', label='Infectados')
+        if mostrar_R:
+            ax.plot(t, R, 'g', label='Recuperados')
+        if mostrar_D:
+            ax.plot(t, D, 'k', label='Falecidos')
+
+        # Configurações do gráfico
+        ax.set_title('Evolução da Epidemia - Modelo SIRD com Dinâmica Vital')
+        ax.set_xlabel('Dias')
+        ax.set_ylabel('Número de Indivíduos')
+        ax.legend()
+        ax.grid(True)
+        return fig
+
+    if interativo:
+        curvas = [('Suscetíveis', S, 'b', False), ('Infectados', I, 'r', False),
+                  ('Recuperados', R, 'g', False), ('Falecidos', D, 'k', False)]
+        grafico = grafico_interativo(t, curvas, 'Evolução da Epidemia - Modelo SIRD com Dinâmica Vital')
+        st.altair_chart(grafico, width='stretch')
+    else:
+        st.pyplot(desenhar_grafico())
 
     # Encontra o dia e o valor correspondente ao pico de infecções
     pico = t[np.argmax(I)]
@@ -147,29 +112,41 @@ def executar_sird_vital():
 
 
     st.subheader('Download dos Dados')
-    # Botão de download do gráfico em PNG
-    buf = io.BytesIO()
-    fig.savefig(buf, format='png')
-    buf.seek(0)
+    # Os arquivos só são gerados quando o botão é clicado e ficam guardados para este resultado
+    chave = ('SIRD_vital', dias, N, I0, beta, gamma, delta, mu)
     st.download_button(
         label='📊 Download Gráfico',
-        data=buf.getvalue(),
+        data=png_sob_demanda(chave + (mostrar_S, mostrar_I, mostrar_R, mostrar_D), desenhar_grafico),
         file_name='grafico_epidemia.png',
         mime='image/png'
     )
 
     # Botão de download dos dados em CSV
-    df_dados = pd.DataFrame({
+    colunas = {
         'Dia': t,
         'Susceptíveis': S,
         'Infectados': I,
         'Recuperados': R,
-    })
-
-    csv_data = df_dados.to_csv(index=False).encode('utf-8')
+        'Falecidos': D,
+    }
     st.download_button(
         label='📄 Download CSV',
-        data=csv_data,
+        data=csv_sob_demanda(chave, colunas),
         file_name='dados_epidemia.csv',
         mime='text/csv'
     )
+
+    # Os mesmos dados em formato binário, com o modelo e os parâmetros gravados nos metadados
+    col_formato, col_precisao = st.columns(2)
+    with col_formato:
+        rotulo = st.selectbox('Formato binário', list(FORMATOS_BINARIOS))
+    with col_precisao:
+        float32 = st.checkbox('Precisão simples (float32)', value=False)
+    formato, mime = FORMATOS_BINARIOS[rotulo]
+    parametros = {'N': N, 'I0': I0, 'beta': beta, 'gamma': gamma, 'delta': delta, 'mu': mu, 'dias': dias}
+    st.download_button(
+        label=f'📦 Download {rotulo}',
+        data=dados_sob_demanda(chave, colunas, formato, 'SIRD_vital', parametros, float32),
+        file_name=f'dados_epidemia.{formato}',
+        mime=mime
+    )
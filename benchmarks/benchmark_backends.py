@@ -0,0 +1,96 @@
+"""
+Compara as avaliações de derivadas por segundo de cada backend
+
+- python: função escalar modelo_* chamada uma vez por avaliação (como no odeint/solve_ivp)
+- numpy: Runge-Kutta em lote com derivadas vetorizadas sobre todas as trajetórias
+- numba: Runge-Kutta em lote com núcleos compilados (apenas se o numba estiver instalado)
+
+Uso: python benchmarks/benchmark_backends.py
+"""
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from simulacao import (NUMBA_DISPONIVEL, integrar_lote, periodo, matriz_contato_duplo,
+                       modelo_sir, modelo_sird, modelo_sird_k, modelo_sird_vital)
+
+
+LOTE = 2_000
+DIAS = 365
+PASSOS_POR_DIA = 4
+CHAMADAS_ESCALARES = 20_000
+
+
+def casos():
+    """
+    Retorna:
+    Lista de tuplas (modelo, derivada escalar, estado, args escalares, Y0 do lote, parâmetros do lote)
+    """
+    rng = np.random.default_rng(0)
+    beta = rng.uniform(0.1, 1.0, LOTE)
+    uns = np.ones(LOTE)
+    zeros = np.zeros(LOTE)
+    N = 10_000 * uns
+    I0 = 100 * uns
+    duplo = (matriz_contato_duplo(0.3, 0.3, 0.05, 0.05), np.array([0.1, 0.1]),
+             np.array([0.01, 0.01]), np.array([10_000.0, 10_000.0]))
+
+    return [
+        ('SIR', modelo_sir, np.array([9_900.0, 100, 0]), (0.3, 0.1, 10_000),
+         np.stack([N - I0, I0, zeros]), (beta, 0.1 * uns, N)),
+        ('SIRD', modelo_sird, np.array([9_900.0, 100, 0, 0]), (0.3, 0.1, 0.01, 10_000),
+         np.stack([N - I0, I0, zeros, zeros]), (beta, 0.1 * uns, 0.01 * uns, N)),
+        ('SIRD_duplo', modelo_sird_k, np.array([9_900.0, 100, 0, 0, 9_990, 10, 0, 0]), duplo,
+         np.stack([N - I0, I0, zeros, zeros, N - 10, 10 * uns, zeros, zeros]),
+         (beta, 0.1 * uns, 0.01 * uns, N, 0.3 * uns, 0.1 * uns, 0.01 * uns, N, 0.05 * uns, 0.05 * uns)),
+        ('SIRD_vital', modelo_sird_vital, np.array([9_900.0, 100, 0, 0]), (0.3, 0.1, 0.01, 0.01),
+         np.stack([N - I0, I0, zeros, zeros]), (beta, 0.1 * uns, 0.01 * uns, 0.01 * uns)),
+    ]
+
+
+def avaliacoes_escalares(derivada, estado, args):
+    """
+    Retorna:
+    Avaliações por segundo da derivada escalar chamada em um laço Python
+    """
+    inicio = time.perf_counter()
+    for _ in range(CHAMADAS_ESCALARES):
+        derivada(estado, 0.0, *args)
+    return CHAMADAS_ESCALARES / (time.perf_counter() - inicio)
+
+
+def avaliacoes_lote(modelo, Y0, parametros, backend, t):
+    """
+    Retorna:
+    Avaliações de derivada (por trajetória) por segundo no Runge-Kutta em lote
+    """
+    # Uma execução curta antes da medição, para que a compilação do Numba não seja contabilizada
+    integrar_lote(modelo, Y0[:, :2], tuple(p[:2] for p in parametros), t[:3], PASSOS_POR_DIA, backend)
+
+    inicio = time.perf_counter()
+    integrar_lote(modelo, Y0, parametros, t, PASSOS_POR_DIA, backend)
+    duracao = time.perf_counter() - inicio
+
+    passos = sum(max(1, int(np.ceil(intervalo * PASSOS_POR_DIA))) for intervalo in np.diff(t))
+    return Y0.shape[1] * passos * 4 / duracao
+
+
+def main():
+    t = periodo(DIAS)
+    backends = ['numpy'] + (['numba'] if NUMBA_DISPONIVEL else [])
+    if not NUMBA_DISPONIVEL:
+        print('numba não instalado: o backend compilado não será medido\n')
+
+    print(f"{'Modelo':<12} {'Backend':<8} {'Avaliações/s':>14}")
+    for modelo, derivada, estado, args, Y0, parametros in casos():
+        print(f"{modelo:<12} {'python':<8} {avaliacoes_escalares(derivada, estado, args):>14,.0f}")
+        for backend in backends:
+            print(f'{modelo:<12} {backend:<8} {avaliacoes_lote(modelo, Y0, parametros, backend, t):>14,.0f}')
+        print()
+
+
+if __name__ == '__main__':
+    main()
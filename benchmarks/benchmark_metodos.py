@@ -0,0 +1,82 @@
+"""
+Compara os métodos de integração do solve_ivp em cada modelo
+
+Para cada modelo e método são exibidos o número de avaliações das derivadas (nfev),
+de avaliações da jacobiana (njev) e o tempo de execução, com a jacobiana analítica e,
+nos métodos que a utilizam, com a jacobiana estimada por diferenças finitas.
+
+Uso: python benchmarks/benchmark_metodos.py
+"""
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from simulacao import (METODOS, integrar, periodo, matriz_contato_duplo,
+                       modelo_sir, modelo_sird, modelo_sird_vital, modelo_sird_k,
+                       jacobiana_sir, jacobiana_sird, jacobiana_sird_vital, jacobiana_sird_k)
+from simulacao.simulador import METODOS_COM_JACOBIANA
+
+
+REPETICOES = 5
+
+
+def casos():
+    """
+    Retorna:
+    Lista de tuplas (nome, derivada, jacobiana, vetor_inicial, args) com os cenários avaliados
+    """
+    K = 100
+    rng = np.random.default_rng(0)
+    C = rng.random((K, K)) * 0.3 / K + np.diag(np.full(K, 0.3))
+    N_k = np.full(K, 1e5)
+    I0_k = np.zeros(K)
+    I0_k[0] = 10
+    zeros = np.zeros(K)
+
+    return [
+        ('SIR', modelo_sir, jacobiana_sir, [9_900, 100, 0], (0.3, 0.1, 10_000)),
+        ('SIRD', modelo_sird, jacobiana_sird, [9_900, 100, 0, 0], (0.3, 0.1, 0.01, 10_000)),
+        ('SIRD duplo', modelo_sird_k, jacobiana_sird_k, [9_900, 100, 0, 0, 9_990, 10, 0, 0],
+         (matriz_contato_duplo(0.3, 0.3, 0.05, 0.05), np.array([0.1, 0.1]), np.array([0.01, 0.01]),
+          np.array([10_000.0, 10_000.0]))),
+        # População grande e mortalidade pequena: o caso em que o LSODA passa ao modo rígido
+        ('SIRD vital (N=1e9)', modelo_sird_vital, jacobiana_sird_vital, [1e9 - 10, 10, 0, 0],
+         (0.3, 0.1, 0.0001, 0.01)),
+        (f'SIRD K={K}', modelo_sird_k, jacobiana_sird_k, np.column_stack([N_k - I0_k, I0_k, zeros, zeros]).ravel(),
+         (C, np.full(K, 0.1), np.full(K, 0.01), N_k)),
+    ]
+
+
+def medir(derivada, jacobiana, vetor_inicial, args, metodo, t):
+    """
+    Executa a integração REPETICOES vezes e devolve a solução e a mediana do tempo (ms)
+    """
+    tempos = []
+    for _ in range(REPETICOES):
+        inicio = time.perf_counter()
+        solucao = integrar(derivada, vetor_inicial, t, args, jacobiana, metodo)
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return solucao, np.median(tempos)
+
+
+def main():
+    t = periodo(365)
+    print(f"{'Modelo':<20} {'Método':<7} {'Jacobiana':<10} {'nfev':>7} {'njev':>5} {'Tempo (ms)':>11}")
+    for nome, derivada, jacobiana, vetor_inicial, args in casos():
+        for metodo in METODOS:
+            variantes = [('analítica', jacobiana)]
+            if metodo in METODOS_COM_JACOBIANA:
+                variantes.append(('numérica', None))
+            for rotulo, jac in variantes:
+                solucao, tempo = medir(derivada, jac, vetor_inicial, args, metodo, t)
+                if metodo not in METODOS_COM_JACOBIANA:
+                    rotulo = '-'
+                print(f'{nome:<20} {metodo:<7} {rotulo:<10} {solucao.nfev:>7} {solucao.njev:>5} {tempo:>11.2f}')
+        print()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+"""
+Mede o tempo do modelo SIRD baseado em agentes em uma rede aleatória de 1 milhão de nós e 10 milhões de arestas
+
+Uso: python benchmarks/benchmark_rede.py [nos] [arestas]
+"""
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from simulacao import rede_aleatoria, simular_rede_sird
+
+
+DIAS = 365
+BETA = 0.02
+GAMMA = 0.1
+MU = 0.01
+I0 = 100
+
+
+def main():
+    nos = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    arestas = int(sys.argv[2]) if len(sys.argv) > 2 else 10_000_000
+
+    inicio = time.perf_counter()
+    indptr, indices = rede_aleatoria(nos, arestas, semente=0)
+    print(f'Rede com {nos:,} nós e {indices.size // 2:,} arestas montada em {time.perf_counter() - inicio:.1f} s')
+
+    inicio = time.perf_counter()
+    t, resultado = simular_rede_sird(indptr, indices, BETA, GAMMA, MU, DIAS, I0=I0, semente=0)
+    duracao = time.perf_counter() - inicio
+
+    S, I, R, D = resultado.T
+    print(f'{DIAS} dias simulados em {duracao:.1f} s')
+    print(f'Pico de {I.max():,} infectados no dia {int(t[I.argmax()])}; '
+          f'{R[-1]:,} recuperados e {D[-1]:,} falecidos ao final')
+
+
+if __name__ == '__main__':
+    main()
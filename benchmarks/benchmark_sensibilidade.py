@@ -0,0 +1,47 @@
+"""
+Mede o tempo dos índices de Sobol do SIRD_duplo com cerca de 80 mil avaliações do modelo
+
+Os oito parâmetros do modelo de duas populações variam ao mesmo tempo; com n amostras base,
+a análise integra n * (8 + 2) trajetórias em lote.
+
+Uso: python benchmarks/benchmark_sensibilidade.py [processos]
+"""
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from simulacao import indices_sobol
+
+
+# Potência de 2, como pede a sequência de Sobol do scipy para manter o balanceamento
+AMOSTRAS_BASE = 2 ** 13
+DIAS = 365
+FIXOS = {'N_A': 10_000, 'I0_A': 100, 'N_B': 10_000, 'I0_B': 10}
+LIMITES = {
+    'beta_A': (0.1, 0.6), 'gamma_A': (0.05, 0.3), 'mu_A': (0.0, 0.05),
+    'beta_B': (0.1, 0.6), 'gamma_B': (0.05, 0.3), 'mu_B': (0.0, 0.05),
+    'k_AB': (0.0, 0.1), 'k_BA': (0.0, 0.1),
+}
+
+
+def main():
+    processos = int(sys.argv[1]) if len(sys.argv) > 1 else 1
+    avaliacoes = AMOSTRAS_BASE * (len(LIMITES) + 2)
+
+    # Uma execução curta antes da medição, para que a compilação do Numba não seja contabilizada
+    indices_sobol('SIRD_duplo', LIMITES, 3, FIXOS, n=8, reamostragens=10, semente=0)
+
+    inicio = time.perf_counter()
+    tabelas = indices_sobol('SIRD_duplo', LIMITES, DIAS, FIXOS, n=AMOSTRAS_BASE, semente=0, processos=processos)
+    duracao = time.perf_counter() - inicio
+
+    print(f'{avaliacoes:,} avaliações em {duracao:.1f} s com {processos} processo(s)\n')
+    for indicador, tabela in tabelas.items():
+        print(indicador)
+        print(tabela.round(3).to_string())
+        print()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+"""
+Teste de carga do serviço HTTP: envia requisições a uma taxa fixa e mede as latências p50 e p99
+
+As requisições são disparadas em horários fixos (carga em malha aberta), e a latência de cada uma
+é medida a partir do horário em que deveria ter sido enviada: se o serviço atrasa, a espera na
+fila do cliente também entra na conta. Os parâmetros são sorteados com três casas decimais, de
+modo que parte das requisições se repete e é atendida pelo cache.
+
+Usa apenas a biblioteca padrão, com conexões HTTP/1.1 persistentes.
+
+Uso, com o serviço rodando (uvicorn servico:app --port 8000):
+python benchmarks/carga_servico.py [taxa] [duração em s] [endereço]
+"""
+import asyncio
+import json
+import sys
+import time
+from urllib.parse import urlsplit
+
+import numpy as np
+
+
+CONEXOES = 128
+DIAS = 180
+MODELOS = {
+    'SIR': lambda rng: {'N': 10_000, 'I0': 10, 'beta': rng.uniform(0.1, 0.5), 'gamma': rng.uniform(0.05, 0.2)},
+    'SIRD': lambda rng: {'N': 10_000, 'I0': 10, 'beta': rng.uniform(0.1, 0.5), 'gamma': rng.uniform(0.05, 0.2),
+                         'mu': rng.uniform(0.0, 0.05)},
+}
+
+
+def montar_requisicao(endereco, modelo, parametros):
+    corpo = json.dumps({'dias': DIAS, 'parametros': {nome: round(valor, 3) for nome, valor in parametros.items()}})
+    return (f'POST /simulacoes/{modelo} HTTP/1.1\r\nHost: {endereco.netloc}\r\n'
+            f'Content-Type: application/json\r\nContent-Length: {len(corpo)}\r\n\r\n{corpo}').encode()
+
+
+async def enviar(conexoes, requisicao):
+    """
+    Envia uma requisição por uma conexão livre e lê a resposta inteira
+
+    Retorna:
+    Código de status HTTP da resposta
+    """
+    leitor, escritor = await conexoes.get()
+    try:
+        escritor.write(requisicao)
+        await escritor.drain()
+        status = int((await leitor.readline()).split()[1])
+        tamanho = 0
+        while (linha := await leitor.readline()) != b'\r\n':
+            nome, _, valor = linha.decode().partition(':')
+            if nome.lower() == 'content-length':
+                tamanho = int(valor)
+        await leitor.readexactly(tamanho)
+        return status
+    finally:
+        conexoes.put_nowait((leitor, escritor))
+
+
+async def executar(taxa, duracao, url):
+    endereco = urlsplit(url)
+    conexoes = asyncio.Queue()
+    for _ in range(CONEXOES):
+        conexoes.put_nowait(await asyncio.open_connection(endereco.hostname, endereco.port))
+
+    rng = np.random.default_rng()
+    total = int(taxa * duracao)
+    requisicoes = []
+    for i in range(total):
+        modelo = list(MODELOS)[i % len(MODELOS)]
+        requisicoes.append(montar_requisicao(endereco, modelo, MODELOS[modelo](rng)))
+
+    latencias = np.empty(total)
+    erros = 0
+
+    async def disparar(i, horario):
+        nonlocal erros
+        try:
+            if await enviar(conexoes, requisicoes[i]) != 200:
+                erros += 1
+        except (OSError, asyncio.IncompleteReadError, ValueError):
+            erros += 1
+        latencias[i] = time.perf_counter() - horario
+
+    inicio = time.perf_counter()
+    tarefas = []
+    for i in range(total):
+        horario = inicio + i / taxa
+        espera = horario - time.perf_counter()
+        if espera > 0:
+            await asyncio.sleep(espera)
+        tarefas.append(asyncio.create_task(disparar(i, horario)))
+    await asyncio.gather(*tarefas)
+    decorrido = time.perf_counter() - inicio
+
+    while not conexoes.empty():
+        _, escritor = conexoes.get_nowait()
+        escritor.close()
+    return latencias, erros, decorrido
+
+
+async def estatisticas_servico(url):
+    endereco = urlsplit(url)
+    leitor, escritor = await asyncio.open_connection(endereco.hostname, endereco.port)
+    escritor.write(f'GET /saude HTTP/1.1\r\nHost: {endereco.netloc}\r\nConnection: close\r\n\r\n'.encode())
+    resposta = await leitor.read()
+    escritor.close()
+    return json.loads(resposta.partition(b'\r\n\r\n')[2])
+
+
+def main():
+    taxa = float(sys.argv[1]) if len(sys.argv) > 1 else 500
+    duracao = float(sys.argv[2]) if len(sys.argv) > 2 else 10
+    url = sys.argv[3] if len(sys.argv) > 3 else 'http://127.0.0.1:8000'
+
+    latencias, erros, decorrido = asyncio.run(executar(taxa, duracao, url))
+    p50, p90, p99 = np.percentile(latencias, [50, 90, 99]) * 1000
+    print(f'{len(latencias):,} requisições em {decorrido:.1f} s ({len(latencias) / decorrido:.0f} por segundo), '
+          f'{erros} erro(s)')
+    print(f'Latência: p50 {p50:.1f} ms, p90 {p90:.1f} ms, p99 {p99:.1f} ms, máxima {latencias.max() * 1000:.1f} ms')
+
+    servico = asyncio.run(estatisticas_servico(url))
+    cache = servico['cache']
+    print(f"{servico['trajetorias']:,} trajetórias integradas em {servico['lotes']:,} lotes; "
+          f"cache: {cache['acertos'] + cache['acertos_disco']:,} acertos")
+
+
+if __name__ == '__main__':
+    main()
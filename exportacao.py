@@ -0,0 +1,101 @@
+"""
+Figuras e arquivos de download das páginas, gerados apenas quando são usados
+
+As figuras são criadas com matplotlib.figure.Figure, e não com pyplot: assim não ficam
+registradas no gerenciador global do pyplot e são liberadas pelo coletor de lixo assim que
+deixam de ser usadas, sem se acumular no processo do servidor ao longo das sessões.
+
+O PNG e o CSV de cada resultado só são gerados quando o botão de download é clicado
+(o Streamlit chama a função passada em data=) e ficam em um cache próprio, indexado pelos
+parâmetros da simulação, para que cliques repetidos no mesmo resultado não refaçam o arquivo.
+Além do CSV, os dados podem ser baixados em Parquet, Arrow IPC ou NPZ (ver simulacao.armazenamento).
+"""
+import io
+
+import pandas as pd
+from matplotlib.figure import Figure
+
+from simulacao import ARROW_DISPONIVEL, CacheResultados, gravar_colunas, metadados_simulacao
+
+
+# Arquivos de download já gerados, compartilhados entre as sessões do mesmo processo
+cache_exportacoes = CacheResultados(capacidade=64)
+
+# Formatos binários oferecidos nas páginas: rótulo -> (formato, que também é a extensão, tipo MIME)
+FORMATOS_BINARIOS = {
+    'Parquet': ('parquet', 'application/vnd.apache.parquet'),
+    'Arrow IPC': ('arrow', 'application/vnd.apache.arrow.file'),
+    'NPZ': ('npz', 'application/octet-stream'),
+}
+if not ARROW_DISPONIVEL:
+    FORMATOS_BINARIOS = {'NPZ': FORMATOS_BINARIOS['NPZ']}
+
+
+def nova_figura():
+    """
+    Cria a figura 12x6 usada pelos gráficos das páginas, fora do pyplot
+
+    Retorna:
+    Tupla (fig, ax)
+    """
+    fig = Figure(figsize=(12, 6))
+    ax = fig.subplots()
+    return fig, ax
+
+
+def png_sob_demanda(chave, desenhar):
+    """
+    Monta a função que gera o PNG do gráfico apenas quando o download é solicitado
+
+    Parâmetros:
+    chave: tupla imutável que identifica o gráfico (parâmetros da simulação e curvas exibidas)
+    desenhar: função sem argumentos que devolve a figura
+
+    Retorna:
+    Função sem argumentos que devolve os bytes do PNG, para o parâmetro data= de st.download_button
+    """
+    def calcular():
+        buf = io.BytesIO()
+        desenhar().savefig(buf, format='png')
+        return buf.getvalue()
+
+    return lambda: cache_exportacoes.obter(('png', *chave), calcular)
+
+
+def csv_sob_demanda(chave, colunas):
+    """
+    Monta a função que gera o CSV dos dados apenas quando o download é solicitado
+
+    Parâmetros:
+    chave: tupla imutável que identifica a simulação
+    colunas: dicionário {nome da coluna: valores}
+
+    Retorna:
+    Função sem argumentos que devolve os bytes do CSV, para o parâmetro data= de st.download_button
+    """
+    def calcular():
+        return pd.DataFrame(colunas).to_csv(index=False).encode('utf-8')
+
+    return lambda: cache_exportacoes.obter(('csv', *chave), calcular)
+
+
+def dados_sob_demanda(chave, colunas, formato, modelo, parametros, float32=False):
+    """
+    Monta a função que gera os dados em um formato binário apenas quando o download é solicitado
+
+    Parâmetros:
+    chave: tupla imutável que identifica a simulação
+    colunas: dicionário {nome da coluna: valores}
+    formato: 'parquet', 'arrow' ou 'npz'
+    modelo, parametros: nome do modelo e dicionário de parâmetros, gravados nos metadados do arquivo
+    float32: se True, os valores são gravados em precisão simples
+
+    Retorna:
+    Função sem argumentos que devolve os bytes do arquivo, para o parâmetro data= de st.download_button
+    """
+    def calcular():
+        buf = io.BytesIO()
+        gravar_colunas(buf, colunas, formato, metadados_simulacao(modelo, parametros), float32)
+        return buf.getvalue()
+
+    return lambda: cache_exportacoes.obter((formato, float32, *chave), calcular)
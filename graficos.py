@@ -0,0 +1,107 @@
+"""
+Gráfico interativo desenhado no navegador (Vega-Lite, via Altair)
+
+Em vez de renderizar uma imagem no servidor a cada reexecução, as trajetórias (reduzidas a
+no máximo PONTOS_MAXIMOS instantes) são enviadas ao navegador, que desenha o gráfico. Exibir
+ou ocultar curvas é feito clicando na legenda, sem passar pelo Python. O Matplotlib continua
+sendo usado para o PNG de download (ver exportacao).
+"""
+import altair as alt
+import numpy as np
+import pandas as pd
+
+
+# Número máximo de instantes enviados ao navegador por curva
+PONTOS_MAXIMOS = 400
+
+# Cores do Matplotlib usadas nas páginas e seus equivalentes no Vega-Lite
+CORES = {'b': 'blue', 'r': 'red', 'g': 'green', 'k': 'black'}
+
+
+def reduzir_pontos(t, series, pontos=PONTOS_MAXIMOS):
+    """
+    Escolhe os instantes enviados ao navegador, preservando o máximo e o mínimo de cada curva
+
+    Parâmetros:
+    t: instantes da simulação
+    series: lista de arrays com os valores de cada curva
+    pontos: número aproximado de instantes mantidos
+
+    Retorna:
+    Array ordenado com os índices dos instantes mantidos
+    """
+    if len(t) <= pontos:
+        return np.arange(len(t))
+    indices = np.linspace(0, len(t) - 1, pontos).astype(int)
+    extremos = [np.argmax(valores) for valores in series] + [np.argmin(valores) for valores in series]
+    return np.union1d(indices, extremos)
+
+
+def grafico_interativo(t, curvas, titulo, marcos=(), bandas=()):
+    """
+    Monta o gráfico de linhas interativo com as curvas da simulação
+
+    Parâmetros:
+    t: instantes da simulação
+    curvas: lista de tuplas (rótulo, valores, cor no formato do Matplotlib, tracejada)
+    titulo: título do gráfico
+    marcos: dias marcados com uma linha vertical (por exemplo, o início de uma intervenção)
+    bandas: lista de tuplas (rótulo da curva, limite inferior, limite superior), desenhadas como
+    regiões sombreadas na cor da curva
+
+    Retorna:
+    Gráfico Altair, para st.altair_chart; clicar em um item da legenda alterna a sua curva
+    (com todos desmarcados, todas as curvas são exibidas)
+    """
+    indices = reduzir_pontos(t, [valores for _, valores, _, _ in curvas])
+    dados = pd.concat([
+        pd.DataFrame({'Dia': t[indices], 'Curva': rotulo, 'Indivíduos': np.asarray(valores)[indices]})
+        for rotulo, valores, _, _ in curvas
+    ])
+    rotulos = [rotulo for rotulo, _, _, _ in curvas]
+    cores = [CORES.get(cor, cor) for _, _, cor, _ in curvas]
+    tracejados = [rotulo for rotulo, _, _, tracejada in curvas if tracejada]
+
+    selecao = alt.selection_point(fields=['Curva'], bind='legend', toggle='true')
+    tracejado = alt.value([1, 0])
+    if tracejados:
+        tracejado = alt.condition(alt.FieldOneOfPredicate(field='Curva', oneOf=tracejados),
+                                  alt.value([6, 4]), tracejado)
+    linhas = (
+        alt.Chart(dados, title=titulo)
+        .mark_line()
+        .encode(
+            x=alt.X('Dia:Q', title='Dias'),
+            y=alt.Y('Indivíduos:Q', title='Número de Indivíduos'),
+            color=alt.Color('Curva:N', sort=rotulos, scale=alt.Scale(domain=rotulos, range=cores)),
+            strokeDash=tracejado,
+            opacity=alt.condition(selecao, alt.value(1.0), alt.value(0.0)),
+            tooltip=['Curva:N', alt.Tooltip('Dia:Q', format='.0f'), alt.Tooltip('Indivíduos:Q', format=',.0f')],
+        )
+        .add_params(selecao)
+        .interactive(bind_y=False)
+    )
+    camadas = [linhas]
+    if len(bandas):
+        dados_bandas = pd.concat([
+            pd.DataFrame({'Dia': t[indices], 'Curva': rotulo,
+                          'Inferior': np.asarray(inferior)[indices], 'Superior': np.asarray(superior)[indices]})
+            for rotulo, inferior, superior in bandas
+        ])
+        sombras = (
+            alt.Chart(dados_bandas)
+            .mark_area()
+            .encode(
+                x='Dia:Q',
+                y='Inferior:Q',
+                y2='Superior:Q',
+                color=alt.Color('Curva:N', sort=rotulos, scale=alt.Scale(domain=rotulos, range=cores), legend=None),
+                opacity=alt.condition(selecao, alt.value(0.2), alt.value(0.0)),
+            )
+        )
+        camadas.insert(0, sombras)
+    if len(marcos):
+        camadas.append(alt.Chart(pd.DataFrame({'Dia': list(marcos)}))
+                       .mark_rule(color='gray', strokeDash=[4, 4])
+                       .encode(x='Dia:Q'))
+    return alt.layer(*camadas) if len(camadas) > 1 else linhas
@@ -3,6 +3,7 @@ from SIR import executar_sir
 from SIRD import executar_sird
 from SIRD_duplo import executar_sird_duplo
 from SIRD_vital import executar_sird_vital
+from simulacao import cache_simulacoes
 
 
 # Título geral
@@ -50,6 +51,12 @@ modelos = ['Selecione um modelo',
            'SIRD - Dinâmica Vital']
 modelo_selecionado = st.selectbox('Escolha um modelo:', modelos)
 
+# Forma de exibição do gráfico: desenhado no navegador (curvas alternadas pela legenda) ou imagem do Matplotlib
+interativo = False
+if modelo_selecionado != 'Selecione um modelo':
+    renderizacao = st.sidebar.radio('Gráfico', ['Interativo (navegador)', 'Imagem (Matplotlib)'])
+    interativo = renderizacao == 'Interativo (navegador)'
+
 # Oculta a interface até que um modelo seja selecionado
 match modelo_selecionado:
     case 'Selecione um modelo':
@@ -72,16 +79,30 @@ match modelo_selecionado:
     
     case 'SIR':
         # Executa o modelo SIR
-        executar_sir()
+        executar_sir(interativo)
 
     case 'SIRD':
         # Executa o modelo SIRD
-        executar_sird()
+        executar_sird(interativo)
 
     case 'SIRD - Dupla População Interagente (Simplificado)':
         # Executa o modelo SIRD de dupla população interagente
-        executar_sird_duplo()
+        executar_sird_duplo(interativo)
 
     case 'SIRD - Dinâmica Vital':
         # Executa o modelo SIRD de dinâmica vital
-        executar_sird_vital()
+        executar_sird_vital(interativo)
+
+# Estatísticas do cache de simulações, compartilhado entre reexecuções e sessões
+if modelo_selecionado != 'Selecione um modelo':
+    with st.sidebar.expander('Cache de simulações'):
+        estatisticas = cache_simulacoes.estatisticas()
+        acertos = estatisticas['acertos'] + estatisticas['acertos_disco']
+        total = acertos + estatisticas['falhas']
+        taxa_acerto = acertos / total * 100 if total > 0 else 0
+        st.markdown(f"""
+        - **Acertos**: {acertos} ({estatisticas['acertos_disco']} no disco)
+        - **Falhas**: {estatisticas['falhas']}
+        - **Taxa de acerto**: {taxa_acerto:.1f}%
+        - **Ocupação**: {estatisticas['itens']}/{estatisticas['capacidade']}
+        """)
@@ -0,0 +1,351 @@
+"""
+Serviço HTTP/JSON com os modelos SIR, SIRD, SIRD_duplo e SIRD_vital, para uso fora da interface
+
+Rotas:
+- GET /modelos: parâmetros e compartimentos de cada modelo
+- POST /simulacoes/{modelo}: corpo {"dias": 100, "parametros": {"N": 1000, "I0": 10, "beta": 0.3, "gamma": 0.1}};
+  responde {"modelo", "dias", "origem", "t", "compartimentos": {"S": [...], ...}}
+- GET /saude: estatísticas do cache e dos lotes integrados
+
+Cada resposta vem, nesta ordem, de:
+1. o cache de resultados do próprio serviço ("origem": "cache");
+2. os blocos já integrados pela interface com simular_em_cache ("origem": "interface");
+3. um lote do Runge-Kutta vetorizado ("origem": "lote"): as requisições do mesmo modelo e horizonte
+   que chegam dentro de uma janela de poucos milissegundos são integradas juntas por simular_*_lote,
+   em um processo separado, de modo que o laço de eventos nunca fica bloqueado pela integração.
+
+O cache é o mesmo cache_simulacoes da interface. Com a variável EPIMODEL_CACHE apontando para o
+mesmo arquivo na interface e no serviço, o serviço aproveita as trajetórias já integradas pela
+interface; o contrário não acontece, pois a interface não lê as trajetórias integradas em lote.
+Os dois caminhos usam integradores diferentes: "interface" é a solução do LSODA (tolerâncias de
+simular_em_cache) e "lote" a do Runge-Kutta de passo fixo com 4 passos por dia. Os números de uma
+mesma requisição podem, portanto, diferir levemente conforme a origem (cerca de 0,05 indivíduo
+com N = 10 mil); o campo "origem" da resposta indica qual foi usada.
+
+Uso: EPIMODEL_CACHE=/tmp/epimodel.sqlite uvicorn servico:app --port 8000
+"""
+import asyncio
+import inspect
+import math
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
+from json import JSONDecodeError
+
+import numpy as np
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from simulacao import COMPARTIMENTOS, SIMULADORES, SIMULADORES_LOTE, cache_simulacoes, chave_simulacao
+from simulacao.varredura import _inicializar_processo
+
+
+# Parâmetros de cada modelo, na ordem das funções de simulação em lote
+PARAMETROS = {
+    modelo: [nome for nome in inspect.signature(funcao).parameters if nome not in ('dias', 'passos_por_dia', 'backend')]
+    for modelo, funcao in SIMULADORES_LOTE.items()
+}
+
+DIAS_MAXIMO = 3650
+# Limites dos parâmetros, os mesmos dos controles da interface; com passos de 1/4 de dia, taxas
+# muito maiores tornam o Runge-Kutta de passo fixo instável e a trajetória diverge
+POPULACAO_MAXIMA = 10_000_000_000
+TAXA_MAXIMA = 1.0
+# Tempo que a primeira requisição de um lote espera por outras antes de o lote ser integrado
+JANELA_AGRUPAMENTO = 0.005
+TAMANHO_MAXIMO_LOTE = 256
+PROCESSOS = int(os.environ.get('EPIMODEL_PROCESSOS', os.cpu_count() or 1))
+
+
+def chave_lote(modelo, dias, parametros):
+    """
+    Monta a chave do cache de uma trajetória integrada em lote
+
+    Diferente dos blocos de simular_em_cache, a chave inclui o número de dias, pois cada
+    requisição guarda a trajetória inteira.
+
+    Retorna:
+    Tupla imutável ('lote', modelo, parâmetros ordenados, dias)
+    """
+    return ('lote', *chave_simulacao(modelo, parametros), dias)
+
+
+def integrar_grupo(modelo, dias, colunas):
+    """
+    Integra um lote de requisições; executada nos processos do pool
+
+    Parâmetros:
+    modelo: nome do modelo, uma das chaves de SIMULADORES_LOTE
+    dias: número de dias de simulação, o mesmo para todo o lote
+    colunas: dicionário {nome do parâmetro: array [lote]}
+
+    Retorna:
+    Array [lote, dias + 1, compartimentos]
+    """
+    return SIMULADORES_LOTE[modelo](dias=dias, **colunas)[1]
+
+
+def _aquecer():
+    # Carrega os núcleos compilados do Numba no processo, para que a primeira requisição não pague por isso
+    for modelo, nomes in PARAMETROS.items():
+        integrar_grupo(modelo, 1, {nome: np.ones(1) for nome in nomes})
+
+
+class _BlocoAusente(Exception):
+    pass
+
+
+def consultar_interface(modelo, dias, parametros):
+    """
+    Monta a trajetória a partir dos blocos já integrados pela interface, sem integrar nenhum bloco
+
+    Retorna:
+    Array [dias + 1, compartimentos], ou None se algum bloco ainda não estiver no cache
+    """
+    chave = chave_simulacao(modelo, parametros)
+
+    def memoria(k, calcular):
+        bloco = cache_simulacoes.consultar((*chave, k))
+        if bloco is None:
+            raise _BlocoAusente
+        return bloco
+
+    try:
+        return SIMULADORES[modelo](dias=dias, memoria=memoria, **parametros)[1]
+    except _BlocoAusente:
+        return None
+
+
+class AgrupadorLotes:
+    """
+    Junta em lotes as requisições que chegam quase ao mesmo tempo e os integra no pool de processos
+
+    As requisições são agrupadas por (modelo, dias). O lote de um grupo é integrado quando a
+    janela aberta pela primeira requisição termina ou quando ele atinge o tamanho máximo.
+    Requisições idênticas simultâneas aguardam a mesma trajetória.
+    """
+
+    def __init__(self, executor, janela=JANELA_AGRUPAMENTO, tamanho_maximo=TAMANHO_MAXIMO_LOTE):
+        """
+        Parâmetros:
+        executor: pool de processos que integra os lotes
+        janela: tempo máximo, em segundos, que uma requisição espera pelas demais do lote
+        tamanho_maximo: número máximo de trajetórias em um lote
+        """
+        self.executor = executor
+        self.janela = janela
+        self.tamanho_maximo = tamanho_maximo
+        self.lotes = 0
+        self.trajetorias = 0
+        self._pendentes = {}  # (modelo, dias) -> lista de (parâmetros, futuro)
+        self._temporizadores = {}
+        self._em_andamento = {}  # chave do cache -> futuro, para requisições idênticas simultâneas
+        self._tarefas = set()
+
+    def simular(self, modelo, dias, parametros):
+        """
+        Agenda a integração de uma trajetória no próximo lote do seu grupo
+
+        Parâmetros:
+        modelo: nome do modelo, uma das chaves de SIMULADORES_LOTE
+        dias: número de dias de simulação
+        parametros: dicionário {nome: valor} com todos os parâmetros do modelo
+
+        Retorna:
+        Futuro do asyncio com o array [dias + 1, compartimentos]
+        """
+        chave = chave_lote(modelo, dias, parametros)
+        if chave in self._em_andamento:
+            return self._em_andamento[chave]
+
+        laco = asyncio.get_running_loop()
+        futuro = laco.create_future()
+        self._em_andamento[chave] = futuro
+        futuro.add_done_callback(lambda _: self._em_andamento.pop(chave, None))
+
+        grupo = (modelo, dias)
+        pendentes = self._pendentes.setdefault(grupo, [])
+        pendentes.append((parametros, futuro))
+        if len(pendentes) >= self.tamanho_maximo:
+            self._despachar(grupo)
+        elif len(pendentes) == 1:
+            self._temporizadores[grupo] = laco.call_later(self.janela, self._despachar, grupo)
+        return futuro
+
+    def _despachar(self, grupo):
+        temporizador = self._temporizadores.pop(grupo, None)
+        if temporizador is not None:
+            temporizador.cancel()
+        tarefa = asyncio.ensure_future(self._integrar(grupo, self._pendentes.pop(grupo)))
+        # O laço de eventos guarda apenas referências fracas às tarefas
+        self._tarefas.add(tarefa)
+        tarefa.add_done_callback(self._tarefas.discard)
+
+    async def _integrar(self, grupo, itens):
+        modelo, dias = grupo
+        colunas = {nome: np.array([parametros[nome] for parametros, _ in itens]) for nome in PARAMETROS[modelo]}
+        laco = asyncio.get_running_loop()
+        try:
+            resultado = await laco.run_in_executor(self.executor, integrar_grupo, modelo, dias, colunas)
+        except Exception as erro:
+            for _, futuro in itens:
+                if not futuro.done():
+                    futuro.set_exception(erro)
+            return
+
+        self.lotes += 1
+        self.trajetorias += len(itens)
+        resultado.flags.writeable = False
+        # Trajetórias que divergiram não são devolvidas nem guardadas, para não contaminar o cache
+        finitas = np.isfinite(resultado).all(axis=(1, 2))
+        for (_, futuro), trajetoria, finita in zip(itens, resultado, finitas):
+            if futuro.done():
+                continue
+            if finita:
+                futuro.set_result(trajetoria)
+            else:
+                futuro.set_exception(ValueError('A integração divergiu para estes parâmetros'))
+
+        # A gravação no cache (que pode incluir o disco) fica fora do laço de eventos
+        def guardar():
+            for (parametros, _), trajetoria, finita in zip(itens, resultado, finitas):
+                if finita:
+                    cache_simulacoes.guardar(chave_lote(modelo, dias, parametros), trajetoria)
+
+        await asyncio.to_thread(guardar)
+
+
+def validar_requisicao(modelo, corpo):
+    """
+    Confere o corpo de uma requisição de simulação
+
+    Retorna:
+    Tupla (dias, parametros), com os parâmetros convertidos para float
+
+    Levanta:
+    ValueError com a descrição do problema
+    """
+    if not isinstance(corpo, dict):
+        raise ValueError('O corpo deve ser um objeto JSON com "dias" e "parametros"')
+    dias = corpo.get('dias')
+    if isinstance(dias, bool) or not isinstance(dias, int) or not 1 <= dias <= DIAS_MAXIMO:
+        raise ValueError(f'"dias" deve ser um inteiro entre 1 e {DIAS_MAXIMO}')
+
+    parametros = corpo.get('parametros')
+    if not isinstance(parametros, dict):
+        raise ValueError('"parametros" deve ser um objeto JSON')
+    esperados = PARAMETROS[modelo]
+    faltando = [nome for nome in esperados if nome not in parametros]
+    desconhecidos = [nome for nome in parametros if nome not in esperados]
+    if faltando or desconhecidos:
+        raise ValueError(f'Parâmetros esperados para {modelo}: {esperados}; '
+                         f'faltando: {faltando}; desconhecidos: {desconhecidos}')
+    for nome, valor in parametros.items():
+        if isinstance(valor, bool) or not isinstance(valor, (int, float)) or not math.isfinite(valor):
+            raise ValueError(f'O parâmetro {nome} deve ser um número finito')
+
+    # Populações (N, N_A, N_B) positivas, infectados iniciais (I0, I0_A, I0_B) entre 0 e a população
+    # correspondente e taxas entre 0 e TAXA_MAXIMA; fora disso a integração gera NaN, diverge ou
+    # falha no processo do pool
+    for nome, valor in parametros.items():
+        if nome.startswith('N'):
+            if not 0 < valor <= POPULACAO_MAXIMA:
+                raise ValueError(f'A população {nome} deve ser positiva e no máximo {POPULACAO_MAXIMA:,}')
+        elif nome.startswith('I0'):
+            populacao = 'N' + nome[2:]
+            if not 0 <= valor <= parametros[populacao]:
+                raise ValueError(f'O parâmetro {nome} deve estar entre 0 e {populacao}')
+        elif not 0 <= valor <= TAXA_MAXIMA:
+            raise ValueError(f'A taxa {nome} deve estar entre 0 e {TAXA_MAXIMA}')
+    return dias, {nome: float(parametros[nome]) for nome in esperados}
+
+
+def consultar_caches(modelo, dias, parametros):
+    """
+    Procura a trajetória no cache do serviço e, depois, nos blocos da interface
+
+    Com o nível em disco, a consulta lê o SQLite; por isso é executada fora do laço de eventos.
+
+    Retorna:
+    Tupla (origem, resultado), com origem 'cache' ou 'interface', ou (None, None) se não houver resultado
+    """
+    resultado = cache_simulacoes.consultar(chave_lote(modelo, dias, parametros))
+    if resultado is not None:
+        return 'cache', resultado
+    resultado = consultar_interface(modelo, dias, parametros)
+    if resultado is not None:
+        return 'interface', resultado
+    return None, None
+
+
+async def listar_modelos(requisicao):
+    return JSONResponse({modelo: {'parametros': PARAMETROS[modelo], 'compartimentos': COMPARTIMENTOS[modelo]}
+                         for modelo in SIMULADORES_LOTE})
+
+
+async def simular(requisicao):
+    modelo = requisicao.path_params['modelo']
+    if modelo not in SIMULADORES_LOTE:
+        return JSONResponse({'erro': f'Modelo desconhecido: {modelo}. Use um de {list(SIMULADORES_LOTE)}'},
+                            status_code=404)
+    try:
+        dias, parametros = validar_requisicao(modelo, await requisicao.json())
+    except JSONDecodeError:
+        return JSONResponse({'erro': 'O corpo não é um JSON válido'}, status_code=400)
+    except ValueError as erro:
+        return JSONResponse({'erro': str(erro)}, status_code=422)
+
+    origem, resultado = await asyncio.to_thread(consultar_caches, modelo, dias, parametros)
+    if resultado is None:
+        origem = 'lote'
+        try:
+            resultado = await requisicao.app.state.agrupador.simular(modelo, dias, parametros)
+        except ValueError as erro:
+            return JSONResponse({'erro': str(erro)}, status_code=422)
+
+    # A conversão dos números para texto domina o custo da resposta: os dias vão como inteiros
+    return JSONResponse({
+        'modelo': modelo,
+        'dias': dias,
+        'origem': origem,
+        't': list(range(dias + 1)),
+        'compartimentos': dict(zip(COMPARTIMENTOS[modelo], resultado.T.tolist())),
+    })
+
+
+async def saude(requisicao):
+    agrupador = requisicao.app.state.agrupador
+    return JSONResponse({
+        'cache': cache_simulacoes.estatisticas(),
+        'lotes': agrupador.lotes,
+        'trajetorias': agrupador.trajetorias,
+        'processos': PROCESSOS,
+    })
+
+
+@asynccontextmanager
+async def ciclo_de_vida(app):
+    # Processos iniciados do zero ("spawn"): copiar com fork um processo com threads pode travar
+    # Cada processo integra um lote inteiro: com uma thread do Numba por processo, os PROCESSOS
+    # processos não disputam os mesmos núcleos
+    executor = ProcessPoolExecutor(PROCESSOS, mp_context=multiprocessing.get_context('spawn'),
+                                   initializer=_inicializar_processo)
+    laco = asyncio.get_running_loop()
+    await asyncio.gather(*(laco.run_in_executor(executor, _aquecer) for _ in range(PROCESSOS)))
+    app.state.agrupador = AgrupadorLotes(executor)
+    try:
+        yield
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+
+app = Starlette(
+    routes=[
+        Route('/modelos', listar_modelos, methods=['GET']),
+        Route('/simulacoes/{modelo}', simular, methods=['POST']),
+        Route('/saude', saude, methods=['GET']),
+    ],
+    lifespan=ciclo_de_vida,
+)
@@ -0,0 +1,37 @@
+"""
+Núcleo de simulação dos modelos epidemiológicos, independente do Streamlit e do Matplotlib
+
+Os parâmetros entram como números e os resultados saem como arrays do NumPy,
+o que permite executar simulações em lote sem carregar a interface.
+"""
+
+from .modelos import (modelo_sir, modelo_sird, modelo_sird_vital, modelo_sird_k,
+                      jacobiana_sir, jacobiana_sird, jacobiana_sird_vital, jacobiana_sird_k,
+                      matriz_contato_duplo)
+from .simulador import (METODOS, BLOCO_DIAS, periodo, integrar, integrar_blocos, simular_sir, simular_sird,
+                        simular_sird_k, simular_sird_duplo, simular_sird_vital)
+from .jit import NUMBA_DISPONIVEL
+from .lote import (BACKENDS, derivadas_sir_lote, derivadas_sird_lote, derivadas_sird_duplo_lote,
+                   derivadas_sird_vital_lote, integrar_rk4_lote, integrar_lote, simular_sir_lote,
+                   simular_sird_lote, simular_sird_duplo_lote, simular_sird_vital_lote)
+from .cache import SIMULADORES, CacheResultados, cache_simulacoes, chave_simulacao, simular_em_cache
+from .analitico import fracao_suscetiveis_final, pico_infectados, dia_do_pico, resumo_sir, resumo_sird
+from .metapopulacao import matriz_mobilidade, simular_metapopulacao
+from .varredura import SIMULADORES_LOTE, COMPARTIMENTOS, executar_varredura, parametros_do_bloco, ler_blocos
+from .estocastico import simular_sir_estocastico, simular_sird_estocastico, bandas_quantis
+from .sensibilidade import (MODELOS_SENSIBILIDADE, integrar_sensibilidades, simular_sensibilidades,
+                            simular_sir_sensibilidades, simular_sird_sensibilidades,
+                            simular_sird_duplo_sensibilidades, simular_sird_vital_sensibilidades)
+from .sensibilidade_global import (INDICADORES, avaliar_amostras, amostras_saltelli, amostras_morris,
+                                     indices_sobol, indices_morris)
+from .calibracao import COLUNAS_CSV, carregar_serie, ajustar
+from .inferencia import (VEROSSIMILHANCAS, NUMERO_REPRODUCAO, amostrar_posterior, amostras_posterior,
+                         resumo_posterior, bandas_preditivas)
+from .intervencoes import normalizar_cronograma, simular_intervencoes
+from .armazenamento import (ARROW_DISPONIVEL, FORMATOS_ARQUIVO, metadados_simulacao, gravar_colunas,
+                            colunas_resultado, salvar_resultado, ler_resultado)
+from .rede import (SUSCETIVEL, INFECTADO, RECUPERADO, FALECIDO, rede_csr, carregar_arestas, rede_aleatoria,
+                   simular_rede_sir, simular_rede_sird)
+from .espacial import METODOS_DIFUSAO, laplaciano_esparso, simular_sir_espacial, simular_sird_espacial
+from .estratos import matriz_contato_estratos, derivadas_sird_vital_estratos, simular_sird_vital_estratos
+from .conjunto import QuantisP2, simular_conjunto, conjunto_em_cache
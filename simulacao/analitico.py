@@ -0,0 +1,166 @@
+import numpy as np
+from scipy.integrate import quad
+from scipy.special import lambertw
+
+from .simulador import simular_sir, simular_sird
+
+
+# Horizonte usado pelo caminho numérico quando nenhum número de dias é informado
+DIAS_PADRAO = 365
+
+
+def fracao_suscetiveis_final(R0, s0, i0):
+    """
+    Calcula a fração de suscetíveis que nunca se infecta (tamanho final da epidemia) pela função W de Lambert
+
+    Parâmetros:
+    R0: número básico de reprodução
+    s0: fração inicial de suscetíveis
+    i0: fração inicial de infectados
+
+    Retorna:
+    Fração de suscetíveis quando t tende ao infinito
+    """
+    if R0 == 0:
+        return s0
+    argumento = -R0 * s0 * np.exp(-R0 * (s0 + i0))
+    return float(-lambertw(argumento, 0).real / R0)
+
+
+def pico_infectados(R0, s0, i0):
+    """
+    Calcula a fração máxima de infectados simultâneos a partir da quantidade conservada i + s - ln(s)/R0
+
+    Parâmetros:
+    R0: número básico de reprodução
+    s0: fração inicial de suscetíveis
+    i0: fração inicial de infectados
+
+    Retorna:
+    Fração máxima de infectados, atingida quando s = 1/R0 (ou no instante inicial, se R0 * s0 <= 1)
+    """
+    if R0 * s0 <= 1:
+        return i0
+    return float(i0 + s0 - (1 + np.log(R0 * s0)) / R0)
+
+
+def dia_do_pico(beta, R0, s0, i0):
+    """
+    Calcula o instante do pico de infectados por quadratura, sem integrar o sistema de EDOs
+
+    Usa dt = -ds / (beta * s * i(s)), em que i(s) é obtido da quantidade conservada do modelo.
+
+    Parâmetros:
+    beta: taxa de transmissão
+    R0: número básico de reprodução
+    s0: fração inicial de suscetíveis
+    i0: fração inicial de infectados
+
+    Retorna:
+    Instante (em dias) em que o número de infectados é máximo
+    """
+    if R0 * s0 <= 1:
+        return 0.0
+
+    def integrando(s):
+        i = i0 + s0 - s + np.log(s / s0) / R0
+        return 1 / (beta * s * i)
+
+    tempo, _ = quad(integrando, 1 / R0, s0)
+    return tempo
+
+
+def _resumo_numerico(t, resultado):
+    """
+    Extrai o resumo da epidemia a partir de uma trajetória integrada numericamente
+
+    Parâmetros:
+    t: instantes de tempo da trajetória
+    resultado: array [len(t), compartimentos] com os compartimentos [S, I, R] ou [S, I, R, D]
+
+    Retorna:
+    Dicionário com o dia do pico, o máximo de infectados e os valores finais
+    """
+    I = resultado[:, 1]
+    resumo = {
+        'dia_pico': float(t[np.argmax(I)]),
+        'max_infectados': float(np.max(I)),
+        'S_final': float(resultado[-1, 0]),
+        'I_final': float(resultado[-1, 1]),
+        'R_final': float(resultado[-1, 2]),
+        'analitico': False,
+    }
+    if resultado.shape[1] == 4:
+        resumo['D_final'] = float(resultado[-1, 3])
+    return resumo
+
+
+def resumo_sird(N, I0, beta, gamma, mu, dias=None):
+    """
+    Resume a epidemia do modelo SIRD (pico e distribuição final) sem integrar as EDOs, quando possível
+
+    O caminho analítico fornece os valores assintóticos (t tendendo ao infinito). Se um número
+    de dias é informado, ou se gamma + mu = 0 (não há remoção de infectados), o modelo é
+    integrado numericamente.
+
+    Parâmetros:
+    N: população total
+    I0: infectados iniciais
+    beta: taxa de transmissão
+    gamma: taxa de recuperação
+    mu: taxa de mortalidade da doença
+    dias: horizonte da simulação; None para os valores assintóticos
+
+    Retorna:
+    Dicionário com R0, dia_pico, max_infectados, S_final, I_final, R_final, D_final
+    e a indicação de qual caminho foi usado (analitico)
+    """
+    remocao = gamma + mu
+    if dias is not None or remocao == 0:
+        t, resultado = simular_sird(N, I0, beta, gamma, mu, DIAS_PADRAO if dias is None else dias)
+        resumo = _resumo_numerico(t, resultado)
+        resumo['R0'] = beta / remocao if remocao > 0 else np.inf
+        return resumo
+
+    R0 = beta / remocao
+    s0 = (N - I0) / N
+    i0 = I0 / N
+
+    S_final = fracao_suscetiveis_final(R0, s0, i0) * N
+    removidos = N - S_final
+    return {
+        'R0': R0,
+        'dia_pico': dia_do_pico(beta, R0, s0, i0),
+        'max_infectados': pico_infectados(R0, s0, i0) * N,
+        'S_final': S_final,
+        'I_final': 0.0,
+        'R_final': removidos * gamma / remocao,
+        'D_final': removidos * mu / remocao,
+        'analitico': True,
+    }
+
+
+def resumo_sir(N, I0, beta, gamma, dias=None):
+    """
+    Resume a epidemia do modelo SIR (pico e distribuição final) sem integrar as EDOs, quando possível
+
+    Parâmetros:
+    N: população total
+    I0: infectados iniciais
+    beta: taxa de transmissão
+    gamma: taxa de recuperação
+    dias: horizonte da simulação; None para os valores assintóticos
+
+    Retorna:
+    Dicionário com R0, dia_pico, max_infectados, S_final, I_final, R_final
+    e a indicação de qual caminho foi usado (analitico)
+    """
+    if dias is not None or gamma == 0:
+        t, resultado = simular_sir(N, I0, beta, gamma, DIAS_PADRAO if dias is None else dias)
+        resumo = _resumo_numerico(t, resultado)
+        resumo['R0'] = beta / gamma if gamma > 0 else np.inf
+        return resumo
+
+    resumo = resumo_sird(N, I0, beta, gamma, 0.0)
+    del resumo['D_final']
+    return resumo
@@ -0,0 +1,174 @@
+"""
+Gravação e leitura dos resultados em formatos binários colunares (Parquet, Arrow IPC e NPZ)
+
+Os resultados são organizados em colunas (o dia e um compartimento por coluna, como no CSV
+das páginas) e podem ser convertidos para precisão simples. O modelo e os parâmetros da
+simulação são gravados junto com os dados: nos metadados do esquema, no Parquet e no Arrow,
+e em um array 'metadados' com o JSON correspondente, no NPZ.
+
+O arquivo Arrow IPC é gravado sem compressão e pode ser lido por mapeamento de memória,
+sem cópia; o NPZ também é gravado sem compressão, para que cada array seja lido diretamente.
+
+O pyarrow é opcional: sem ele, ARROW_DISPONIVEL é False e apenas 'npz' e 'csv' ficam disponíveis.
+"""
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .varredura import COMPARTIMENTOS
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    ARROW_DISPONIVEL = True
+except ImportError:
+    ARROW_DISPONIVEL = False
+
+
+# Formatos aceitos e a extensão usada para reconhecê-los pelo nome do arquivo
+FORMATOS_ARQUIVO = {'parquet': '.parquet', 'arrow': '.arrow', 'npz': '.npz', 'csv': '.csv'}
+
+
+def _valor_json(valor):
+    # Escalares do NumPy viram números do Python; o restante (funções de cronogramas, por exemplo) vira texto
+    return valor.item() if isinstance(valor, np.generic) else str(valor)
+
+
+def metadados_simulacao(modelo, parametros):
+    """
+    Monta os metadados gravados junto com um resultado
+
+    Parâmetros:
+    modelo: nome do modelo (por exemplo 'SIRD')
+    parametros: dicionário com os parâmetros da simulação
+
+    Retorna:
+    Dicionário {'modelo': texto, 'parametros': texto JSON}
+    """
+    return {'modelo': modelo, 'parametros': json.dumps(parametros, ensure_ascii=False, default=_valor_json)}
+
+
+def _formato_do_caminho(caminho):
+    extensao = Path(caminho).suffix.lower()
+    for formato, sufixo in FORMATOS_ARQUIVO.items():
+        if extensao == sufixo:
+            return formato
+    raise ValueError(f'Não foi possível deduzir o formato de {caminho}. Use um de {tuple(FORMATOS_ARQUIVO)}')
+
+
+def gravar_colunas(destino, colunas, formato, metadados=None, float32=False):
+    """
+    Grava um conjunto de colunas em um dos formatos de arquivo
+
+    Parâmetros:
+    destino: caminho do arquivo ou objeto de arquivo binário (por exemplo io.BytesIO)
+    colunas: dicionário {nome da coluna: valores}, todas com o mesmo comprimento
+    formato: 'parquet', 'arrow', 'npz' ou 'csv'
+    metadados: dicionário de textos gravado junto com os dados (ver metadados_simulacao);
+    ignorado no CSV, que não tem onde guardá-los
+    float32: se True, as colunas de ponto flutuante são gravadas em precisão simples
+    """
+    if formato not in FORMATOS_ARQUIVO:
+        raise ValueError(f'Formato desconhecido: {formato}. Use um de {tuple(FORMATOS_ARQUIVO)}')
+    if formato in ('parquet', 'arrow') and not ARROW_DISPONIVEL:
+        raise ImportError(f'O formato {formato} requer o pacote pyarrow')
+
+    colunas = {nome: np.asarray(valores) for nome, valores in colunas.items()}
+    if float32:
+        colunas = {nome: valores.astype(np.float32) if valores.dtype == np.float64 else valores
+                   for nome, valores in colunas.items()}
+    metadados = dict(metadados or {})
+
+    if formato == 'csv':
+        pd.DataFrame(colunas).to_csv(destino, index=False)
+    elif formato == 'npz':
+        np.savez(destino, metadados=np.array(json.dumps(metadados, ensure_ascii=False)), **colunas)
+    else:
+        tabela = pa.table(colunas).replace_schema_metadata(metadados)
+        if formato == 'parquet':
+            pq.write_table(tabela, destino)
+        else:
+            with pa.ipc.new_file(destino, tabela.schema) as escritor:
+                escritor.write_table(tabela)
+
+
+def colunas_resultado(modelo, t, resultado):
+    """
+    Organiza uma trajetória, ou um lote de trajetórias, em colunas
+
+    Parâmetros:
+    modelo: nome do modelo, que define os nomes dos compartimentos (ver COMPARTIMENTOS)
+    t: instantes da simulação
+    resultado: array [tempo, compartimento] ou [lote, tempo, compartimento]
+
+    Retorna:
+    Dicionário {nome da coluna: valores}; para um lote, em formato longo, com uma coluna
+    'indice' identificando a trajetória
+    """
+    resultado = np.asarray(resultado)
+    if resultado.ndim == 2:
+        resultado = resultado[np.newaxis]
+        colunas = {}
+    else:
+        colunas = {'indice': np.repeat(np.arange(resultado.shape[0]), len(t))}
+    colunas['Dia'] = np.tile(t, resultado.shape[0])
+    for k, compartimento in enumerate(COMPARTIMENTOS[modelo]):
+        colunas[compartimento] = resultado[:, :, k].ravel()
+    return colunas
+
+
+def salvar_resultado(caminho, modelo, t, resultado, parametros=None, formato=None, float32=False):
+    """
+    Grava o resultado de uma simulação com o modelo e os parâmetros nos metadados
+
+    Parâmetros:
+    caminho: arquivo de destino
+    modelo: nome do modelo ('SIR', 'SIRD', 'SIRD_duplo' ou 'SIRD_vital')
+    t, resultado: saída de uma função simular_* ou simular_*_lote
+    parametros: dicionário com os parâmetros da simulação
+    formato: 'parquet', 'arrow', 'npz' ou 'csv'; por padrão, deduzido da extensão do caminho
+    float32: se True, grava os valores em precisão simples
+    """
+    formato = formato or _formato_do_caminho(caminho)
+    gravar_colunas(caminho, colunas_resultado(modelo, t, resultado), formato,
+                   metadados_simulacao(modelo, parametros or {}), float32)
+
+
+def ler_resultado(caminho, formato=None):
+    """
+    Lê um arquivo gravado por salvar_resultado ou pelos downloads das páginas
+
+    O Arrow IPC é lido por mapeamento de memória: as colunas devolvidas apontam para o arquivo,
+    sem cópia, e só são carregadas à medida que são acessadas.
+
+    Parâmetros:
+    caminho: arquivo a ser lido
+    formato: 'parquet', 'arrow', 'npz' ou 'csv'; por padrão, deduzido da extensão do caminho
+
+    Retorna:
+    Tupla (colunas, metadados): dicionário {nome da coluna: array} e dicionário de metadados,
+    com os parâmetros já convertidos do JSON
+    """
+    formato = formato or _formato_do_caminho(caminho)
+    if formato == 'csv':
+        tabela = pd.read_csv(caminho)
+        return {nome: tabela[nome].to_numpy() for nome in tabela.columns}, {}
+    if formato == 'npz':
+        with np.load(caminho) as arquivo:
+            colunas = {nome: arquivo[nome] for nome in arquivo.files if nome != 'metadados'}
+            metadados = json.loads(arquivo['metadados'].item()) if 'metadados' in arquivo.files else {}
+    else:
+        if not ARROW_DISPONIVEL:
+            raise ImportError(f'O formato {formato} requer o pacote pyarrow')
+        if formato == 'parquet':
+            tabela = pq.read_table(caminho, memory_map=True)
+        else:
+            tabela = pa.ipc.open_file(pa.memory_map(str(caminho))).read_all()
+        colunas = {nome: tabela.column(nome).to_numpy() for nome in tabela.column_names}
+        metadados = {chave.decode(): valor.decode() for chave, valor in (tabela.schema.metadata or {}).items()}
+
+    if 'parametros' in metadados:
+        metadados['parametros'] = json.loads(metadados['parametros'])
+    return colunas, metadados
@@ -0,0 +1,280 @@
+import io
+import os
+import sqlite3
+from collections import OrderedDict
+from numbers import Real
+from pathlib import Path
+from threading import Lock, local
+
+import numpy as np
+
+from .simulador import simular_sir, simular_sird, simular_sird_duplo, simular_sird_vital
+
+
+# Funções de simulação disponíveis, indexadas pelo nome do modelo
+SIMULADORES = {
+    'SIR': simular_sir,
+    'SIRD': simular_sird,
+    'SIRD_duplo': simular_sird_duplo,
+    'SIRD_vital': simular_sird_vital,
+}
+
+
+# Variável de ambiente com o arquivo do nível em disco de cache_simulacoes; a interface e o
+# serviço HTTP que apontam para o mesmo arquivo reaproveitam os resultados um do outro
+VARIAVEL_ARQUIVO_CACHE = 'EPIMODEL_CACHE'
+
+
+def _normalizar_chave(chave):
+    # Números iguais (1 e 1.0) são a mesma chave no dicionário; no disco também precisam ser
+    # Os tipos concretos são testados antes de Real, cuja verificação é bem mais lenta
+    if isinstance(chave, tuple):
+        return tuple([_normalizar_chave(item) for item in chave])
+    if isinstance(chave, (str, bool)):
+        return chave
+    if isinstance(chave, (int, float, Real)):
+        return float(chave)
+    return chave
+
+
+def _persistivel(chave):
+    # No disco a chave é o seu repr, que só identifica o resultado entre processos para textos, números
+    # e tuplas deles; o repr de uma função, por exemplo, traz um endereço de memória que se repete em
+    # outros processos. Chaves com outros objetos ficam apenas na memória
+    if isinstance(chave, tuple):
+        return all(_persistivel(item) for item in chave)
+    return chave is None or isinstance(chave, (str, Real))
+
+
+def _somente_leitura(valor):
+    # Arrays lidos do disco são compartilhados como os da memória, então também não podem ser alterados
+    if isinstance(valor, np.ndarray):
+        valor.flags.writeable = False
+    elif isinstance(valor, (tuple, list)):
+        for item in valor:
+            _somente_leitura(item)
+    return valor
+
+
+def _serializar(valor):
+    # Apenas arrays numéricos, isolados ou em tuplas, vão para o disco, no formato .npy: ao contrário
+    # do pickle, ler um blob adulterado não executa código. Os demais valores ficam só na memória
+    matrizes = valor if isinstance(valor, tuple) else (valor,)
+    if not matrizes or not all(isinstance(m, np.ndarray) and not m.dtype.hasobject for m in matrizes):
+        return None
+    buffer = io.BytesIO()
+    for matriz in matrizes:
+        np.save(buffer, matriz, allow_pickle=False)
+    return len(matrizes) if isinstance(valor, tuple) else 0, buffer.getvalue()
+
+
+def _desserializar(partes, blob):
+    # partes é 0 para um array isolado ou o tamanho da tupla de arrays
+    buffer = io.BytesIO(blob)
+    if partes == 0:
+        return np.load(buffer, allow_pickle=False)
+    return tuple(np.load(buffer, allow_pickle=False) for _ in range(partes))
+
+
+class CacheResultados:
+    """
+    Cache limitado de resultados de simulação, com descarte do item usado há mais tempo (LRU)
+
+    O acesso é protegido por uma trava, de forma que uma única instância pode ser
+    compartilhada por todas as sessões atendidas pelo mesmo processo.
+
+    Opcionalmente, os resultados também são gravados em um banco SQLite. Esse nível em disco
+    não tem limite de tamanho e é compartilhado por todos os processos que usam o mesmo arquivo:
+    uma chave que não está na memória é procurada no disco antes de ser calculada. No modo WAL,
+    os leitores não esperam pelos escritores e nunca encontram um resultado pela metade. Só
+    arrays numéricos (ou tuplas deles) são gravados, no formato .npy e lidos sem pickle; os
+    demais resultados, e os de chaves com objetos que não são textos ou números (como funções),
+    ficam apenas na memória.
+    """
+
+    def __init__(self, capacidade=256, arquivo=None):
+        """
+        Parâmetros:
+        capacidade: número máximo de resultados mantidos em memória
+        arquivo: caminho do banco SQLite do nível em disco, ou None para manter os resultados apenas em memória
+        """
+        self.capacidade = capacidade
+        self.arquivo = None if arquivo is None else Path(arquivo)
+        if self.arquivo is not None:
+            self.arquivo.parent.mkdir(parents=True, exist_ok=True)
+        self.acertos = 0
+        self.acertos_disco = 0
+        self.falhas = 0
+        self._itens = OrderedDict()
+        self._trava = Lock()
+        # Uma conexão por thread e por processo: conexões do SQLite não podem ser compartilhadas
+        self._conexoes = local()
+
+    def _conexao(self):
+        conexao = getattr(self._conexoes, 'conexao', None)
+        if conexao is None or self._conexoes.processo != os.getpid():
+            conexao = sqlite3.connect(self.arquivo, timeout=30, isolation_level=None)
+            conexao.execute('PRAGMA journal_mode=WAL')
+            conexao.execute('PRAGMA synchronous=NORMAL')
+            conexao.execute('CREATE TABLE IF NOT EXISTS matrizes '
+                            '(chave TEXT PRIMARY KEY, partes INTEGER NOT NULL, valor BLOB NOT NULL)')
+            self._conexoes.conexao, self._conexoes.processo = conexao, os.getpid()
+        return conexao
+
+    def _ler_disco(self, chave):
+        if self.arquivo is None or not _persistivel(chave):
+            return None
+        linha = self._conexao().execute('SELECT partes, valor FROM matrizes WHERE chave = ?',
+                                        (repr(_normalizar_chave(chave)),)).fetchone()
+        return None if linha is None else _somente_leitura(_desserializar(*linha))
+
+    def _gravar_disco(self, chave, valor):
+        if self.arquivo is None or not _persistivel(chave):
+            return
+        serializado = _serializar(valor)
+        if serializado is not None:
+            self._conexao().execute('INSERT OR REPLACE INTO matrizes VALUES (?, ?, ?)',
+                                    (repr(_normalizar_chave(chave)), *serializado))
+
+    def _inserir(self, chave, valor):
+        # Deve ser chamado com a trava adquirida
+        self._itens[chave] = valor
+        self._itens.move_to_end(chave)
+        while len(self._itens) > self.capacidade:
+            self._itens.popitem(last=False)
+
+    def consultar(self, chave):
+        """
+        Procura um resultado na memória e, se não estiver lá, no disco, sem calculá-lo
+
+        Parâmetros:
+        chave: objeto imutável que identifica o resultado
+
+        Retorna:
+        O resultado armazenado, ou None se a chave não estiver no cache
+        """
+        with self._trava:
+            if chave in self._itens:
+                self.acertos += 1
+                self._itens.move_to_end(chave)
+                return self._itens[chave]
+
+        valor = self._ler_disco(chave)
+        with self._trava:
+            if valor is None:
+                self.falhas += 1
+            else:
+                self.acertos_disco += 1
+                self._inserir(chave, valor)
+        return valor
+
+    def guardar(self, chave, valor):
+        """
+        Armazena um resultado calculado fora do cache, na memória e no disco
+
+        Parâmetros:
+        chave: objeto imutável que identifica o resultado
+        valor: resultado a armazenar
+        """
+        self._gravar_disco(chave, valor)
+        with self._trava:
+            self._inserir(chave, valor)
+
+    def obter(self, chave, calcular):
+        """
+        Devolve o resultado associado à chave, calculando-o apenas se ainda não estiver no cache
+
+        Parâmetros:
+        chave: objeto imutável que identifica o resultado
+        calcular: função sem argumentos chamada quando a chave não está no cache
+
+        Retorna:
+        O resultado armazenado ou recém-calculado
+        """
+        valor = self.consultar(chave)
+        if valor is None:
+            # O cálculo ocorre fora da trava para não bloquear as demais sessões
+            valor = calcular()
+            self.guardar(chave, valor)
+        return valor
+
+    def estatisticas(self):
+        """
+        Retorna:
+        Dicionário com o número de acertos (na memória e no disco), falhas, itens armazenados
+        em memória e a capacidade do cache
+        """
+        with self._trava:
+            return {
+                'acertos': self.acertos,
+                'acertos_disco': self.acertos_disco,
+                'falhas': self.falhas,
+                'itens': len(self._itens),
+                'capacidade': self.capacidade,
+            }
+
+    def limpar(self):
+        """
+        Remove todos os resultados, inclusive os gravados no disco, e zera os contadores
+        """
+        with self._trava:
+            self._itens.clear()
+            self.acertos = 0
+            self.acertos_disco = 0
+            self.falhas = 0
+            if self.arquivo is not None:
+                self._conexao().execute('DELETE FROM matrizes')
+
+
+# Instância compartilhada entre reexecuções e sessões do mesmo processo; cada item é um bloco
+# de BLOCO_DIAS dias de uma trajetória, por isso a capacidade comporta muitos blocos. Com a
+# variável EPIMODEL_CACHE definida, os blocos também são compartilhados entre processos pelo disco
+cache_simulacoes = CacheResultados(capacidade=4096, arquivo=os.environ.get(VARIAVEL_ARQUIVO_CACHE))
+
+
+def chave_simulacao(modelo, parametros):
+    """
+    Monta a chave do cache a partir do modelo e dos parâmetros
+
+    O número de dias não faz parte da chave: a trajetória é guardada em blocos
+    (ver integrar_blocos), e horizontes diferentes compartilham os blocos iniciais.
+
+    Parâmetros:
+    modelo: nome do modelo, uma das chaves de SIMULADORES
+    parametros: dicionário com os parâmetros nomeados do simulador
+
+    Retorna:
+    Tupla imutável (modelo, parâmetros ordenados)
+    """
+    return (modelo, tuple(sorted(parametros.items())))
+
+
+def simular_em_cache(modelo, dias, **parametros):
+    """
+    Executa a simulação do modelo reaproveitando os blocos de dias já calculados
+
+    Aumentar o horizonte de uma simulação já feita integra apenas os blocos novos, a partir
+    do estado final do último bloco guardado; os dias anteriores são idênticos aos já calculados.
+
+    Parâmetros:
+    modelo: nome do modelo, uma das chaves de SIMULADORES
+    dias: número de dias de simulação
+    parametros: parâmetros nomeados repassados à função de simulação
+
+    Retorna:
+    Tupla (t, resultado), com arrays somente leitura, pois são compartilhados entre sessões
+    """
+    chave = chave_simulacao(modelo, parametros)
+
+    def memoria(k, calcular):
+        def calcular_bloco():
+            bloco = calcular()
+            bloco.flags.writeable = False
+            return bloco
+
+        return cache_simulacoes.obter((*chave, k), calcular_bloco)
+
+    t, resultado = SIMULADORES[modelo](dias=dias, memoria=memoria, **parametros)
+    t.flags.writeable = False
+    resultado.flags.writeable = False
+    return t, resultado
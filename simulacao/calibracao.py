@@ -0,0 +1,172 @@
+"""
+Ajuste (calibração) dos parâmetros dos modelos a séries observadas
+
+O gradiente da função objetivo vem das sensibilidades diretas integradas junto com a
+trajetória (ver simulacao.sensibilidade), e não de diferenças finitas. Várias partidas
+podem ser executadas em paralelo para reduzir o risco de mínimos locais.
+"""
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy.optimize import least_squares, minimize
+from scipy.stats import qmc
+
+from .sensibilidade import MODELOS_SENSIBILIDADE, simular_sensibilidades
+
+
+# Colunas do CSV exportado pelas páginas e o compartimento (índice no vetor de estado) de cada uma
+COLUNAS_CSV = {
+    'Susceptíveis': 0,
+    'Infectados': 1,
+    'Recuperados': 2,
+    'Mortos': 3,
+    'Falecidos': 3,
+}
+
+PERDAS = ('quadrados', 'poisson')
+
+# Limites padrão de cada parâmetro, os mesmos dos sliders da interface
+LIMITES_PADRAO = (0.0, 1.0)
+
+# Tolerâncias do integrador durante o ajuste; bem abaixo do ruído típico de séries observadas
+RTOL_AJUSTE = 1e-6
+ATOL_AJUSTE = 1e-6
+
+
+def carregar_serie(arquivo, colunas=None):
+    """
+    Lê uma série observada no mesmo formato do CSV exportado pelas páginas
+
+    Parâmetros:
+    arquivo: caminho ou objeto de arquivo do CSV, com a coluna 'Dia' e uma ou mais colunas de COLUNAS_CSV
+    colunas: colunas a usar no ajuste (padrão: todas as reconhecidas)
+
+    Retorna:
+    Tupla (t, observados, compartimentos): instantes, array [len(t), len(colunas)] com os valores
+    observados e lista com o índice do compartimento correspondente a cada coluna
+    """
+    dados = pd.read_csv(arquivo)
+    if colunas is None:
+        colunas = [coluna for coluna in dados.columns if coluna in COLUNAS_CSV]
+    if not colunas:
+        raise ValueError(f'Nenhuma coluna reconhecida no arquivo; use uma de {list(COLUNAS_CSV)}')
+
+    t = dados['Dia'].to_numpy(dtype=float)
+    observados = dados[colunas].to_numpy(dtype=float)
+    return t, observados, [COLUNAS_CSV[coluna] for coluna in colunas]
+
+
+def _objetivo(modelo, t, observados, compartimentos, fixos, perda):
+    """
+    Monta as funções da perda escolhida, compartilhando uma única integração entre valor e gradiente
+
+    Retorna:
+    Para 'quadrados', o par (resíduos, jacobiana dos resíduos); para 'poisson', a função que
+    devolve (log-verossimilhança negativa, gradiente)
+    """
+    nomes = MODELOS_SENSIBILIDADE[modelo]['parametros']
+    # Cada compartimento observado é normalizado pela sua escala, para que todos pesem de forma semelhante
+    escala = np.maximum(np.abs(observados).max(axis=0), 1.0)
+    memoria = {}
+
+    def simular(x):
+        chave = tuple(x)
+        if chave not in memoria:
+            memoria.clear()
+            resultado, sensibilidades = simular_sensibilidades(modelo, dict(zip(nomes, x)), fixos, t,
+                                                               rtol=RTOL_AJUSTE, atol=ATOL_AJUSTE)
+            memoria[chave] = (resultado[:, compartimentos], sensibilidades[:, compartimentos, :])
+        return memoria[chave]
+
+    if perda == 'quadrados':
+        def residuos(x):
+            previstos, _ = simular(x)
+            return ((previstos - observados) / escala).ravel()
+
+        def jacobiana(x):
+            _, sensibilidades = simular(x)
+            return (sensibilidades / escala[None, :, None]).reshape(-1, len(nomes))
+
+        return residuos, jacobiana
+
+    def log_verossimilhanca_negativa(x):
+        # Observações tratadas como contagens de Poisson com média igual à trajetória do modelo
+        previstos, sensibilidades = simular(x)
+        previstos = np.maximum(previstos, 1e-9)
+        valor = np.sum(previstos - observados * np.log(previstos))
+        gradiente = np.einsum('tc,tcp->p', 1 - observados / previstos, sensibilidades)
+        return valor, gradiente
+
+    return log_verossimilhanca_negativa
+
+
+def _ajustar_partida(modelo, t, observados, compartimentos, fixos, chute, limites, perda):
+    """
+    Executa uma partida do ajuste a partir de um chute inicial
+
+    Retorna:
+    Dicionário com os parâmetros ajustados, o custo final, o número de avaliações e o status
+    """
+    nomes = MODELOS_SENSIBILIDADE[modelo]['parametros']
+    inferior, superior = np.array(limites, dtype=float).T
+
+    if perda == 'quadrados':
+        residuos, jacobiana = _objetivo(modelo, t, observados, compartimentos, fixos, perda)
+        solucao = least_squares(residuos, chute, jac=jacobiana, bounds=(inferior, superior), method='trf')
+        custo, avaliacoes = solucao.cost, solucao.nfev
+    else:
+        funcao = _objetivo(modelo, t, observados, compartimentos, fixos, perda)
+        solucao = minimize(funcao, chute, jac=True, method='L-BFGS-B', bounds=list(zip(inferior, superior)))
+        custo, avaliacoes = solucao.fun, solucao.nfev
+
+    ajuste = dict(zip(nomes, (float(valor) for valor in solucao.x)))
+    ajuste.update({'custo': float(custo), 'avaliacoes': int(avaliacoes), 'sucesso': bool(solucao.success)})
+    return ajuste
+
+
+def ajustar(modelo, t, observados, compartimentos, fixos, chute=None, limites=None, perda='quadrados',
+            partidas=1, processos=None, semente=None):
+    """
+    Ajusta os parâmetros de um modelo a uma série observada
+
+    Parâmetros:
+    modelo: nome do modelo, uma das chaves de MODELOS_SENSIBILIDADE ('SIR', 'SIRD', ...)
+    t, observados, compartimentos: série observada, como devolvida por carregar_serie
+    fixos: dicionário com os valores não ajustados (por exemplo {'N': 10_000, 'I0': 100})
+    chute: chute inicial dos parâmetros, na ordem de MODELOS_SENSIBILIDADE[modelo]['parametros']
+    limites: lista de pares (mínimo, máximo) para cada parâmetro (padrão: LIMITES_PADRAO)
+    perda: 'quadrados' (mínimos quadrados) ou 'poisson' (máxima verossimilhança para contagens)
+    partidas: número de partidas; além do chute, as demais são sorteadas por hipercubo latino nos limites
+    processos: número de processos para as partidas (None: todos os núcleos; 1: sem paralelismo)
+    semente: semente do sorteio das partidas
+
+    Retorna:
+    Dicionário da melhor partida com os parâmetros ajustados, o custo, o número de avaliações,
+    o status de convergência e a lista com o resultado de todas as partidas
+    """
+    if perda not in PERDAS:
+        raise ValueError(f'Perda desconhecida: {perda}. Use uma de {PERDAS}')
+
+    nomes = MODELOS_SENSIBILIDADE[modelo]['parametros']
+    limites = limites or [LIMITES_PADRAO] * len(nomes)
+    inferior, superior = np.array(limites, dtype=float).T
+    if chute is None:
+        chute = (inferior + superior) / 2
+
+    chutes = [np.clip(np.asarray(chute, dtype=float), inferior, superior)]
+    if partidas > 1:
+        amostrador = qmc.LatinHypercube(d=len(nomes), seed=semente)
+        chutes += list(qmc.scale(amostrador.random(partidas - 1), inferior, superior))
+
+    argumentos = (modelo, t, observados, compartimentos, fixos)
+    if processos == 1 or len(chutes) == 1:
+        resultados = [_ajustar_partida(*argumentos, x0, limites, perda) for x0 in chutes]
+    else:
+        with ProcessPoolExecutor(max_workers=processos) as executor:
+            tarefas = [executor.submit(_ajustar_partida, *argumentos, x0, limites, perda) for x0 in chutes]
+            resultados = [tarefa.result() for tarefa in tarefas]
+
+    melhor = dict(min(resultados, key=lambda ajuste: ajuste['custo']))
+    melhor['partidas'] = resultados
+    return melhor
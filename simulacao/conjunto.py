@@ -0,0 +1,183 @@
+"""
+Conjuntos (ensembles) de simulações resumidos por quantis calculados em fluxo
+
+Em vez de guardar todas as trajetórias para depois calcular os quantis de cada dia, cada
+trajetória atualiza estimadores P² (Jain e Chlamtac, 1985) assim que é integrada e é descartada
+em seguida. Cada estimador guarda apenas 5 marcadores por quantil, dia e compartimento, de modo
+que a memória é proporcional ao número de dias, qualquer que seja o tamanho do conjunto.
+"""
+import numpy as np
+
+from .cache import cache_simulacoes
+from .varredura import SIMULADORES_LOTE
+
+
+class QuantisP2:
+    """
+    Estimadores P² de vários quantis para um array de valores, atualizados uma observação por vez
+
+    Cada posição do array (por exemplo, cada dia e compartimento) tem os seus próprios marcadores,
+    e todas as posições são atualizadas juntas, com operações vetorizadas.
+    """
+
+    def __init__(self, quantis, forma):
+        """
+        Parâmetros:
+        quantis: quantis estimados, entre 0 e 1
+        forma: formato de cada observação (por exemplo (dias + 1, compartimentos))
+        """
+        self.quantis = np.asarray(quantis, dtype=float)
+        self.forma = tuple(forma)
+        self.contagem = 0
+        self._celulas = int(np.prod(self.forma))
+        # Os quantis são empilhados: a coluna c dos marcadores corresponde ao quantil c // celulas
+        p = np.repeat(self.quantis, self._celulas)
+
+        # Alturas e posições dos 5 marcadores, [marcador, quantis * posições do array]
+        self._alturas = np.empty((5, p.size))
+        self._posicoes = np.tile(np.arange(5.0)[:, np.newaxis], (1, p.size))
+        # Posições desejadas dos marcadores e o seu incremento a cada observação
+        self._desejadas = np.array([0 * p, 2 * p, 4 * p, 2 + 2 * p, 4 + 0 * p])
+        self._incrementos = np.array([0 * p, p / 2, p, (1 + p) / 2, 1 + 0 * p])
+        # As 5 primeiras observações são guardadas e ordenadas para inicializar os marcadores
+        self._iniciais = np.empty((5, self._celulas))
+
+    def adicionar(self, valores):
+        """
+        Incorpora uma observação
+
+        Parâmetros:
+        valores: array com o formato self.forma
+        """
+        x = np.asarray(valores, dtype=float).reshape(-1)
+        if self.contagem < 5:
+            self._iniciais[self.contagem] = x
+            self.contagem += 1
+            if self.contagem == 5:
+                self._alturas[:] = np.tile(np.sort(self._iniciais, axis=0), (1, len(self.quantis)))
+            return
+        self.contagem += 1
+
+        x = np.tile(x, len(self.quantis))
+        q, n = self._alturas, self._posicoes
+        # Célula k em que a observação cai (q[k] <= x < q[k + 1]); os extremos são estendidos se preciso
+        np.minimum(q[0], x, out=q[0])
+        np.maximum(q[4], x, out=q[4])
+        k = (x >= q[1]).astype(np.int8) + (x >= q[2]) + (x >= q[3])
+        # Os marcadores acima da célula k avançam uma posição
+        n[1:] += np.arange(1, 5)[:, np.newaxis] > k
+        self._desejadas += self._incrementos
+
+        # Ajusta, apenas onde for preciso, os marcadores centrais que se afastaram da posição desejada
+        for i in (1, 2, 3):
+            d = self._desejadas[i] - n[i]
+            ajustar = np.flatnonzero(((d >= 1) & (n[i + 1] - n[i] > 1)) | ((d <= -1) & (n[i - 1] - n[i] < -1)))
+            if not ajustar.size:
+                continue
+            d = np.sign(d[ajustar])
+            anterior, atual, seguinte = q[i - 1, ajustar], q[i, ajustar], q[i + 1, ajustar]
+            n_anterior, n_atual, n_seguinte = n[i - 1, ajustar], n[i, ajustar], n[i + 1, ajustar]
+            parabolica = atual + d / (n_seguinte - n_anterior) * (
+                (n_atual - n_anterior + d) * (seguinte - atual) / (n_seguinte - n_atual)
+                + (n_seguinte - n_atual - d) * (atual - anterior) / (n_atual - n_anterior))
+            acima = d > 0
+            linear = atual + d * (np.where(acima, seguinte, anterior) - atual) / (
+                np.where(acima, n_seguinte, n_anterior) - n_atual)
+            q[i, ajustar] = np.where((anterior < parabolica) & (parabolica < seguinte), parabolica, linear)
+            n[i, ajustar] += d
+
+    def valores(self):
+        """
+        Retorna:
+        Array [len(quantis), *forma] com as estimativas atuais dos quantis; com menos de 5 observações,
+        os quantis exatos das observações recebidas
+        """
+        if self.contagem < 5:
+            if self.contagem == 0:
+                raise ValueError('Nenhuma observação foi adicionada')
+            estimativas = np.quantile(self._iniciais[:self.contagem], self.quantis, axis=0)
+        else:
+            estimativas = self._alturas[2]
+        return estimativas.reshape(len(self.quantis), *self.forma)
+
+
+def _sortear(parametros, n, gerador):
+    """
+    Sorteia os parâmetros de n execuções
+
+    Retorna:
+    Dicionário {nome: array [n]}
+    """
+    sorteados = {}
+    for nome, valor in parametros.items():
+        if callable(valor):
+            sorteados[nome] = np.asarray(valor(gerador, n), dtype=float)
+        elif np.ndim(valor) == 1 and len(valor) == 2:
+            sorteados[nome] = gerador.uniform(valor[0], valor[1], n)
+        else:
+            sorteados[nome] = np.full(n, float(valor))
+    return sorteados
+
+
+def simular_conjunto(modelo, fixos, parametros, dias, execucoes=1_000, quantis=(0.05, 0.5, 0.95),
+                     tamanho_lote=250, semente=None, passos_por_dia=4, backend='auto'):
+    """
+    Simula um conjunto de execuções com parâmetros sorteados e resume as trajetórias por quantis
+
+    As execuções são integradas em lotes de tamanho_lote trajetórias; cada lote atualiza os
+    estimadores P² e é descartado, de modo que a memória não depende do número de execuções.
+
+    Parâmetros:
+    modelo: nome do modelo ('SIR', 'SIRD', 'SIRD_duplo' ou 'SIRD_vital')
+    fixos: dicionário com a população e os infectados iniciais (por exemplo {'N': 10_000, 'I0': 100})
+    parametros: dicionário {nome: valor} com todos os parâmetros do modelo, em que cada valor é um
+    número (fixo), um par (mínimo, máximo) (distribuição uniforme) ou uma função f(gerador, n) que
+    devolve n valores sorteados
+    dias: número de dias de simulação
+    execucoes: número de execuções do conjunto
+    quantis: quantis das bandas
+    tamanho_lote: número de execuções integradas de cada vez
+    semente: semente do sorteio dos parâmetros
+    passos_por_dia, backend: repassados ao Runge-Kutta em lote
+
+    Retorna:
+    Tupla (t, bandas), com bandas no formato [len(quantis), len(t), compartimentos] (o mesmo de bandas_quantis)
+    """
+    gerador = np.random.default_rng(semente)
+    estimador = None
+    for inicio in range(0, execucoes, tamanho_lote):
+        n = min(tamanho_lote, execucoes - inicio)
+        t, resultado = SIMULADORES_LOTE[modelo](dias=dias, passos_por_dia=passos_por_dia, backend=backend,
+                                                **_sortear(parametros, n, gerador), **fixos)
+        if estimador is None:
+            estimador = QuantisP2(quantis, resultado.shape[1:])
+        for trajetoria in resultado:
+            estimador.adicionar(trajetoria)
+    return t, estimador.valores()
+
+
+def conjunto_em_cache(modelo, fixos, parametros, dias, execucoes=1_000, quantis=(0.05, 0.5, 0.95), semente=0,
+                      backend='auto'):
+    """
+    Executa simular_conjunto guardando as bandas no cache compartilhado pelas sessões
+
+    Parâmetros:
+    Os mesmos de simular_conjunto; os valores de parametros devem ser números ou pares (mínimo, máximo),
+    e a semente fixa garante que a mesma configuração produz sempre as mesmas bandas. O backend não
+    entra na chave, pois os dois caminhos concordam até o arredondamento; fora da thread principal
+    (como nas páginas do Streamlit), o backend numba usa o núcleo sequencial (ver em_thread_principal)
+
+    Retorna:
+    Tupla (t, bandas), com arrays somente leitura, pois são compartilhados entre sessões
+    """
+    chave = ('conjunto', modelo, tuple(sorted(fixos.items())), tuple(sorted(parametros.items())),
+             dias, execucoes, tuple(quantis), semente)
+
+    def calcular():
+        t, bandas = simular_conjunto(modelo, fixos, parametros, dias, execucoes, quantis, semente=semente,
+                                     backend=backend)
+        t.flags.writeable = False
+        bandas.flags.writeable = False
+        return t, bandas
+
+    return cache_simulacoes.obter(chave, calcular)
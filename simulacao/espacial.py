@@ -0,0 +1,193 @@
+"""
+Modelos SIR e SIRD espaciais: uma grade 2D de células acopladas por difusão
+
+Cada célula segue a dinâmica do modelo SIRD (derivadas_sird_lote, com N igual à população
+atual da célula) e os vivos (S, I e R) se espalham para as células vizinhas com coeficiente
+de difusão difusao, em células² por dia. As bordas são refletoras: ninguém sai da grade.
+
+Cada passo de tempo alterna a reação (um passo de Runge-Kutta de todas as células de uma vez,
+com o núcleo compilado do Numba ou com as derivadas vetorizadas do NumPy) e a difusão, que
+pode ser feita de duas formas:
+- 'espectral': solução exata do laplaciano discreto de 5 pontos no espaço da transformada
+  discreta de cossenos, que respeita as bordas refletoras; sem restrição de estabilidade
+- 'esparso': laplaciano de 5 pontos como matriz esparsa, avançado com Euler explícito em
+  subpassos pequenos o bastante para serem estáveis
+
+Os estados de cada dia podem ser gravados em um arquivo .npy mapeado em memória, que depois
+é lido com np.load(arquivo, mmap_mode='r') para animar a propagação sem carregar tudo na memória.
+"""
+import numpy as np
+from scipy import fft, sparse
+
+from .jit import NUMBA_DISPONIVEL, em_thread_principal, rk4_sird_celulas_jit, rk4_sird_celulas_sequencial_jit
+from .lote import BACKENDS, derivadas_sird_lote
+from .simulador import periodo
+
+
+METODOS_DIFUSAO = ('espectral', 'esparso')
+
+
+def _autovalores_laplaciano(forma):
+    """
+    Autovalores do laplaciano discreto de 5 pontos com bordas refletoras, na base de cossenos da DCT-II
+
+    Retorna:
+    Array com o formato da grade
+    """
+    linhas, colunas = forma
+    lambda_y = 2 * (np.cos(np.pi * np.arange(linhas) / linhas) - 1)
+    lambda_x = 2 * (np.cos(np.pi * np.arange(colunas) / colunas) - 1)
+    return lambda_y[:, np.newaxis] + lambda_x[np.newaxis, :]
+
+
+def laplaciano_esparso(forma):
+    """
+    Monta o laplaciano discreto de 5 pontos de uma grade com bordas refletoras
+
+    Parâmetros:
+    forma: tupla (linhas, colunas) da grade
+
+    Retorna:
+    Matriz scipy.sparse CSR [linhas * colunas, linhas * colunas], para estados achatados em ordem C
+    """
+    def segunda_diferenca(n):
+        # Nas bordas refletoras, o vizinho que falta é a própria célula
+        diagonal = np.full(n, -2.0)
+        diagonal[[0, -1]] += 1
+        return sparse.diags([np.ones(n - 1), diagonal, np.ones(n - 1)], [-1, 0, 1])
+
+    linhas, colunas = forma
+    return sparse.csr_array(sparse.kron(segunda_diferenca(linhas), sparse.identity(colunas))
+                            + sparse.kron(sparse.identity(linhas), segunda_diferenca(colunas)))
+
+
+def _reacao_numpy(Y, beta, gamma, mu, h):
+    """
+    Avança todas as células um passo de Runge-Kutta de 4ª ordem com as derivadas vetorizadas, no próprio array
+    """
+    N = Y.sum(axis=0)
+    N[N == 0] = 1.0
+    k1 = derivadas_sird_lote(Y, beta, gamma, mu, N)
+    k2 = derivadas_sird_lote(Y + 0.5 * h * k1, beta, gamma, mu, N)
+    k3 = derivadas_sird_lote(Y + 0.5 * h * k2, beta, gamma, mu, N)
+    k4 = derivadas_sird_lote(Y + h * k3, beta, gamma, mu, N)
+    Y += (h / 6) * (k1 + 2 * k2 + 2 * k3 + k4)
+
+
+def _difusao_espectral(forma, difusao, h):
+    """
+    Monta a função que aplica h dias de difusão aos campos [campos, linhas, colunas]
+    """
+    fator = np.exp(h * difusao * _autovalores_laplaciano(forma))
+
+    def difundir(campos):
+        transformada = fft.dctn(campos, type=2, axes=(1, 2), norm='ortho', workers=-1)
+        transformada *= fator
+        return fft.idctn(transformada, type=2, axes=(1, 2), norm='ortho', overwrite_x=True, workers=-1)
+
+    return difundir
+
+
+def _difusao_esparsa(forma, difusao, h):
+    """
+    Monta a função que aplica h dias de difusão aos campos, com Euler explícito e subpassos estáveis
+    """
+    laplaciano = laplaciano_esparso(forma)
+    # O Euler explícito é estável para difusao * subpasso <= 1/4 (maior autovalor do laplaciano 2D é 8)
+    subpassos = max(1, int(np.ceil(4 * difusao * h)))
+    operador = (difusao * h / subpassos) * laplaciano
+
+    def difundir(campos):
+        planos = campos.reshape(len(campos), -1).T
+        for _ in range(subpassos):
+            planos = planos + operador @ planos
+        return planos.T.reshape(campos.shape)
+
+    return difundir
+
+
+def simular_sird_espacial(N, I0, beta, gamma, mu, difusao, dias, passos_por_dia=1, metodo_difusao='espectral',
+                          arquivo_quadros=None, backend='auto'):
+    """
+    Simula o modelo SIRD em uma grade 2D de células acopladas por difusão
+
+    Parâmetros:
+    N: array [linhas, colunas] com a população inicial de cada célula
+    I0: array [linhas, colunas] com os infectados iniciais de cada célula
+    beta, gamma, mu: taxas do modelo SIRD, escalares ou arrays com o formato da grade
+    difusao: coeficiente de difusão dos vivos, em células² por dia
+    dias: número de dias de simulação
+    passos_por_dia: número de passos de reação e difusão por dia
+    metodo_difusao: 'espectral' (transformada de cossenos) ou 'esparso' (laplaciano esparso)
+    arquivo_quadros: caminho de um arquivo .npy que recebe os estados de cada dia, em float32, no
+    formato [len(t), 4, linhas, colunas]; se None, apenas os totais são guardados
+    backend: implementação usada na reação: 'numpy', 'numba' ou 'auto' (Numba, se instalado)
+
+    Retorna:
+    Tupla (t, resultado), em que resultado é um array [len(t), 4] com os totais da grade
+    [S, I, R, D] em cada dia, no mesmo formato de simular_sird
+    """
+    if metodo_difusao not in METODOS_DIFUSAO:
+        raise ValueError(f'Método de difusão desconhecido: {metodo_difusao}. Use um de {METODOS_DIFUSAO}')
+    if backend not in BACKENDS:
+        raise ValueError(f'Backend desconhecido: {backend}. Use um de {BACKENDS}')
+    if backend == 'auto':
+        backend = 'numba' if NUMBA_DISPONIVEL else 'numpy'
+    if backend == 'numba' and not NUMBA_DISPONIVEL:
+        raise ImportError('O backend numba exige o pacote numba instalado')
+    if backend == 'numba':
+        reacao = rk4_sird_celulas_jit if em_thread_principal() else rk4_sird_celulas_sequencial_jit
+    else:
+        reacao = _reacao_numpy
+
+    N = np.asarray(N, dtype=float)
+    I0 = np.broadcast_to(np.asarray(I0, dtype=float), N.shape)
+    forma = N.shape
+    t = periodo(dias)
+    h = 1 / passos_por_dia
+    parametros = [np.ascontiguousarray(np.broadcast_to(np.asarray(p, dtype=float), forma)).ravel()
+                  for p in (beta, gamma, mu)]
+    difundir = (_difusao_espectral if metodo_difusao == 'espectral' else _difusao_esparsa)(forma, difusao, h)
+
+    # Estado [compartimento, linhas, colunas]
+    Y = np.stack([N - I0, I0, np.zeros(forma), np.zeros(forma)])
+    resultado = np.empty((len(t), 4))
+    resultado[0] = Y.sum(axis=(1, 2))
+    quadros = None
+    if arquivo_quadros is not None:
+        quadros = np.lib.format.open_memmap(arquivo_quadros, mode='w+', dtype=np.float32,
+                                            shape=(len(t), 4, *forma))
+        quadros[0] = Y
+
+    for dia in range(1, len(t)):
+        for _ in range(passos_por_dia):
+            # Reação: um passo de Runge-Kutta de todas as células, com N igual à população atual de cada uma
+            reacao(Y.reshape(4, -1), *parametros, h)
+
+            # Difusão dos vivos; os falecidos permanecem na célula
+            Y[:3] = difundir(Y[:3])
+
+        resultado[dia] = Y.sum(axis=(1, 2))
+        if quadros is not None:
+            quadros[dia] = Y
+
+    if quadros is not None:
+        quadros.flush()
+    return t, resultado
+
+
+def simular_sir_espacial(N, I0, beta, gamma, difusao, dias, passos_por_dia=1, metodo_difusao='espectral',
+                         arquivo_quadros=None, backend='auto'):
+    """
+    Simula o modelo SIR em uma grade 2D de células acopladas por difusão
+
+    Parâmetros:
+    Os mesmos de simular_sird_espacial, sem a taxa de mortalidade; os quadros gravados em
+    arquivo_quadros mantêm os 4 compartimentos, com D sempre nulo
+
+    Retorna:
+    Tupla (t, resultado), em que resultado é um array [len(t), 3] com os totais [S, I, R]
+    """
+    t, resultado = simular_sird_espacial(N, I0, beta, gamma, 0.0, difusao, dias, passos_por_dia,
+                                         metodo_difusao, arquivo_quadros, backend)
+    return t, resultado[:, :3]
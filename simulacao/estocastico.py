@@ -0,0 +1,191 @@
+"""
+Versões estocásticas dos modelos SIR e SIRD, com contagens inteiras de indivíduos
+
+Dois métodos estão disponíveis, ambos avançando todas as réplicas juntas com sorteios vetorizados:
+- 'gillespie': algoritmo exato de Gillespie (SSA), um evento por réplica a cada iteração;
+  adequado para populações pequenas
+- 'tau': tau-leaping binomial com passo fixo, que nunca produz compartimentos negativos;
+  adequado para populações grandes e muitas réplicas
+"""
+import numpy as np
+
+from .simulador import periodo
+
+
+METODOS_ESTOCASTICOS = ('gillespie', 'tau')
+
+
+def _tau_leaping(estado, beta, gamma, mu, N, t, tau, rng):
+    """
+    Avança as réplicas por tau-leaping binomial e registra o estado em cada instante de t
+
+    Parâmetros:
+    estado: array inteiro [4, réplicas] com [S, I, R, D]
+    beta, gamma, mu, N: parâmetros do modelo
+    t: instantes de registro
+    tau: passo máximo do tau-leaping (dias)
+    rng: gerador de números aleatórios do NumPy
+
+    Retorna:
+    Array inteiro [réplicas, len(t), 4]
+    """
+    S, I, R, D = estado
+    trajetorias = np.empty((S.size, len(t), 4), dtype=np.int64)
+    trajetorias[:, 0] = estado.T
+    remocao = gamma + mu
+    fracao_obitos = mu / remocao if remocao > 0 else 0.0
+
+    for k in range(1, len(t)):
+        intervalo = t[k] - t[k - 1]
+        passos = max(1, int(np.ceil(intervalo / tau)))
+        h = intervalo / passos
+        p_remocao = -np.expm1(-remocao * h)
+        for _ in range(passos):
+            # Probabilidades de cada suscetível se infectar e de cada infectado ser removido no passo
+            p_infeccao = -np.expm1(-beta * I / N * h)
+            novos_infectados = rng.binomial(S, p_infeccao)
+            removidos = rng.binomial(I, p_remocao)
+            obitos = rng.binomial(removidos, fracao_obitos)
+
+            S = S - novos_infectados
+            I = I + novos_infectados - removidos
+            R = R + removidos - obitos
+            D = D + obitos
+        trajetorias[:, k, 0] = S
+        trajetorias[:, k, 1] = I
+        trajetorias[:, k, 2] = R
+        trajetorias[:, k, 3] = D
+
+    return trajetorias
+
+
+def _gillespie(estado, beta, gamma, mu, N, t, rng):
+    """
+    Avança as réplicas pelo algoritmo exato de Gillespie e registra o estado em cada instante de t
+
+    A cada iteração, todas as réplicas ainda ativas sorteiam o tempo até o próximo evento e
+    qual evento ocorre (infecção, recuperação ou óbito).
+
+    Parâmetros:
+    estado: array inteiro [4, réplicas] com [S, I, R, D]
+    beta, gamma, mu, N: parâmetros do modelo
+    t: instantes de registro
+    rng: gerador de números aleatórios do NumPy
+
+    Retorna:
+    Array inteiro [réplicas, len(t), 4]
+    """
+    estado = estado.copy()
+    replicas = estado.shape[1]
+    trajetorias = np.empty((replicas, len(t), 4), dtype=np.int64)
+    trajetorias[:, 0] = estado.T
+
+    tempo = np.full(replicas, t[0], dtype=float)
+    proximo_registro = np.ones(replicas, dtype=np.int64)
+    ativas = np.arange(replicas)
+
+    while ativas.size:
+        S, I = estado[0, ativas], estado[1, ativas]
+        taxa_infeccao = beta * S * I / N
+        taxa_recuperacao = gamma * I
+        taxa_total = taxa_infeccao + taxa_recuperacao + mu * I
+
+        # Réplicas sem eventos possíveis (I = 0) permanecem constantes até o fim
+        com_eventos = taxa_total > 0
+        novo_tempo = np.full(ativas.size, np.inf)
+        novo_tempo[com_eventos] = tempo[ativas[com_eventos]] + rng.exponential(1 / taxa_total[com_eventos])
+
+        # Registra o estado anterior ao evento em todos os instantes de t ultrapassados
+        while True:
+            pendente = proximo_registro[ativas] < len(t)
+            pendente[pendente] = novo_tempo[pendente] > t[proximo_registro[ativas[pendente]]]
+            if not pendente.any():
+                break
+            indices = ativas[pendente]
+            trajetorias[indices, proximo_registro[indices]] = estado[:, indices].T
+            proximo_registro[indices] += 1
+
+        # Sorteia e aplica o evento das réplicas que ainda não passaram do fim da simulação
+        continuam = proximo_registro[ativas] < len(t)
+        ativas = ativas[continuam]
+        if not ativas.size:
+            break
+        taxa_infeccao = taxa_infeccao[continuam]
+        taxa_recuperacao = taxa_recuperacao[continuam]
+        taxa_total = taxa_total[continuam]
+        tempo[ativas] = novo_tempo[continuam]
+
+        sorteio = rng.random(ativas.size) * taxa_total
+        infeccao = sorteio < taxa_infeccao
+        recuperacao = ~infeccao & (sorteio < taxa_infeccao + taxa_recuperacao)
+        obito = ~infeccao & ~recuperacao
+
+        estado[0, ativas] -= infeccao
+        estado[1, ativas] += infeccao.astype(np.int64) - recuperacao - obito
+        estado[2, ativas] += recuperacao
+        estado[3, ativas] += obito
+
+    return trajetorias
+
+
+def simular_sird_estocastico(N, I0, beta, gamma, mu, dias, replicas=1_000, metodo='tau', tau=0.1, semente=None):
+    """
+    Simula réplicas estocásticas do modelo SIRD
+
+    Parâmetros:
+    N: população total
+    I0: infectados iniciais
+    beta: taxa de transmissão
+    gamma: taxa de recuperação
+    mu: taxa de mortalidade da doença
+    dias: número de dias de simulação
+    replicas: número de réplicas independentes
+    metodo: 'tau' (tau-leaping) ou 'gillespie' (algoritmo exato)
+    tau: passo máximo do tau-leaping, em dias
+    semente: semente do gerador aleatório, para resultados reprodutíveis
+
+    Retorna:
+    Tupla (t, trajetorias), em que trajetorias é um array inteiro [réplicas, len(t), 4]
+    com os compartimentos [S, I, R, D]
+    """
+    if metodo not in METODOS_ESTOCASTICOS:
+        raise ValueError(f'Método estocástico desconhecido: {metodo}. Use um de {METODOS_ESTOCASTICOS}')
+
+    rng = np.random.default_rng(semente)
+    t = periodo(dias)
+    estado = np.zeros((4, replicas), dtype=np.int64)
+    estado[0] = int(N) - int(I0)
+    estado[1] = int(I0)
+
+    if metodo == 'tau':
+        return t, _tau_leaping(estado, beta, gamma, mu, N, t, tau, rng)
+    return t, _gillespie(estado, beta, gamma, mu, N, t, rng)
+
+
+def simular_sir_estocastico(N, I0, beta, gamma, dias, replicas=1_000, metodo='tau', tau=0.1, semente=None):
+    """
+    Simula réplicas estocásticas do modelo SIR
+
+    Parâmetros:
+    Os mesmos de simular_sird_estocastico, sem a taxa de mortalidade
+
+    Retorna:
+    Tupla (t, trajetorias), em que trajetorias é um array inteiro [réplicas, len(t), 3]
+    com os compartimentos [S, I, R]
+    """
+    t, trajetorias = simular_sird_estocastico(N, I0, beta, gamma, 0.0, dias, replicas, metodo, tau, semente)
+    return t, trajetorias[:, :, :3]
+
+
+def bandas_quantis(trajetorias, quantis=(0.05, 0.5, 0.95)):
+    """
+    Resume um conjunto de réplicas em bandas de quantis para cada instante e compartimento
+
+    Parâmetros:
+    trajetorias: array [réplicas, tempo, compartimentos]
+    quantis: quantis desejados, entre 0 e 1
+
+    Retorna:
+    Array [len(quantis), tempo, compartimentos]
+    """
+    return np.quantile(trajetorias, quantis, axis=0)
@@ -0,0 +1,206 @@
+"""
+Modelo SIRD com dinâmica vital estruturado por faixa etária e, opcionalmente, por sexo
+
+A população é dividida em K = sexos * idades estratos, ordenados por (sexo, idade), cada um com
+os compartimentos [S, I, R, D] (na mesma ordem intercalada de modelo_sird_k). Em cada estrato k:
+
+    dS_k = nascimentos_k - lambda_k S_k - (mu_k + e_k) S_k + e_(k-1) S_(k-1)
+    dI_k = lambda_k S_k - (gamma_k + delta_k + mu_k + e_k) I_k + e_(k-1) I_(k-1)
+    dR_k = gamma_k I_k - (mu_k + e_k) R_k + e_(k-1) R_(k-1)
+    dD_k = delta_k I_k
+
+em que lambda_k = beta * sum_j C[k, j] I_j / N_j é a força de infecção dada pela matriz de contato,
+N_j = S_j + I_j + R_j é a população viva do estrato, mu_k e delta_k são as mortalidades natural e
+pela doença e e_k é a taxa de envelhecimento da faixa etária (o termo e_(k-1) vem da faixa
+anterior do mesmo sexo). Os nascimentos, natalidade * (população viva total), entram nos
+suscetíveis da primeira faixa etária de cada sexo.
+
+Com um único estrato, sem envelhecimento e com natalidade = mu, o modelo é o mesmo de modelo_sird_vital.
+
+As derivadas e a jacobiana são montadas uma única vez por simulação, com áreas de trabalho
+pré-alocadas: a cada chamada, os cálculos intermediários são escritos nessas áreas (out=)
+em vez de criar arrays novos. Apenas o vetor devolvido é novo, pois o solve_ivp guarda
+referências às derivadas de passos anteriores.
+"""
+import numpy as np
+
+from .simulador import ATOL_PADRAO, RTOL_PADRAO, integrar_blocos, periodo
+
+
+def _por_estrato(valor, forma):
+    # Escalar, array [idades] (igual para os sexos) ou [sexos, idades] -> array [K] na ordem (sexo, idade)
+    return np.ascontiguousarray(np.broadcast_to(np.asarray(valor, dtype=float), forma)).ravel()
+
+
+def matriz_contato_estratos(C, sexos):
+    """
+    Expande uma matriz de contato entre faixas etárias para todos os estratos
+
+    Parâmetros:
+    C: matriz [idades, idades], a mesma entre quaisquer sexos, ou [K, K], já por estrato
+    sexos: número de sexos (1 ou 2)
+
+    Retorna:
+    Matriz [K, K] na ordem dos estratos (sexo, idade)
+    """
+    C = np.asarray(C, dtype=float)
+    return np.kron(np.ones((sexos, sexos)), C) if sexos > 1 else C
+
+
+def derivadas_sird_vital_estratos(forma, C, beta, gamma, delta, mu, natalidade, envelhecimento=None,
+                                  fracao_nascimentos=None):
+    """
+    Monta as funções de derivada e jacobiana do modelo estruturado, com áreas de trabalho pré-alocadas
+
+    Parâmetros:
+    forma: tupla (sexos, idades)
+    C: matriz de contato [idades, idades] (a mesma entre quaisquer sexos) ou [K, K] (por estrato);
+    C[k, j] é o número de contatos diários de um indivíduo de k com indivíduos de j
+    beta: probabilidade de transmissão por contato com um infectado
+    gamma, delta, mu: taxas de recuperação, de mortalidade pela doença e de mortalidade natural,
+    escalares, arrays [idades] ou arrays [sexos, idades]
+    natalidade: taxa de natalidade por indivíduo vivo
+    envelhecimento: array [idades] com a taxa de passagem de cada faixa para a seguinte
+    (1 / duração da faixa, em dias; a da última faixa é ignorada), ou None para faixas fixas
+    fracao_nascimentos: array [sexos] com a fração dos nascimentos de cada sexo (padrão: partes iguais)
+
+    Retorna:
+    Tupla (derivada, jacobiana) de funções no formato do odeint (vetor, t)
+    """
+    sexos, idades = forma
+    K = sexos * idades
+    C = np.asarray(C, dtype=float)
+    contato = beta * (C if C.shape[0] == K else matriz_contato_estratos(C, sexos))
+    gamma, delta, mu = (_por_estrato(valor, forma) for valor in (gamma, delta, mu))
+
+    e = np.zeros(idades) if envelhecimento is None else np.array(envelhecimento, dtype=float)
+    e[-1] = 0.0
+    saida_faixa = _por_estrato(e, forma)
+    # Entrada vinda da faixa anterior do mesmo sexo: e_(k-1), nula na primeira faixa de cada sexo
+    entrada_faixa = np.zeros((sexos, idades))
+    entrada_faixa[:, 1:] = e[:-1]
+    entrada_faixa = entrada_faixa.ravel()
+
+    fracao = (np.full(sexos, 1 / sexos) if fracao_nascimentos is None
+              else np.asarray(fracao_nascimentos, dtype=float))
+    primeiras = np.arange(sexos) * idades  # estratos que recebem os nascimentos
+    nascimentos = [(k, natalidade * f) for k, f in zip(primeiras, fracao)]
+
+    # Saídas lineares de cada compartimento
+    saida_S = mu + saida_faixa
+    saida_I = gamma + delta + mu + saida_faixa
+    saida_R = mu + saida_faixa
+
+    # Áreas de trabalho reaproveitadas em todas as chamadas
+    vivos = np.empty(K)
+    prevalencia = np.empty(K)
+    forca = np.empty(K)
+    infeccao = np.empty(K)
+    temporario = np.empty(K)
+    derivadas = np.empty((K, 4))
+
+    def derivada(vetor, t):
+        Y = np.reshape(vetor, (K, 4))
+        S, I, R = Y[:, 0], Y[:, 1], Y[:, 2]
+        np.add(S, I, out=vivos)
+        np.add(vivos, R, out=vivos)
+        # Estratos vazios não têm infectados: o limite inferior só evita a divisão por zero
+        np.maximum(vivos, 1e-300, out=vivos)
+        np.divide(I, vivos, out=prevalencia)
+        np.dot(contato, prevalencia, out=forca)
+        np.multiply(S, forca, out=infeccao)
+
+        dS, dI, dR, dD = derivadas[:, 0], derivadas[:, 1], derivadas[:, 2], derivadas[:, 3]
+        np.multiply(saida_S, S, out=dS)
+        np.add(dS, infeccao, out=dS)
+        np.negative(dS, out=dS)
+        np.multiply(saida_I, I, out=dI)
+        np.subtract(infeccao, dI, out=dI)
+        np.multiply(saida_R, R, out=dR)
+        np.negative(dR, out=dR)
+        np.multiply(gamma, I, out=temporario)
+        dR += temporario
+        np.multiply(delta, I, out=dD)
+
+        # Envelhecimento: cada faixa recebe o que sai da faixa anterior do mesmo sexo
+        if envelhecimento is not None:
+            for c, destino in enumerate((dS, dI, dR)):
+                np.multiply(entrada_faixa[1:], Y[:-1, c], out=temporario[1:])
+                destino[1:] += temporario[1:]
+
+        # Nascimentos: natalidade * (população viva total), repartidos entre os sexos
+        total = vivos.sum()
+        for k, taxa in nascimentos:
+            dS[k] += taxa * total
+        return derivadas.ravel().copy()
+
+    # Parte constante da jacobiana J[k, a, j, b] = d(derivada do compartimento a de k) / d(compartimento b de j)
+    fixa = np.zeros((K, 4, K, 4))
+    diagonal = np.arange(K)
+    fixa[diagonal, 0, diagonal, 0] = -saida_S
+    fixa[diagonal, 1, diagonal, 1] = -saida_I
+    fixa[diagonal, 2, diagonal, 1] = gamma
+    fixa[diagonal, 2, diagonal, 2] = -saida_R
+    fixa[diagonal, 3, diagonal, 1] = delta
+    for c in range(3):
+        fixa[diagonal[1:], c, diagonal[:-1], c] += entrada_faixa[1:]
+    for k, taxa in nascimentos:
+        fixa[k, 0, :, :3] += taxa
+    fixa = fixa.reshape(4 * K, 4 * K)
+
+    acoplamento = np.empty((K, K))
+
+    def jacobiana(vetor, t):
+        Y = np.reshape(vetor, (K, 4))
+        S, I, R = Y[:, 0], Y[:, 1], Y[:, 2]
+        np.add(S, I, out=vivos)
+        np.add(vivos, R, out=vivos)
+        np.maximum(vivos, 1e-300, out=vivos)
+        np.divide(I, vivos, out=prevalencia)
+        np.dot(contato, prevalencia, out=forca)
+
+        # Derivadas do termo de infecção S_k * lambda_k em relação a S_j, I_j e R_j, com N_j = S_j + I_j + R_j
+        np.multiply(S[:, np.newaxis], contato, out=acoplamento)
+        np.divide(acoplamento, vivos, out=acoplamento)
+        J = fixa.copy().reshape(K, 4, K, 4)
+        dI_j = acoplamento * (1 - prevalencia)
+        dSR_j = -acoplamento * prevalencia
+        for a, sinal in ((0, -1.0), (1, 1.0)):
+            J[:, a, :, 0] += sinal * dSR_j
+            J[:, a, :, 1] += sinal * dI_j
+            J[:, a, :, 2] += sinal * dSR_j
+            J[diagonal, a, diagonal, 0] += sinal * forca
+        return J.reshape(4 * K, 4 * K)
+
+    return derivada, jacobiana
+
+
+def simular_sird_vital_estratos(N, I0, C, beta, gamma, delta, mu, natalidade, dias, envelhecimento=None,
+                                fracao_nascimentos=None, metodo='LSODA', rtol=RTOL_PADRAO, atol=ATOL_PADRAO,
+                                memoria=None):
+    """
+    Integra o modelo SIRD com dinâmica vital estruturado por faixa etária e, opcionalmente, por sexo
+
+    Parâmetros:
+    N, I0: arrays [idades] (um único sexo) ou [sexos, idades] com a população e os infectados iniciais
+    C, beta, gamma, delta, mu, natalidade, envelhecimento, fracao_nascimentos: ver derivadas_sird_vital_estratos
+    dias: número de dias de simulação
+    metodo, rtol, atol: método de integração e tolerâncias (ver integrar)
+    memoria: reaproveitamento de blocos já integrados (ver integrar_blocos)
+
+    Retorna:
+    Tupla (t, resultado), em que resultado tem formato [len(t), 4K] com as colunas
+    [S_1, I_1, R_1, D_1, ..., S_K, I_K, R_K, D_K], estratos na ordem (sexo, idade);
+    resultado.reshape(len(t), K, 4).sum(axis=1) dá os totais [S, I, R, D] do modelo sem estratos
+    """
+    N = np.atleast_2d(np.asarray(N, dtype=float))
+    I0 = np.broadcast_to(np.asarray(I0, dtype=float), N.shape)
+    derivada, jacobiana = derivadas_sird_vital_estratos(N.shape, C, beta, gamma, delta, mu, natalidade,
+                                                        envelhecimento, fracao_nascimentos)
+
+    t = periodo(dias)
+    zeros = np.zeros(N.size)
+    vetor_inicial = np.column_stack([(N - I0).ravel(), I0.ravel(), zeros, zeros]).ravel()
+    resultado = integrar_blocos(derivada, vetor_inicial, dias, jacobiana=jacobiana,
+                                metodo=metodo, rtol=rtol, atol=atol, memoria=memoria)
+    return t, resultado
@@ -0,0 +1,271 @@
+"""
+Inferência bayesiana dos parâmetros dos modelos com um amostrador de ensemble afim-invariante
+
+O amostrador usa o movimento de estiramento de Goodman e Weare (2010) na versão paralela:
+os caminhantes são divididos em duas metades e cada metade é atualizada de uma vez,
+usando a outra como complemento. Todas as propostas de uma metade são integradas em uma
+única chamada do Runge-Kutta em lote (ver simulacao.lote), em vez de uma integração por caminhante.
+
+As cadeias podem ser gravadas periodicamente em disco e retomadas do último ponto salvo.
+"""
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from scipy.special import gammaln
+
+from .calibracao import LIMITES_PADRAO, ajustar
+from .estocastico import bandas_quantis
+from .lote import ARGUMENTOS_LOTE, integrar_lote
+from .sensibilidade import MODELOS_SENSIBILIDADE
+from .varredura import SIMULADORES_LOTE
+
+
+VEROSSIMILHANCAS = ('poisson', 'binomial_negativa')
+
+# Número básico de reprodução de cada modelo, calculado a partir dos parâmetros amostrados
+NUMERO_REPRODUCAO = {
+    'SIR': lambda p: {'R0': p['beta'] / p['gamma']},
+    'SIRD': lambda p: {'R0': p['beta'] / (p['gamma'] + p['mu'])},
+    'SIRD_duplo': lambda p: {'R0_A': p['beta_A'] / (p['gamma_A'] + p['mu_A']),
+                             'R0_B': p['beta_B'] / (p['gamma_B'] + p['mu_B'])},
+    # O infectado deixa o compartimento por recuperação, morte pela doença ou morte natural
+    'SIRD_vital': lambda p: {'R0': p['beta'] / (p['gamma'] + p['delta'] + p['mu'])},
+}
+
+
+def _log_verossimilhanca(modelo, t, observados, compartimentos, fixos, verossimilhanca, dispersao,
+                         passos_por_dia, backend):
+    """
+    Monta a função que avalia a log-verossimilhança de um lote de parâmetros em uma única integração
+
+    Retorna:
+    Função que recebe um array [caminhantes, parâmetros] e devolve um array [caminhantes]
+    """
+    nomes = MODELOS_SENSIBILIDADE[modelo]['parametros']
+    vetor_inicial = np.asarray(MODELOS_SENSIBILIDADE[modelo]['inicial'](fixos), dtype=float)
+    # Termos que não dependem dos parâmetros, mantidos para que o valor seja uma log-verossimilhança de fato
+    constante = -gammaln(observados + 1)
+    if verossimilhanca == 'binomial_negativa':
+        constante = constante + gammaln(observados + dispersao) - gammaln(dispersao)
+
+    def avaliar(x):
+        valores = {**fixos, **{nome: x[:, j] for j, nome in enumerate(nomes)}}
+        parametros = np.broadcast_arrays(*(np.asarray(valores[nome], dtype=float)
+                                           for nome in ARGUMENTOS_LOTE[modelo]), x[:, 0])[:-1]
+        Y0 = np.repeat(vetor_inicial[:, None], len(x), axis=1)
+        previstos = integrar_lote(modelo, Y0, tuple(parametros), t, passos_por_dia, backend)[:, :, compartimentos]
+        previstos = np.maximum(previstos, 1e-9)
+
+        if verossimilhanca == 'poisson':
+            termos = observados * np.log(previstos) - previstos
+        else:
+            termos = (observados * np.log(previstos / (previstos + dispersao))
+                      + dispersao * np.log(dispersao / (previstos + dispersao)))
+        valor = np.sum(termos + constante, axis=(1, 2))
+        return np.where(np.isfinite(valor), valor, -np.inf)
+
+    return avaliar
+
+
+def _log_posterior(log_verossimilhanca, inferior, superior):
+    """
+    Combina a verossimilhança com uma priori uniforme nos limites; fora deles a posteriori é -inf
+    """
+    def avaliar(x):
+        dentro = np.all((x >= inferior) & (x <= superior), axis=1)
+        valor = np.full(len(x), -np.inf)
+        if dentro.any():
+            valor[dentro] = log_verossimilhanca(x[dentro])
+        return valor
+
+    return avaliar
+
+
+def _gravar_checkpoint(caminho, configuracao, cadeias, log_posterior, aceitos, passo, gerador):
+    temporario = Path(caminho).with_suffix('.tmp')
+    with open(temporario, 'wb') as arquivo:
+        np.savez(arquivo, cadeias=cadeias[:passo], log_posterior=log_posterior[:passo], aceitos=aceitos,
+                 configuracao=json.dumps(configuracao), gerador=json.dumps(gerador.bit_generator.state))
+    os.replace(temporario, caminho)
+
+
+def _ler_checkpoint(caminho, configuracao):
+    with np.load(caminho) as dados:
+        if json.loads(str(dados['configuracao'])) != configuracao:
+            raise ValueError(f'O checkpoint {caminho} foi gravado com outra configuração')
+        return (dados['cadeias'], dados['log_posterior'], dados['aceitos'],
+                json.loads(str(dados['gerador'])))
+
+
+def amostrar_posterior(modelo, t, observados, compartimentos, fixos, limites=None, caminhantes=32, passos=2_000,
+                       verossimilhanca='poisson', dispersao=10.0, centro=None, espalhamento=1e-2, a=2.0,
+                       checkpoint=None, intervalo_checkpoint=100, semente=None, passos_por_dia=4,
+                       backend='auto', progresso=False):
+    """
+    Amostra a distribuição a posteriori dos parâmetros com o amostrador de ensemble afim-invariante
+
+    Parâmetros:
+    modelo: nome do modelo ('SIR', 'SIRD', 'SIRD_duplo' ou 'SIRD_vital')
+    t, observados, compartimentos: série observada, como devolvida por carregar_serie
+    fixos: dicionário com os valores não inferidos (por exemplo {'N': 10_000, 'I0': 100})
+    limites: lista de pares (mínimo, máximo) de cada parâmetro, que definem a priori uniforme
+    (padrão: LIMITES_PADRAO)
+    caminhantes: número de caminhantes (par e maior que o dobro do número de parâmetros)
+    passos: número de passos de cada caminhante
+    verossimilhanca: 'poisson' ou 'binomial_negativa' (contagens com sobredispersão)
+    dispersao: parâmetro de dispersão da binomial negativa (variância = média + média² / dispersao)
+    centro: ponto em torno do qual os caminhantes começam; se None, vem de um ajuste de máxima verossimilhança
+    espalhamento: desvio relativo dos pontos iniciais em torno do centro
+    a: escala do movimento de estiramento
+    checkpoint: arquivo .npz onde as cadeias são gravadas; se já existir, a amostragem é retomada dele
+    intervalo_checkpoint: número de passos entre gravações
+    semente: semente do gerador aleatório
+    passos_por_dia, backend: repassados ao Runge-Kutta em lote
+    progresso: se True, exibe o andamento a cada gravação
+
+    Retorna:
+    Dicionário com 'parametros' (nomes), 'cadeias' [passos, caminhantes, parâmetros],
+    'log_posterior' [passos, caminhantes] e 'aceitacao' (fração de propostas aceitas por caminhante)
+    """
+    if verossimilhanca not in VEROSSIMILHANCAS:
+        raise ValueError(f'Verossimilhança desconhecida: {verossimilhanca}. Use uma de {VEROSSIMILHANCAS}')
+
+    nomes = MODELOS_SENSIBILIDADE[modelo]['parametros']
+    d = len(nomes)
+    if caminhantes % 2 or caminhantes < 2 * d:
+        raise ValueError(f'O número de caminhantes deve ser par e ao menos {2 * d}')
+
+    limites = limites or [LIMITES_PADRAO] * d
+    inferior, superior = np.array(limites, dtype=float).T
+    t = np.asarray(t, dtype=float)
+    observados = np.asarray(observados, dtype=float).reshape(len(t), len(compartimentos))
+    log_posterior = _log_posterior(
+        _log_verossimilhanca(modelo, t, observados, compartimentos, fixos, verossimilhanca, dispersao,
+                             passos_por_dia, backend),
+        inferior, superior)
+
+    configuracao = {'modelo': modelo, 'fixos': {nome: float(valor) for nome, valor in fixos.items()},
+                    'limites': [list(map(float, par)) for par in limites], 'caminhantes': caminhantes,
+                    'verossimilhanca': verossimilhanca, 'dispersao': float(dispersao), 'a': float(a),
+                    'observados': observados.tolist(), 't': t.tolist(),
+                    'compartimentos': [int(c) for c in compartimentos]}
+
+    gerador = np.random.default_rng(semente)
+    cadeias = np.empty((passos, caminhantes, d))
+    valores = np.empty((passos, caminhantes))
+    aceitos = np.zeros(caminhantes)
+    inicio = 0
+
+    if checkpoint is not None and Path(checkpoint).exists():
+        cadeias_salvas, valores_salvos, aceitos, estado = _ler_checkpoint(checkpoint, configuracao)
+        inicio = min(len(cadeias_salvas), passos)
+        cadeias[:inicio], valores[:inicio] = cadeias_salvas[:inicio], valores_salvos[:inicio]
+        gerador.bit_generator.state = estado
+        posicoes, atuais = cadeias_salvas[-1].copy(), valores_salvos[-1].copy()
+        if progresso:
+            print(f'Retomando amostragem: {inicio}/{passos} passos já concluídos')
+    else:
+        if centro is None:
+            centro = [ajustar(modelo, t, observados, compartimentos, fixos, limites=limites,
+                              perda='poisson')[nome] for nome in nomes]
+        centro = np.asarray(centro, dtype=float)
+        posicoes = centro * (1 + espalhamento * gerador.standard_normal((caminhantes, d)))
+        posicoes = np.clip(posicoes, inferior, superior)
+        atuais = log_posterior(posicoes)
+
+    metades = (np.arange(caminhantes // 2), np.arange(caminhantes // 2, caminhantes))
+    for passo in range(inicio, passos):
+        for k, metade in enumerate(metades):
+            complemento = posicoes[metades[1 - k]]
+            # z ~ g(z) ∝ 1/sqrt(z) em [1/a, a]
+            z = ((a - 1) * gerador.random(len(metade)) + 1) ** 2 / a
+            parceiros = complemento[gerador.integers(0, len(complemento), len(metade))]
+            propostas = parceiros + z[:, None] * (posicoes[metade] - parceiros)
+
+            novos = log_posterior(propostas)
+            razao = (d - 1) * np.log(z) + novos - atuais[metade]
+            aceitar = np.log(gerador.random(len(metade))) < razao
+            posicoes[metade[aceitar]] = propostas[aceitar]
+            atuais[metade[aceitar]] = novos[aceitar]
+            aceitos[metade[aceitar]] += 1
+
+        cadeias[passo], valores[passo] = posicoes, atuais
+        concluidos = passo + 1
+        if checkpoint is not None and (concluidos % intervalo_checkpoint == 0 or concluidos == passos):
+            _gravar_checkpoint(checkpoint, configuracao, cadeias, valores, aceitos, concluidos, gerador)
+            if progresso:
+                print(f'{concluidos}/{passos} passos, aceitação média {aceitos.mean() / concluidos:.2f}')
+
+    return {'parametros': list(nomes), 'cadeias': cadeias, 'log_posterior': valores,
+            'aceitacao': aceitos / max(passos, 1)}
+
+
+def amostras_posterior(resultado, descarte=0.5, afinamento=1):
+    """
+    Junta as cadeias de todos os caminhantes em uma tabela, descartando o aquecimento
+
+    Parâmetros:
+    resultado: dicionário devolvido por amostrar_posterior
+    descarte: fração inicial dos passos descartada como aquecimento
+    afinamento: mantém um passo a cada afinamento
+
+    Retorna:
+    DataFrame com uma coluna por parâmetro e uma linha por amostra
+    """
+    cadeias = resultado['cadeias']
+    mantidas = cadeias[int(descarte * len(cadeias))::afinamento]
+    return pd.DataFrame(mantidas.reshape(-1, cadeias.shape[2]), columns=resultado['parametros'])
+
+
+def resumo_posterior(modelo, amostras, credibilidade=0.95):
+    """
+    Resume a posteriori dos parâmetros e do número básico de reprodução em intervalos de credibilidade
+
+    Parâmetros:
+    modelo: nome do modelo usado na amostragem
+    amostras: DataFrame devolvido por amostras_posterior
+    credibilidade: probabilidade a posteriori de cada intervalo
+
+    Retorna:
+    DataFrame com uma linha por grandeza e as colunas media, mediana, inf e sup
+    """
+    grandezas = amostras.assign(**NUMERO_REPRODUCAO[modelo](amostras))
+    cauda = (1 - credibilidade) / 2
+    return pd.DataFrame({'media': grandezas.mean(), 'mediana': grandezas.median(),
+                         'inf': grandezas.quantile(cauda), 'sup': grandezas.quantile(1 - cauda)})
+
+
+def bandas_preditivas(modelo, amostras, fixos, dias, quantis=(0.05, 0.5, 0.95), trajetorias=500,
+                      verossimilhanca=None, dispersao=10.0, semente=None, passos_por_dia=4, backend='auto'):
+    """
+    Calcula bandas preditivas a posteriori das trajetórias para os gráficos
+
+    Parâmetros:
+    modelo: nome do modelo usado na amostragem
+    amostras: DataFrame devolvido por amostras_posterior
+    fixos: os mesmos valores fixos usados na amostragem
+    dias: número de dias de simulação
+    quantis: quantis das bandas
+    trajetorias: número de amostras da posteriori simuladas (todas em um único lote)
+    verossimilhanca: se None, as bandas refletem apenas a incerteza dos parâmetros; com 'poisson' ou
+    'binomial_negativa', cada trajetória recebe também o ruído de observação
+    dispersao: parâmetro de dispersão da binomial negativa
+    semente: semente do sorteio das amostras e do ruído
+    passos_por_dia, backend: repassados ao Runge-Kutta em lote
+
+    Retorna:
+    Tupla (t, bandas), com bandas no formato [len(quantis), len(t), compartimentos]
+    """
+    gerador = np.random.default_rng(semente)
+    sorteadas = amostras.iloc[gerador.integers(0, len(amostras), trajetorias)]
+    t, resultado = SIMULADORES_LOTE[modelo](dias=dias, passos_por_dia=passos_por_dia, backend=backend,
+                                            **{nome: sorteadas[nome].to_numpy() for nome in sorteadas}, **fixos)
+    resultado = np.maximum(resultado, 0.0)
+    if verossimilhanca == 'poisson':
+        resultado = gerador.poisson(resultado).astype(float)
+    elif verossimilhanca == 'binomial_negativa':
+        resultado = gerador.negative_binomial(dispersao, dispersao / (dispersao + resultado)).astype(float)
+    return t, bandas_quantis(resultado, quantis)
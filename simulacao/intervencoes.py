@@ -0,0 +1,129 @@
+"""
+Parâmetros variáveis no tempo (intervenções por trechos e forçantes contínuas)
+
+Cada parâmetro pode ser:
+- um número, constante durante toda a simulação;
+- uma função f(t), para variações suaves como a sazonalidade;
+- uma sequência de trechos ((inicio, valor), ...), em que cada valor (número ou função)
+  vale a partir do dia inicio até o começo do trecho seguinte; o primeiro trecho começa no dia 0.
+
+Os inícios dos trechos são pontos de quebra: o integrador para em cada um deles e recomeça
+a partir do estado final do segmento anterior, em vez de atravessar a descontinuidade.
+Cada segmento fica no cache indexado apenas pela parte do cronograma que vale até o seu fim,
+de modo que alterar uma intervenção a partir do dia 60 reaproveita os primeiros 60 dias
+(e aumentar o horizonte reaproveita todos os segmentos já integrados).
+Funções entram na chave do cache pela identidade; para reaproveitá-las entre reexecuções,
+defina-as uma única vez (no nível do módulo), e não como lambdas recriadas a cada chamada.
+"""
+from numbers import Real
+
+import numpy as np
+
+from .cache import cache_simulacoes
+from .sensibilidade import MODELOS_SENSIBILIDADE
+from .simulador import ATOL_PADRAO, BLOCO_DIAS, RTOL_PADRAO, integrar, periodo
+
+
+def normalizar_cronograma(valor):
+    """
+    Converte um parâmetro em uma tupla de trechos ((inicio, valor), ...) ordenada
+
+    Parâmetros:
+    valor: número, função f(t) ou sequência de pares (inicio, valor)
+
+    Retorna:
+    Tupla imutável de pares (inicio, valor), que pode compor a chave do cache
+    """
+    if isinstance(valor, Real) or callable(valor):
+        return ((0.0, valor),)
+
+    trechos = [(float(inicio), v) for inicio, v in valor]
+    if len({inicio for inicio, _ in trechos}) != len(trechos):
+        raise ValueError('O cronograma tem dois trechos com o mesmo início')
+    # Ordena só pelo início: os valores podem ser funções, que não são comparáveis
+    trechos = tuple(sorted(trechos, key=lambda trecho: trecho[0]))
+    if not trechos or trechos[0][0] != 0:
+        raise ValueError('O primeiro trecho do cronograma deve começar no dia 0')
+    return trechos
+
+
+def _valor_no_segmento(cronograma, inicio):
+    # Valor (número ou função) em vigor no segmento que começa em inicio
+    return [v for comeco, v in cronograma if comeco <= inicio][-1]
+
+
+def _derivadas_do_segmento(entrada, valores, fixos):
+    """
+    Monta a derivada e a jacobiana de um segmento, avaliando as funções do tempo a cada chamada
+    """
+    nomes = entrada['parametros']
+    if not any(callable(v) for v in valores):
+        args = entrada['argumentos'](dict(zip(nomes, valores)), fixos)
+        return (lambda vetor, t: entrada['derivada'](vetor, t, *args),
+                lambda vetor, t: entrada['jacobiana'](vetor, t, *args))
+
+    def argumentos(t):
+        return entrada['argumentos']({nome: v(t) if callable(v) else v for nome, v in zip(nomes, valores)}, fixos)
+
+    return (lambda vetor, t: entrada['derivada'](vetor, t, *argumentos(t)),
+            lambda vetor, t: entrada['jacobiana'](vetor, t, *argumentos(t)))
+
+
+def simular_intervencoes(modelo, fixos, parametros, dias, metodo='LSODA', rtol=RTOL_PADRAO, atol=ATOL_PADRAO,
+                         cache=cache_simulacoes):
+    """
+    Integra um modelo com parâmetros variáveis no tempo, reiniciando o integrador em cada ponto de quebra
+
+    Parâmetros:
+    modelo: nome do modelo, uma das chaves de MODELOS_SENSIBILIDADE ('SIR', 'SIRD', 'SIRD_duplo' ou 'SIRD_vital')
+    fixos: dicionário com a população e os infectados iniciais (por exemplo {'N': 10_000, 'I0': 100})
+    parametros: dicionário {nome: número, função f(t) ou trechos ((inicio, valor), ...)} com todos os
+    parâmetros do modelo
+    dias: número de dias de simulação
+    metodo, rtol, atol: método de integração e tolerâncias (ver integrar)
+    cache: instância de CacheResultados onde os segmentos são guardados, ou None para não usar cache
+
+    Retorna:
+    Tupla (t, resultado), no mesmo formato do simulador do modelo com parâmetros constantes
+    """
+    entrada = MODELOS_SENSIBILIDADE[modelo]
+    nomes = entrada['parametros']
+    faltando = set(nomes) - set(parametros)
+    if faltando:
+        raise ValueError(f'Parâmetros ausentes para o modelo {modelo}: {sorted(faltando)}')
+
+    cronogramas = {nome: normalizar_cronograma(parametros[nome]) for nome in nomes}
+    t = periodo(dias)
+    # Além das quebras, os segmentos terminam nos limites dos blocos de BLOCO_DIAS dias (ver integrar_blocos),
+    # e o último é integrado até o fim do seu bloco: aumentar o horizonte reaproveita todos os segmentos
+    fim_blocos = -(-dias // BLOCO_DIAS) * BLOCO_DIAS
+    quebras = {inicio for trechos in cronogramas.values() for inicio, _ in trechos if 0 < inicio < fim_blocos}
+    limites = sorted(quebras | {float(dia) for dia in range(0, fim_blocos + 1, BLOCO_DIAS)})
+    fixos_chave = tuple(sorted(fixos.items()))
+
+    estado = np.asarray(entrada['inicial'](fixos), dtype=float)
+    segmentos = []
+    for inicio, fim in zip(limites[:-1], limites[1:]):
+        # O segmento depende só do cronograma em vigor até o seu fim (o estado inicial vem dos anteriores)
+        historico = tuple((nome, tuple(trecho for trecho in cronogramas[nome] if trecho[0] < fim))
+                          for nome in nomes)
+        chave = ('intervencoes', modelo, fixos_chave, historico, metodo, rtol, atol, inicio, fim)
+
+        def calcular(inicio=inicio, fim=fim, estado=estado):
+            valores = [_valor_no_segmento(cronogramas[nome], inicio) for nome in nomes]
+            derivada, jacobiana = _derivadas_do_segmento(entrada, valores, fixos)
+            solucao = integrar(derivada, estado, np.array([inicio, fim]), jacobiana=jacobiana,
+                               metodo=metodo, rtol=rtol, atol=atol, saida_densa=True)
+            return solucao.sol, solucao.y[:, -1].copy()
+
+        interpolante, estado = cache.obter(chave, calcular) if cache is not None else calcular()
+        segmentos.append(interpolante)
+
+    # Cada instante é amostrado no segmento que o contém; o fim de um segmento pertence ao seguinte
+    indice = np.clip(np.searchsorted(limites, t, side='right') - 1, 0, len(segmentos) - 1)
+    resultado = np.empty((len(t), len(estado)))
+    for k, interpolante in enumerate(segmentos):
+        selecionados = indice == k
+        if selecionados.any():
+            resultado[selecionados] = interpolante(t[selecionados]).T
+    return t, resultado
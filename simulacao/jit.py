@@ -0,0 +1,253 @@
+"""
+Núcleos compilados com Numba para as derivadas e para o Runge-Kutta de passo fixo
+
+O Numba é opcional: quando não está instalado, NUMBA_DISPONIVEL é False e as funções
+de lote recorrem ao caminho vetorizado com NumPy (ver simulacao.lote).
+"""
+import threading
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+    NUMBA_DISPONIVEL = True
+except ImportError:
+    NUMBA_DISPONIVEL = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        """
+        Substituto do decorador do Numba que devolve a função sem compilá-la
+        """
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda funcao: funcao
+
+
+@njit(cache=True)
+def derivadas_sir_jit(y, p, saida):
+    """
+    Escreve em saida as derivadas do modelo SIR
+
+    Parâmetros:
+    y: array [S, I, R]
+    p: array [beta, gamma, N]
+    saida: array de 3 posições que recebe [dS/dt, dI/dt, dR/dt]
+    """
+    infeccao = p[0] * y[0] * y[1] / p[2]
+    recuperacao = p[1] * y[1]
+    saida[0] = -infeccao
+    saida[1] = infeccao - recuperacao
+    saida[2] = recuperacao
+
+
+@njit(cache=True)
+def derivadas_sird_jit(y, p, saida):
+    """
+    Escreve em saida as derivadas do modelo SIRD
+
+    Parâmetros:
+    y: array [S, I, R, D]
+    p: array [beta, gamma, mu, N]
+    saida: array de 4 posições que recebe [dS/dt, dI/dt, dR/dt, dD/dt]
+    """
+    infeccao = p[0] * y[0] * y[1] / p[3]
+    recuperacao = p[1] * y[1]
+    obitos = p[2] * y[1]
+    saida[0] = -infeccao
+    saida[1] = infeccao - recuperacao - obitos
+    saida[2] = recuperacao
+    saida[3] = obitos
+
+
+@njit(cache=True)
+def derivadas_sird_duplo_jit(y, p, saida):
+    """
+    Escreve em saida as derivadas do modelo SIRD de duas populações interagentes
+
+    Parâmetros:
+    y: array [S_A, I_A, R_A, D_A, S_B, I_B, R_B, D_B]
+    p: array [beta_A, gamma_A, mu_A, N_A, beta_B, gamma_B, mu_B, N_B, k_AB, k_BA]
+    saida: array de 8 posições que recebe as derivadas, na mesma ordem de y
+    """
+    prop_A = y[1] / p[3]
+    prop_B = y[5] / p[7]
+    infeccao_A = y[0] * (p[0] * prop_A + p[9] * prop_B)
+    infeccao_B = y[4] * (p[4] * prop_B + p[8] * prop_A)
+    saida[0] = -infeccao_A
+    saida[1] = infeccao_A - (p[1] + p[2]) * y[1]
+    saida[2] = p[1] * y[1]
+    saida[3] = p[2] * y[1]
+    saida[4] = -infeccao_B
+    saida[5] = infeccao_B - (p[5] + p[6]) * y[5]
+    saida[6] = p[5] * y[5]
+    saida[7] = p[6] * y[5]
+
+
+@njit(cache=True)
+def derivadas_sird_vital_jit(y, p, saida):
+    """
+    Escreve em saida as derivadas do modelo SIRD com dinâmica vital
+
+    Parâmetros:
+    y: array [S, I, R, D]
+    p: array [beta, gamma, delta, mu]
+    saida: array de 4 posições que recebe [dS/dt, dI/dt, dR/dt, dD/dt]
+    """
+    N = y[0] + y[1] + y[2]
+    infeccao = p[0] * y[0] * y[1] / N
+    saida[0] = p[3] * N - infeccao - p[3] * y[0]
+    saida[1] = infeccao - (p[1] + p[3] + p[2]) * y[1]
+    saida[2] = p[1] * y[1] - p[3] * y[2]
+    saida[3] = p[2] * y[1]
+
+
+def em_thread_principal():
+    """
+    Indica se o código está rodando na thread principal do processo
+
+    Os núcleos paralelos só podem ser chamados da thread principal (inclusive a dos processos de
+    um ProcessPoolExecutor): chamados de outra thread, como a que executa as páginas do Streamlit,
+    o pool de threads do Numba impede o interpretador de encerrar. Nas demais threads são usadas
+    as versões sequenciais, com o mesmo resultado.
+
+    Retorna:
+    True na thread principal
+    """
+    return threading.current_thread() is threading.main_thread()
+
+
+@njit(cache=True)
+def _rk4_trajetoria(derivada, y0, p, t, passos_por_dia, resultado):
+    # Integra uma trajetória e escreve em resultado [len(t), compartimentos], sem alocações no laço interno
+    n = len(y0)
+    y = np.empty(n)
+    temporario = np.empty(n)
+    k1 = np.empty(n)
+    k2 = np.empty(n)
+    k3 = np.empty(n)
+    k4 = np.empty(n)
+    for c in range(n):
+        y[c] = y0[c]
+        resultado[0, c] = y[c]
+
+    for k in range(1, len(t)):
+        intervalo = t[k] - t[k - 1]
+        passos = max(1, int(np.ceil(intervalo * passos_por_dia)))
+        h = intervalo / passos
+        for _ in range(passos):
+            derivada(y, p, k1)
+            for c in range(n):
+                temporario[c] = y[c] + 0.5 * h * k1[c]
+            derivada(temporario, p, k2)
+            for c in range(n):
+                temporario[c] = y[c] + 0.5 * h * k2[c]
+            derivada(temporario, p, k3)
+            for c in range(n):
+                temporario[c] = y[c] + h * k3[c]
+            derivada(temporario, p, k4)
+            for c in range(n):
+                y[c] = y[c] + (h / 6) * (k1[c] + 2 * k2[c] + 2 * k3[c] + k4[c])
+        for c in range(n):
+            resultado[k, c] = y[c]
+
+
+@njit(cache=True, parallel=True)
+def rk4_lote_jit(derivada, Y0, P, t, passos_por_dia):
+    """
+    Integra cada trajetória do lote com Runge-Kutta de 4ª ordem e passo fixo, sem alocações no laço interno
+
+    As trajetórias são distribuídas entre os núcleos disponíveis. Usa o mesmo esquema de passos de integrar_rk4_lote, de modo que os dois caminhos concordam
+    até o arredondamento. Só pode ser chamado da thread principal (ver em_thread_principal).
+
+    Parâmetros:
+    derivada: um dos núcleos compilados derivadas_*_jit
+    Y0: array [lote, compartimentos] com as condições iniciais
+    P: array [lote, parâmetros] com os parâmetros de cada trajetória
+    t: instantes em que a solução é amostrada
+    passos_por_dia: número mínimo de passos internos por unidade de tempo
+
+    Retorna:
+    Array de formato [lote, len(t), compartimentos] com as trajetórias
+    """
+    lote, n = Y0.shape
+    resultado = np.empty((lote, len(t), n))
+    for b in prange(lote):
+        _rk4_trajetoria(derivada, Y0[b], P[b], t, passos_por_dia, resultado[b])
+    return resultado
+
+
+@njit(cache=True)
+def rk4_lote_sequencial_jit(derivada, Y0, P, t, passos_por_dia):
+    """
+    Versão sequencial de rk4_lote_jit, que pode ser chamada de qualquer thread
+
+    Parâmetros e retorno: os mesmos de rk4_lote_jit
+    """
+    lote, n = Y0.shape
+    resultado = np.empty((lote, len(t), n))
+    for b in range(lote):
+        _rk4_trajetoria(derivada, Y0[b], P[b], t, passos_por_dia, resultado[b])
+    return resultado
+
+
+@njit(cache=True)
+def _rk4_sird_celula(Y, c, beta, gamma, mu, h):
+    # Avança a célula c um passo; como a reação conserva a população, N é a soma no início do passo
+    S, I = Y[0, c], Y[1, c]
+    N = S + I + Y[2, c] + Y[3, c]
+    if N == 0:
+        return
+    b, remocao = beta[c] / N, gamma[c] + mu[c]
+
+    # Apenas S e I entram nas derivadas; R e D acumulam as remoções de I
+    dS1, dI1 = -b * S * I, b * S * I - remocao * I
+    S2, I2 = S + 0.5 * h * dS1, I + 0.5 * h * dI1
+    dS2, dI2 = -b * S2 * I2, b * S2 * I2 - remocao * I2
+    S3, I3 = S + 0.5 * h * dS2, I + 0.5 * h * dI2
+    dS3, dI3 = -b * S3 * I3, b * S3 * I3 - remocao * I3
+    S4, I4 = S + h * dS3, I + h * dI3
+    dS4, dI4 = -b * S4 * I4, b * S4 * I4 - remocao * I4
+
+    removidos = (h / 6) * (I + 2 * I2 + 2 * I3 + I4)
+    Y[0, c] = S + (h / 6) * (dS1 + 2 * dS2 + 2 * dS3 + dS4)
+    Y[1, c] = I + (h / 6) * (dI1 + 2 * dI2 + 2 * dI3 + dI4)
+    Y[2, c] += gamma[c] * removidos
+    Y[3, c] += mu[c] * removidos
+
+
+@njit(cache=True, parallel=True)
+def rk4_sird_celulas_jit(Y, beta, gamma, mu, h):
+    """
+    Avança cada célula de uma grade um passo de Runge-Kutta de 4ª ordem do modelo SIRD, no próprio array
+
+    Como a reação conserva a população da célula, N é a soma dos compartimentos no início do passo.
+    Só pode ser chamado da thread principal (ver em_thread_principal).
+
+    Parâmetros:
+    Y: array [4, células] com as linhas [S, I, R, D], atualizado no lugar
+    beta, gamma, mu: arrays [células] com os parâmetros de cada célula
+    h: passo de tempo
+    """
+    for c in prange(Y.shape[1]):
+        _rk4_sird_celula(Y, c, beta, gamma, mu, h)
+
+
+@njit(cache=True)
+def rk4_sird_celulas_sequencial_jit(Y, beta, gamma, mu, h):
+    """
+    Versão sequencial de rk4_sird_celulas_jit, que pode ser chamada de qualquer thread
+
+    Parâmetros: os mesmos de rk4_sird_celulas_jit
+    """
+    for c in range(Y.shape[1]):
+        _rk4_sird_celula(Y, c, beta, gamma, mu, h)
+
+
+# Núcleos compilados disponíveis, indexados pelo mesmo nome de modelo usado em SIMULADORES
+NUCLEOS_JIT = {
+    'SIR': derivadas_sir_jit,
+    'SIRD': derivadas_sird_jit,
+    'SIRD_duplo': derivadas_sird_duplo_jit,
+    'SIRD_vital': derivadas_sird_vital_jit,
+}
@@ -0,0 +1,264 @@
+import numpy as np
+
+from .jit import NUMBA_DISPONIVEL, NUCLEOS_JIT, em_thread_principal, rk4_lote_jit, rk4_lote_sequencial_jit
+from .simulador import periodo
+
+
+# Implementações do Runge-Kutta em lote; 'auto' usa o Numba quando ele está instalado
+BACKENDS = ('auto', 'numpy', 'numba')
+
+
+def derivadas_sir_lote(Y, beta, gamma, N):
+    """
+    Calcula as derivadas do modelo SIR para um lote inteiro de trajetórias de uma só vez
+
+    Parâmetros:
+    Y: array de formato [3, lote] com as linhas [S, I, R]
+    beta, gamma, N: arrays de formato [lote] (ou escalares) com os parâmetros de cada trajetória
+
+    Retorna:
+    Array de formato [3, lote] com as derivadas [dS/dt, dI/dt, dR/dt]
+    """
+    S, I, R = Y
+    infeccao = beta * S * I / N
+    recuperacao = gamma * I
+    return np.stack([-infeccao, infeccao - recuperacao, recuperacao])
+
+
+def derivadas_sird_lote(Y, beta, gamma, mu, N):
+    """
+    Calcula as derivadas do modelo SIRD para um lote inteiro de trajetórias de uma só vez
+
+    Parâmetros:
+    Y: array de formato [4, lote] com as linhas [S, I, R, D]
+    beta, gamma, mu, N: arrays de formato [lote] (ou escalares) com os parâmetros de cada trajetória
+
+    Retorna:
+    Array de formato [4, lote] com as derivadas [dS/dt, dI/dt, dR/dt, dD/dt]
+    """
+    S, I, R, D = Y
+    infeccao = beta * S * I / N
+    recuperacao = gamma * I
+    obitos = mu * I
+    return np.stack([-infeccao, infeccao - recuperacao - obitos, recuperacao, obitos])
+
+
+def derivadas_sird_duplo_lote(Y, beta_A, gamma_A, mu_A, N_A, beta_B, gamma_B, mu_B, N_B, k_AB, k_BA):
+    """
+    Calcula as derivadas do modelo SIRD de duas populações interagentes para um lote inteiro de trajetórias
+
+    Parâmetros:
+    Y: array de formato [8, lote] com as linhas [S_A, I_A, R_A, D_A, S_B, I_B, R_B, D_B]
+    beta_A, ..., k_BA: arrays de formato [lote] (ou escalares) com os parâmetros de cada trajetória
+
+    Retorna:
+    Array de formato [8, lote] com as derivadas, na mesma ordem de Y
+    """
+    S_A, I_A, R_A, D_A, S_B, I_B, R_B, D_B = Y
+    prop_A = I_A / N_A
+    prop_B = I_B / N_B
+    infeccao_A = S_A * (beta_A * prop_A + k_BA * prop_B)
+    infeccao_B = S_B * (beta_B * prop_B + k_AB * prop_A)
+    return np.stack([-infeccao_A, infeccao_A - (gamma_A + mu_A) * I_A, gamma_A * I_A, mu_A * I_A,
+                     -infeccao_B, infeccao_B - (gamma_B + mu_B) * I_B, gamma_B * I_B, mu_B * I_B])
+
+
+def derivadas_sird_vital_lote(Y, beta, gamma, delta, mu):
+    """
+    Calcula as derivadas do modelo SIRD com dinâmica vital para um lote inteiro de trajetórias
+
+    Parâmetros:
+    Y: array de formato [4, lote] com as linhas [S, I, R, D]
+    beta, gamma, delta, mu: arrays de formato [lote] (ou escalares) com os parâmetros de cada trajetória
+
+    Retorna:
+    Array de formato [4, lote] com as derivadas [dS/dt, dI/dt, dR/dt, dD/dt]
+    """
+    S, I, R, D = Y
+    N = S + I + R
+    infeccao = beta * S * I / N
+    recuperacao = gamma * I
+    obitos = delta * I
+    return np.stack([mu * N - infeccao - mu * S,
+                     infeccao - recuperacao - mu * I - obitos,
+                     recuperacao - mu * R,
+                     obitos])
+
+
+def integrar_rk4_lote(derivada, Y0, t, args=(), passos_por_dia=4):
+    """
+    Integra um lote de trajetórias com Runge-Kutta de 4ª ordem e passo fixo
+
+    Todas as trajetórias avançam juntas, de modo que cada avaliação das derivadas
+    é uma única operação vetorizada sobre o lote inteiro.
+
+    Parâmetros:
+    derivada: função no formato derivada(Y, *args) que recebe e devolve arrays [compartimentos, lote]
+    Y0: array de formato [compartimentos, lote] com as condições iniciais
+    t: instantes em que a solução é amostrada (o primeiro é o instante inicial)
+    args: parâmetros adicionais repassados para a derivada
+    passos_por_dia: número mínimo de passos internos por unidade de tempo
+
+    Retorna:
+    Array de formato [lote, len(t), compartimentos] com as trajetórias
+    """
+    Y = np.array(Y0, dtype=float)
+    resultado = np.empty((Y.shape[1], len(t), Y.shape[0]))
+    resultado[:, 0, :] = Y.T
+
+    for k in range(1, len(t)):
+        intervalo = t[k] - t[k - 1]
+        passos = max(1, int(np.ceil(intervalo * passos_por_dia)))
+        h = intervalo / passos
+        for _ in range(passos):
+            k1 = derivada(Y, *args)
+            k2 = derivada(Y + 0.5 * h * k1, *args)
+            k3 = derivada(Y + 0.5 * h * k2, *args)
+            k4 = derivada(Y + h * k3, *args)
+            Y = Y + (h / 6) * (k1 + 2 * k2 + 2 * k3 + k4)
+        resultado[:, k, :] = Y.T
+
+    return resultado
+
+
+def integrar_lote(modelo, Y0, parametros, t, passos_por_dia=4, backend='auto'):
+    """
+    Integra um lote de trajetórias de um dos modelos com o backend escolhido
+
+    Parâmetros:
+    modelo: nome do modelo ('SIR', 'SIRD', 'SIRD_duplo' ou 'SIRD_vital')
+    Y0: array de formato [compartimentos, lote] com as condições iniciais
+    parametros: tupla de arrays [lote], na ordem dos argumentos de derivadas_*_lote
+    t: instantes em que a solução é amostrada
+    passos_por_dia: número mínimo de passos internos por unidade de tempo
+    backend: 'numpy' (derivadas vetorizadas sobre o lote), 'numba' (núcleos compilados, em paralelo
+    apenas na thread principal) ou 'auto' (Numba, se instalado)
+
+    Retorna:
+    Array de formato [lote, len(t), compartimentos] com as trajetórias
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f'Backend desconhecido: {backend}. Use um de {BACKENDS}')
+    if backend == 'auto':
+        backend = 'numba' if NUMBA_DISPONIVEL else 'numpy'
+
+    if backend == 'numba':
+        if not NUMBA_DISPONIVEL:
+            raise ImportError('O backend numba exige o pacote numba instalado')
+        P = np.column_stack(np.broadcast_arrays(*parametros, Y0[0]))[:, :-1]
+        # Fora da thread principal (por exemplo, nas páginas do Streamlit) o núcleo paralelo trava o encerramento
+        rk4 = rk4_lote_jit if em_thread_principal() else rk4_lote_sequencial_jit
+        return rk4(NUCLEOS_JIT[modelo], np.ascontiguousarray(np.transpose(Y0), dtype=float),
+                   np.ascontiguousarray(P, dtype=float), np.asarray(t, dtype=float), passos_por_dia)
+
+    return integrar_rk4_lote(DERIVADAS_LOTE[modelo], Y0, t, parametros, passos_por_dia)
+
+
+def simular_sir_lote(beta, gamma, N, I0, dias, passos_por_dia=4, backend='auto'):
+    """
+    Integra o modelo SIR para vários conjuntos de parâmetros em uma única chamada
+
+    Parâmetros:
+    beta, gamma, N, I0: arrays (ou escalares) com os parâmetros de cada trajetória, combinados por broadcasting
+    dias: número de dias de simulação
+    passos_por_dia: número mínimo de passos internos do Runge-Kutta por dia
+    backend: implementação usada na integração (ver integrar_lote)
+
+    Retorna:
+    Tupla (t, resultado), em que resultado tem formato [lote, len(t), 3] com os compartimentos [S, I, R]
+    """
+    beta, gamma, N, I0 = np.broadcast_arrays(*(np.atleast_1d(np.asarray(x, dtype=float))
+                                               for x in (beta, gamma, N, I0)))
+    t = periodo(dias)
+    Y0 = np.stack([N - I0, I0, np.zeros_like(N)])
+    resultado = integrar_lote('SIR', Y0, (beta, gamma, N), t, passos_por_dia, backend)
+    return t, resultado
+
+
+def simular_sird_lote(beta, gamma, mu, N, I0, dias, passos_por_dia=4, backend='auto'):
+    """
+    Integra o modelo SIRD para vários conjuntos de parâmetros em uma única chamada
+
+    Parâmetros:
+    beta, gamma, mu, N, I0: arrays (ou escalares) com os parâmetros de cada trajetória, combinados por broadcasting
+    dias: número de dias de simulação
+    passos_por_dia: número mínimo de passos internos do Runge-Kutta por dia
+    backend: implementação usada na integração (ver integrar_lote)
+
+    Retorna:
+    Tupla (t, resultado), em que resultado tem formato [lote, len(t), 4] com os compartimentos [S, I, R, D]
+    """
+    beta, gamma, mu, N, I0 = np.broadcast_arrays(*(np.atleast_1d(np.asarray(x, dtype=float))
+                                                   for x in (beta, gamma, mu, N, I0)))
+    t = periodo(dias)
+    zeros = np.zeros_like(N)
+    Y0 = np.stack([N - I0, I0, zeros, zeros])
+    resultado = integrar_lote('SIRD', Y0, (beta, gamma, mu, N), t, passos_por_dia, backend)
+    return t, resultado
+
+
+def simular_sird_vital_lote(beta, gamma, delta, mu, N, I0, dias, passos_por_dia=4, backend='auto'):
+    """
+    Integra o modelo SIRD com dinâmica vital para vários conjuntos de parâmetros em uma única chamada
+
+    Parâmetros:
+    beta, gamma, delta, mu, N, I0: arrays (ou escalares) com os parâmetros de cada trajetória, combinados por broadcasting
+    dias: número de dias de simulação
+    passos_por_dia: número mínimo de passos internos do Runge-Kutta por dia
+    backend: implementação usada na integração (ver integrar_lote)
+
+    Retorna:
+    Tupla (t, resultado), em que resultado tem formato [lote, len(t), 4] com os compartimentos [S, I, R, D]
+    """
+    beta, gamma, delta, mu, N, I0 = np.broadcast_arrays(*(np.atleast_1d(np.asarray(x, dtype=float))
+                                                          for x in (beta, gamma, delta, mu, N, I0)))
+    t = periodo(dias)
+    zeros = np.zeros_like(N)
+    Y0 = np.stack([N - I0, I0, zeros, zeros])
+    resultado = integrar_lote('SIRD_vital', Y0, (beta, gamma, delta, mu), t, passos_por_dia, backend)
+    return t, resultado
+
+
+def simular_sird_duplo_lote(N_A, I0_A, beta_A, gamma_A, mu_A,
+                            N_B, I0_B, beta_B, gamma_B, mu_B,
+                            k_AB, k_BA, dias, passos_por_dia=4, backend='auto'):
+    """
+    Integra o modelo SIRD de duas populações interagentes para vários conjuntos de parâmetros em uma única chamada
+
+    Parâmetros:
+    N_A, ..., k_BA: arrays (ou escalares) com os parâmetros de cada trajetória, combinados por broadcasting
+    dias: número de dias de simulação
+    passos_por_dia: número mínimo de passos internos do Runge-Kutta por dia
+    backend: implementação usada na integração (ver integrar_lote)
+
+    Retorna:
+    Tupla (t, resultado), em que resultado tem formato [lote, len(t), 8] com os compartimentos
+    [S_A, I_A, R_A, D_A, S_B, I_B, R_B, D_B]
+    """
+    (N_A, I0_A, beta_A, gamma_A, mu_A,
+     N_B, I0_B, beta_B, gamma_B, mu_B, k_AB, k_BA) = np.broadcast_arrays(
+        *(np.atleast_1d(np.asarray(x, dtype=float))
+          for x in (N_A, I0_A, beta_A, gamma_A, mu_A, N_B, I0_B, beta_B, gamma_B, mu_B, k_AB, k_BA)))
+    t = periodo(dias)
+    zeros = np.zeros_like(N_A)
+    Y0 = np.stack([N_A - I0_A, I0_A, zeros, zeros, N_B - I0_B, I0_B, zeros, zeros])
+    parametros = (beta_A, gamma_A, mu_A, N_A, beta_B, gamma_B, mu_B, N_B, k_AB, k_BA)
+    resultado = integrar_lote('SIRD_duplo', Y0, parametros, t, passos_por_dia, backend)
+    return t, resultado
+
+
+# Derivadas vetorizadas sobre o lote, indexadas pelo nome do modelo
+DERIVADAS_LOTE = {
+    'SIR': derivadas_sir_lote,
+    'SIRD': derivadas_sird_lote,
+    'SIRD_duplo': derivadas_sird_duplo_lote,
+    'SIRD_vital': derivadas_sird_vital_lote,
+}
+
+# Nomes, na ordem de derivadas_*_lote, dos parâmetros de cada modelo
+ARGUMENTOS_LOTE = {
+    'SIR': ('beta', 'gamma', 'N'),
+    'SIRD': ('beta', 'gamma', 'mu', 'N'),
+    'SIRD_duplo': ('beta_A', 'gamma_A', 'mu_A', 'N_A', 'beta_B', 'gamma_B', 'mu_B', 'N_B', 'k_AB', 'k_BA'),
+    'SIRD_vital': ('beta', 'gamma', 'delta', 'mu'),
+}
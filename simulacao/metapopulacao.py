@@ -0,0 +1,89 @@
+import numpy as np
+from scipy import sparse
+
+
+def matriz_mobilidade(cidades, mobilidade, esparsa=False):
+    """
+    Converte o dicionário de mobilidade {(origem, destino): viajantes} em uma matriz
+
+    Parâmetros:
+    cidades: lista com o nome das cidades, que define a ordem das linhas e colunas
+    mobilidade: dicionário com o número de viajantes de cada par (origem, destino)
+    esparsa: se True, devolve uma matriz scipy.sparse no formato CSR
+
+    Retorna:
+    Matriz [cidades, cidades] em que o elemento [o, d] é o número de viajantes de o para d
+    """
+    indice = {cidade: i for i, cidade in enumerate(cidades)}
+    linhas = [indice[origem] for origem, _ in mobilidade]
+    colunas = [indice[destino] for _, destino in mobilidade]
+    valores = np.fromiter(mobilidade.values(), dtype=float, count=len(mobilidade))
+
+    matriz = sparse.coo_matrix((valores, (linhas, colunas)), shape=(len(cidades), len(cidades)))
+    return matriz.tocsr() if esparsa else matriz.toarray()
+
+
+def _importacao(mobilidade):
+    """
+    Prepara o operador que calcula os infectados importados por cada cidade
+
+    Parâmetros:
+    mobilidade: matriz densa ou esparsa [origem, destino] com o número de viajantes
+
+    Retorna:
+    Matriz transposta [destino, origem], sem a diagonal, pronta para o produto matriz-vetor
+    """
+    if sparse.issparse(mobilidade):
+        operador = sparse.csr_matrix(mobilidade.T, dtype=float)
+        operador.setdiag(0)
+        operador.eliminate_zeros()
+        return operador
+
+    operador = np.array(mobilidade, dtype=float).T
+    np.fill_diagonal(operador, 0)
+    return operador
+
+
+def simular_metapopulacao(S0, I0, R0, mobilidade, beta, gamma, dias):
+    """
+    Simula o modelo SIR em tempo discreto (passo de um dia) para várias cidades acopladas pela mobilidade
+
+    A cada dia, cada cidade recebe viajantes * I_origem / N_origem infectados importados de
+    cada outra cidade, calculados de uma vez por um único produto matriz-vetor.
+
+    Parâmetros:
+    S0, I0, R0: arrays [cidades] com os valores iniciais de cada compartimento
+    mobilidade: matriz densa ou scipy.sparse [origem, destino] com o número de viajantes diários
+    beta: taxa de transmissão (escalar ou array [cidades])
+    gamma: taxa de recuperação (escalar ou array [cidades])
+    dias: número de dias de simulação
+
+    Retorna:
+    Array de formato [dias + 1, cidades, 3] com os compartimentos [S, I, R] de cada cidade em cada dia
+    """
+    S0, I0, R0 = (np.asarray(x, dtype=float) for x in (S0, I0, R0))
+    N = S0 + I0 + R0
+    inverso_N = np.divide(1.0, N, out=np.zeros_like(N), where=N > 0)
+    operador = _importacao(mobilidade)
+
+    resultado = np.empty((dias + 1, len(N), 3))
+    resultado[0, :, 0] = S0
+    resultado[0, :, 1] = I0
+    resultado[0, :, 2] = R0
+
+    for dia in range(dias):
+        S, I, R = resultado[dia, :, 0], resultado[dia, :, 1], resultado[dia, :, 2]
+
+        # Proporção de infectados em cada cidade de origem e infectados importados por cada destino
+        proporcao_infectados = I * inverso_N
+        importados = operador @ proporcao_infectados
+
+        # Dinâmica SIR dentro de cada cidade
+        novos_infectados = beta * S * proporcao_infectados
+        novos_recuperados = gamma * I
+
+        resultado[dia + 1, :, 0] = S - novos_infectados
+        resultado[dia + 1, :, 1] = I + novos_infectados - novos_recuperados + importados
+        resultado[dia + 1, :, 2] = R + novos_recuperados
+
+    return resultado
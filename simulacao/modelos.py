@@ -0,0 +1,308 @@
+import numpy as np
+
+
+def modelo_sir(vetor, t, beta, gamma, N):
+    """
+    Calcula as derivadas das variáveis do modelo epidemiológico SIR
+
+    Parâmetros:
+    vetor: lista ou array contendo os valores atuais de [S, I, R] no tempo t
+    t: tempo atual (passado automaticamente por odeint e não usado diretamente nessa função)
+    beta: taxa de transmissão
+    gamma: taxa de recuperação
+    N: população total
+
+    Retorna:
+    Array com as derivadas correspondentes aos compartimentos:
+    [dS/dt, dI/dt, dR/dt]
+    """
+    S, I, R = vetor
+    dS = -beta * S * I / N
+    dI = beta * S * I / N - gamma * I
+    dR = gamma * I
+    return np.array([dS, dI, dR])
+
+
+def jacobiana_sir(vetor, t, beta, gamma, N):
+    """
+    Calcula a matriz jacobiana analítica do modelo SIR
+
+    Parâmetros:
+    Os mesmos de modelo_sir
+
+    Retorna:
+    Matriz 3x3 com as derivadas parciais d(derivada_i)/d(estado_j), na ordem [S, I, R]
+    """
+    S, I, R = vetor
+    a = beta / N
+    return np.array([[-a * I, -a * S, 0.0],
+                     [a * I, a * S - gamma, 0.0],
+                     [0.0, gamma, 0.0]])
+
+
+def derivadas_parametros_sir(vetor, t, beta, gamma, N):
+    """
+    Calcula as derivadas parciais do lado direito do modelo SIR em relação aos parâmetros
+
+    Parâmetros:
+    Os mesmos de modelo_sir
+
+    Retorna:
+    Matriz 3x2 em que a coluna j é d(derivadas)/d(parâmetro j), na ordem [beta, gamma]
+    """
+    S, I, R = vetor
+    return np.array([[-S * I / N, 0.0],
+                     [S * I / N, -I],
+                     [0.0, I]])
+
+
+def modelo_sird(vetor, t, beta, gamma, mu, N):
+    """
+    Calcula as derivadas das variáveis do modelo epidemiológico SIRD
+
+    Parâmetros:
+    vetor: lista ou array contendo os valores atuais de [S, I, R, D] no tempo t
+    t: tempo atual (passado automaticamente por odeint e não usado diretamente nessa função)
+    beta: taxa de transmissão
+    gamma: taxa de recuperação
+    mu: taxa de mortalidade da doença
+    N: população total
+
+    Retorna:
+    Array com as derivadas correspondentes aos compartimentos:
+    [dS/dt, dI/dt, dR/dt, dD/dt]
+    """
+    S, I, R, D = vetor
+
+    # O número de susceptíveis reduz, por isso beta está negativo
+    dS = -beta * S * I / N
+
+    # Novas infecções menos recuperações (gamma * I) e óbitos causados pela doença (mu * I)
+    dI = beta * S * I / N - gamma * I - mu * I
+
+    # O número de recuperados aumenta conforme os infectados se recuperam
+    dR = gamma * I
+
+    # O número de mortos aumenta proporcionalmente ao número de infectados (mu)
+    dD = mu * I
+
+    return np.array([dS, dI, dR, dD])
+
+
+def jacobiana_sird(vetor, t, beta, gamma, mu, N):
+    """
+    Calcula a matriz jacobiana analítica do modelo SIRD
+
+    Parâmetros:
+    Os mesmos de modelo_sird
+
+    Retorna:
+    Matriz 4x4 com as derivadas parciais d(derivada_i)/d(estado_j), na ordem [S, I, R, D]
+    """
+    S, I, R, D = vetor
+    a = beta / N
+    return np.array([[-a * I, -a * S, 0.0, 0.0],
+                     [a * I, a * S - gamma - mu, 0.0, 0.0],
+                     [0.0, gamma, 0.0, 0.0],
+                     [0.0, mu, 0.0, 0.0]])
+
+
+def derivadas_parametros_sird(vetor, t, beta, gamma, mu, N):
+    """
+    Calcula as derivadas parciais do lado direito do modelo SIRD em relação aos parâmetros
+
+    Parâmetros:
+    Os mesmos de modelo_sird
+
+    Retorna:
+    Matriz 4x3 em que a coluna j é d(derivadas)/d(parâmetro j), na ordem [beta, gamma, mu]
+    """
+    S, I, R, D = vetor
+    return np.array([[-S * I / N, 0.0, 0.0],
+                     [S * I / N, -I, -I],
+                     [0.0, I, 0.0],
+                     [0.0, 0.0, I]])
+
+
+def matriz_contato_duplo(beta_A, beta_B, k_AB, k_BA):
+    """
+    Monta a matriz de contato do modelo de duas populações interagentes
+
+    Parâmetros:
+    beta_A, beta_B: taxas de transmissão internas de cada população
+    k_AB: fator de transmissão de A para B
+    k_BA: fator de transmissão de B para A
+
+    Retorna:
+    Matriz 2x2 em que o elemento [i, j] é a taxa com que infectados de j infectam suscetíveis de i
+    """
+    return np.array([[beta_A, k_BA],
+                     [k_AB, beta_B]], dtype=float)
+
+
+def modelo_sird_k(vetor, t, C, gamma, mu, N):
+    """
+    Calcula as derivadas do modelo SIRD com K populações acopladas por uma matriz de contato
+
+    Parâmetros:
+    vetor: array com 4K valores na ordem [S_1, I_1, R_1, D_1, ..., S_K, I_K, R_K, D_K]
+    t: tempo atual (passado automaticamente por odeint e não usado diretamente nessa função)
+    C: matriz de contato [K, K]; C[i, j] é a taxa com que infectados de j infectam suscetíveis de i
+    gamma, mu, N: arrays [K] com a taxa de recuperação, a taxa de mortalidade e a população de cada grupo
+
+    Retorna:
+    Array com 4K derivadas, na mesma ordem do vetor de estado
+    """
+    Y = np.reshape(vetor, (-1, 4))
+    S, I = Y[:, 0], Y[:, 1]
+
+    # Força de infecção sobre cada população: um único produto matriz-vetor
+    forca = C @ (I / N)
+    infeccao = S * forca
+
+    derivadas = np.empty_like(Y)
+    derivadas[:, 0] = -infeccao
+    derivadas[:, 1] = infeccao - (gamma + mu) * I
+    derivadas[:, 2] = gamma * I
+    derivadas[:, 3] = mu * I
+    return derivadas.ravel()
+
+
+def jacobiana_sird_k(vetor, t, C, gamma, mu, N):
+    """
+    Calcula a matriz jacobiana analítica do modelo SIRD com K populações
+
+    Parâmetros:
+    Os mesmos de modelo_sird_k
+
+    Retorna:
+    Matriz [4K, 4K] com as derivadas parciais d(derivada_i)/d(estado_j)
+    """
+    Y = np.reshape(vetor, (-1, 4))
+    K = Y.shape[0]
+    S, I = Y[:, 0], Y[:, 1]
+    forca = C @ (I / N)
+
+    # J[i, a, j, b] = d(derivada do compartimento a de i) / d(compartimento b de j)
+    J = np.zeros((K, 4, K, 4))
+    acoplamento = S[:, None] * C / N[None, :]
+    diagonal = np.arange(K)
+
+    J[:, 0, :, 1] = -acoplamento
+    J[:, 1, :, 1] = acoplamento
+    J[diagonal, 0, diagonal, 0] = -forca
+    J[diagonal, 1, diagonal, 0] = forca
+    J[diagonal, 1, diagonal, 1] -= gamma + mu
+    J[diagonal, 2, diagonal, 1] = gamma
+    J[diagonal, 3, diagonal, 1] = mu
+    return J.reshape(4 * K, 4 * K)
+
+
+def derivadas_parametros_sird_k(vetor, t, C, gamma, mu, N):
+    """
+    Calcula as derivadas parciais do lado direito do modelo SIRD com K populações em relação aos parâmetros
+
+    Parâmetros:
+    Os mesmos de modelo_sird_k
+
+    Retorna:
+    Matriz [4K, K² + 2K] cujas colunas são, em ordem, os elementos de C (linha a linha),
+    gamma_1, ..., gamma_K e mu_1, ..., mu_K
+    """
+    Y = np.reshape(vetor, (-1, 4))
+    K = Y.shape[0]
+    S, I = Y[:, 0], Y[:, 1]
+    diagonal = np.arange(K)
+
+    # P[i, a, coluna] = d(derivada do compartimento a de i) / d(parâmetro da coluna)
+    P = np.zeros((K, 4, K * K + 2 * K))
+
+    # d(infecção_i)/dC[i, j] = S_i * I_j / N_j, apenas na linha i da matriz de contato
+    infeccao = np.zeros((K, K, K))
+    infeccao[diagonal, diagonal, :] = S[:, None] * I[None, :] / N[None, :]
+    P[:, 0, :K * K] = -infeccao.reshape(K, K * K)
+    P[:, 1, :K * K] = infeccao.reshape(K, K * K)
+
+    P[diagonal, 1, K * K + diagonal] = -I
+    P[diagonal, 2, K * K + diagonal] = I
+    P[diagonal, 1, K * K + K + diagonal] = -I
+    P[diagonal, 3, K * K + K + diagonal] = I
+    return P.reshape(4 * K, K * K + 2 * K)
+
+
+def modelo_sird_vital(vetor, t, beta, gamma, delta, mu):
+    """
+    Calcula as derivadas do modelo epidemiológico SIRD com dinâmica vital (natalidade e mortalidade natural)
+
+    Parâmetros:
+    vetor: lista ou array contendo os valores atuais de [S, I, R, D] no tempo t
+    t: tempo atual (passado automaticamente por odeint e não usado diretamente nessa função)
+    beta: taxa de transmissão
+    gamma: taxa de recuperação
+    delta: taxa de mortalidade causada pela doença
+    mu: taxa de natalidade/mortalidade natural
+
+    Retorna:
+    Array com as derivadas de cada compartimento:
+    [dS/dt, dI/dt, dR/dt, dD/dt]
+    """
+    S, I, R, D = vetor
+
+    # População viva, isto é, não inclui os mortos
+    N = S + I + R
+
+    # Natalidade (mu * N), infecção e mortalidade natural (mu * S)
+    dS = mu * N - beta * S * I / N - mu * S
+
+    # Infecção, recuperação, mortalidade natural e mortalidade por doença
+    dI = beta * S * I / N - gamma * I - mu * I - delta * I
+
+    # Recuperação e mortalidade natural
+    dR = gamma * I - mu * R
+
+    # Óbitos causados pela doença
+    dD = delta * I
+
+    return np.array([dS, dI, dR, dD])
+
+
+def jacobiana_sird_vital(vetor, t, beta, gamma, delta, mu):
+    """
+    Calcula a matriz jacobiana analítica do modelo SIRD com dinâmica vital
+
+    Parâmetros:
+    Os mesmos de modelo_sird_vital
+
+    Retorna:
+    Matriz 4x4 com as derivadas parciais d(derivada_i)/d(estado_j), na ordem [S, I, R, D]
+    """
+    S, I, R, D = vetor
+    N = S + I + R
+
+    # Derivadas parciais do termo de infecção beta * S * I / N, lembrando que N = S + I + R
+    dinf_dS = beta * I * (N - S) / N**2
+    dinf_dI = beta * S * (N - I) / N**2
+    dinf_dR = -beta * S * I / N**2
+
+    return np.array([[-dinf_dS, mu - dinf_dI, mu - dinf_dR, 0.0],
+                     [dinf_dS, dinf_dI - gamma - mu - delta, dinf_dR, 0.0],
+                     [0.0, gamma, -mu, 0.0],
+                     [0.0, delta, 0.0, 0.0]])
+
+
+def derivadas_parametros_sird_vital(vetor, t, beta, gamma, delta, mu):
+    """
+    Calcula as derivadas parciais do lado direito do modelo SIRD com dinâmica vital em relação aos parâmetros
+
+    Parâmetros:
+    Os mesmos de modelo_sird_vital
+
+    Retorna:
+    Matriz 4x4 em que a coluna j é d(derivadas)/d(parâmetro j), na ordem [beta, gamma, delta, mu]
+    """
+    S, I, R, D = vetor
+    N = S + I + R
+    return np.array([[-S * I / N, 0.0, 0.0, N - S],
+                     [S * I / N, -I, -I, -I],
+                     [0.0, I, 0.0, -R],
+                     [0.0, 0.0, I, 0.0]])
@@ -0,0 +1,197 @@
+"""
+Modelos SIR e SIRD baseados em agentes sobre uma rede de contatos
+
+A rede é guardada no formato CSR: os vizinhos do nó v são indices[indptr[v]:indptr[v + 1]].
+O estado de cada nó ocupa um byte (SUSCETIVEL, INFECTADO, RECUPERADO ou FALECIDO).
+
+O tempo é discreto, com passo de um dia. Um nó infectado no dia t transmite a cada vizinho
+suscetível, em cada um dos dias t + 1, ..., t + L, com probabilidade 1 - exp(-beta), e é
+removido ao final do dia t + L, em que L segue a distribuição geométrica de parâmetro
+1 - exp(-(gamma + mu)); a remoção é um óbito com probabilidade mu / (gamma + mu).
+
+Em vez de sortear uma tentativa por aresta em cada dia, as arestas de um nó são percorridas uma
+única vez, no dia em que ele é infectado (a fronteira da epidemia): para cada vizinho suscetível,
+sorteia-se o dia da primeira transmissão bem-sucedida, que só vale se cair dentro do período
+infeccioso. Cada nó guarda o dia mais cedo proposto pelos vizinhos, que é o dia em que será
+infectado. O resultado tem a mesma distribuição das tentativas diárias, mas cada aresta é
+visitada no máximo uma vez por direção.
+
+Aqui beta é a taxa de transmissão por contato; nos modelos de mistura homogênea, a taxa
+equivalente é aproximadamente beta vezes o grau médio da rede.
+"""
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from .simulador import periodo
+
+
+# Estados de cada nó
+SUSCETIVEL, INFECTADO, RECUPERADO, FALECIDO = 0, 1, 2, 3
+
+# Dia usado para "nunca" nos agendamentos de infecção e remoção
+_NUNCA = np.iinfo(np.int32).max
+
+
+def rede_csr(origens, destinos, nos=None):
+    """
+    Monta a rede não direcionada no formato CSR a partir de uma lista de arestas
+
+    Laços (arestas de um nó para ele mesmo) e arestas repetidas são descartados.
+
+    Parâmetros:
+    origens, destinos: arrays inteiros com as extremidades de cada aresta, numeradas a partir de 0
+    nos: número de nós da rede (padrão: maior índice + 1)
+
+    Retorna:
+    Tupla (indptr, indices) com os ponteiros das linhas e os vizinhos de cada nó
+    """
+    origens = np.asarray(origens, dtype=np.int64)
+    destinos = np.asarray(destinos, dtype=np.int64)
+    if nos is None:
+        nos = int(max(origens.max(initial=-1), destinos.max(initial=-1))) + 1
+
+    validas = origens != destinos
+    origens, destinos = origens[validas], destinos[validas]
+    # Índices de 32 bits sempre que possível, metade da memória das redes grandes
+    tipo = np.int32 if nos <= np.iinfo(np.int32).max else np.int64
+    linhas = np.concatenate([origens, destinos]).astype(tipo)
+    colunas = np.concatenate([destinos, origens]).astype(tipo)
+    # Apenas a estrutura interessa: os valores somados das arestas repetidas são ignorados
+    matriz = sparse.csr_array((np.ones(linhas.size, dtype=np.int8), (linhas, colunas)), shape=(nos, nos))
+    matriz.sum_duplicates()
+    return matriz.indptr, matriz.indices
+
+
+def carregar_arestas(caminho, nos=None, separador=r'\s+', comentario='#'):
+    """
+    Lê uma lista de arestas em texto, com um par de nós por linha, e monta a rede CSR
+
+    Parâmetros:
+    caminho: arquivo com as arestas (por exemplo "0 1"), numeradas a partir de 0
+    nos: número de nós da rede (padrão: maior índice + 1)
+    separador: separador das colunas (padrão: espaços ou tabulações)
+    comentario: caractere que inicia linhas de comentário
+
+    Retorna:
+    Tupla (indptr, indices), como em rede_csr
+    """
+    arestas = pd.read_csv(caminho, sep=separador, comment=comentario, header=None, usecols=[0, 1],
+                          dtype=np.int64).to_numpy()
+    return rede_csr(arestas[:, 0], arestas[:, 1], nos)
+
+
+def rede_aleatoria(nos, arestas, semente=None):
+    """
+    Gera uma rede aleatória de Erdős-Rényi com aproximadamente o número de arestas pedido
+
+    Parâmetros:
+    nos: número de nós
+    arestas: número de arestas sorteadas (laços e repetições são descartados)
+    semente: semente do gerador aleatório
+
+    Retorna:
+    Tupla (indptr, indices), como em rede_csr
+    """
+    rng = np.random.default_rng(semente)
+    return rede_csr(rng.integers(0, nos, arestas), rng.integers(0, nos, arestas), nos)
+
+
+def _vizinhos(indptr, indices, fronteira):
+    """
+    Reúne os vizinhos de todos os nós da fronteira de uma só vez
+
+    Retorna:
+    Tupla (vizinhos, graus): os vizinhos concatenados, na ordem dos nós da fronteira, e o grau de cada nó
+    """
+    inicio = indptr[fronteira]
+    graus = indptr[fronteira + 1] - inicio
+    deslocamento = np.repeat(inicio - (np.cumsum(graus) - graus), graus)
+    return indices[deslocamento + np.arange(deslocamento.size)], graus
+
+
+def simular_rede_sird(indptr, indices, beta, gamma, mu, dias, I0=1, infectados_iniciais=None, semente=None):
+    """
+    Simula o modelo SIRD baseado em agentes sobre uma rede de contatos
+
+    Parâmetros:
+    indptr, indices: rede no formato CSR (ver rede_csr e carregar_arestas)
+    beta: taxa de transmissão por contato (por dia)
+    gamma: taxa de recuperação
+    mu: taxa de mortalidade da doença
+    dias: número de dias de simulação
+    I0: número de infectados iniciais, sorteados entre os nós (ignorado se infectados_iniciais for dado)
+    infectados_iniciais: índices dos nós infectados no dia 0
+    semente: semente do gerador aleatório, para resultados reprodutíveis
+
+    Retorna:
+    Tupla (t, resultado), em que resultado é um array inteiro [len(t), 4] com o número de nós
+    em cada compartimento [S, I, R, D] ao final de cada dia
+    """
+    rng = np.random.default_rng(semente)
+    nos = len(indptr) - 1
+    t = periodo(dias)
+
+    p_transmissao = -np.expm1(-beta)
+    remocao = gamma + mu
+    p_remocao = -np.expm1(-remocao)
+    fracao_obitos = mu / remocao if remocao > 0 else 0.0
+
+    estado = np.zeros(nos, dtype=np.uint8)
+    infeccao = np.full(nos, _NUNCA, dtype=np.int32)  # dia em que cada nó será infectado
+    fim_infeccao = np.full(nos, _NUNCA, dtype=np.int32)  # dia ao final do qual cada nó é removido
+    if infectados_iniciais is None:
+        infectados_iniciais = rng.choice(nos, size=int(I0), replace=False)
+    infeccao[np.asarray(infectados_iniciais)] = 0
+
+    resultado = np.empty((len(t), 4), dtype=np.int64)
+    contagem = np.array([nos, 0, 0, 0], dtype=np.int64)
+    for dia in range(dias + 1):
+        # Nós infectados hoje formam a fronteira: sorteia quanto tempo ficam infecciosos
+        fronteira = np.flatnonzero(infeccao == dia)
+        estado[fronteira] = INFECTADO
+        duracao = (rng.geometric(p_remocao, fronteira.size) if p_remocao > 0
+                   else np.full(fronteira.size, dias + 1))
+        fim_infeccao[fronteira] = np.minimum(dia + duracao, _NUNCA)
+
+        # Primeira transmissão bem-sucedida a cada vizinho ainda suscetível, dentro do período infeccioso
+        if p_transmissao > 0 and fronteira.size:
+            vizinhos, graus = _vizinhos(indptr, indices, fronteira)
+            suscetiveis = estado[vizinhos] == SUSCETIVEL
+            vizinhos = vizinhos[suscetiveis]
+            atraso = rng.geometric(p_transmissao, vizinhos.size)
+            validas = atraso <= np.repeat(duracao, graus)[suscetiveis]
+            vizinhos, dia_proposto = vizinhos[validas], dia + atraso[validas]
+            proximas = dia_proposto <= dias
+            vizinhos, dia_proposto = vizinhos[proximas], dia_proposto[proximas]
+
+            # Guarda o dia mais cedo: com índices repetidos prevalece a última escrita,
+            # então as propostas são aplicadas da mais tardia para a mais cedo
+            ordem = np.argsort(-dia_proposto, kind='stable')
+            vizinhos, dia_proposto = vizinhos[ordem], dia_proposto[ordem]
+            infeccao[vizinhos] = np.minimum(infeccao[vizinhos], dia_proposto)
+
+        # Remoções ao final do dia
+        removidos = np.flatnonzero(fim_infeccao == dia)
+        obitos = rng.random(removidos.size) < fracao_obitos
+        estado[removidos] = np.where(obitos, FALECIDO, RECUPERADO)
+
+        n_obitos = int(np.count_nonzero(obitos))
+        contagem += (-fronteira.size, fronteira.size - removidos.size, removidos.size - n_obitos, n_obitos)
+        resultado[dia] = contagem
+
+    return t, resultado
+
+
+def simular_rede_sir(indptr, indices, beta, gamma, dias, I0=1, infectados_iniciais=None, semente=None):
+    """
+    Simula o modelo SIR baseado em agentes sobre uma rede de contatos
+
+    Parâmetros:
+    Os mesmos de simular_rede_sird, sem a taxa de mortalidade
+
+    Retorna:
+    Tupla (t, resultado), em que resultado é um array inteiro [len(t), 3] com [S, I, R]
+    """
+    t, resultado = simular_rede_sird(indptr, indices, beta, gamma, 0.0, dias, I0, infectados_iniciais, semente)
+    return t, resultado[:, :3]
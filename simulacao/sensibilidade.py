@@ -0,0 +1,188 @@
+"""
+Análise de sensibilidade direta (forward): d(estado)/d(parâmetro) integrado junto com a trajetória
+
+Para y' = f(y, p), as sensibilidades s = dy/dp obedecem a s' = J(y) s + df/dp, em que J é a
+jacobiana de f. Integrar o sistema aumentado [y, s] fornece todas as derivadas em uma única
+passagem, sem as N + 1 integrações das diferenças finitas.
+"""
+import numpy as np
+
+from .modelos import (modelo_sir, modelo_sird, modelo_sird_k, modelo_sird_vital,
+                      jacobiana_sir, jacobiana_sird, jacobiana_sird_k, jacobiana_sird_vital,
+                      derivadas_parametros_sir, derivadas_parametros_sird, derivadas_parametros_sird_k,
+                      derivadas_parametros_sird_vital, matriz_contato_duplo)
+from .simulador import ATOL_PADRAO, RTOL_PADRAO, integrar, periodo
+
+
+# Colunas de derivadas_parametros_sird_k (K = 2) correspondentes a
+# [beta_A, gamma_A, mu_A, beta_B, gamma_B, mu_B, k_AB, k_BA]; C = [[beta_A, k_BA], [k_AB, beta_B]]
+_COLUNAS_DUPLO = [0, 4, 6, 3, 5, 7, 2, 1]
+
+
+def _derivadas_parametros_duplo(vetor, t, C, gamma, mu, N):
+    return derivadas_parametros_sird_k(vetor, t, C, gamma, mu, N)[:, _COLUNAS_DUPLO]
+
+
+def _argumentos_duplo(p, fixos):
+    C = matriz_contato_duplo(p['beta_A'], p['beta_B'], p['k_AB'], p['k_BA'])
+    return (C, np.array([p['gamma_A'], p['gamma_B']]), np.array([p['mu_A'], p['mu_B']]),
+            np.array([fixos['N_A'], fixos['N_B']], dtype=float))
+
+
+# Para cada modelo: parâmetros diferenciáveis (na ordem das colunas das sensibilidades), funções do
+# modelo e como montar, a partir dos parâmetros e dos valores fixos, os argumentos e o estado inicial
+MODELOS_SENSIBILIDADE = {
+    'SIR': {
+        'parametros': ('beta', 'gamma'),
+        'derivada': modelo_sir,
+        'jacobiana': jacobiana_sir,
+        'derivada_parametros': derivadas_parametros_sir,
+        'argumentos': lambda p, fixos: (p['beta'], p['gamma'], fixos['N']),
+        'inicial': lambda fixos: [fixos['N'] - fixos['I0'], fixos['I0'], 0],
+    },
+    'SIRD': {
+        'parametros': ('beta', 'gamma', 'mu'),
+        'derivada': modelo_sird,
+        'jacobiana': jacobiana_sird,
+        'derivada_parametros': derivadas_parametros_sird,
+        'argumentos': lambda p, fixos: (p['beta'], p['gamma'], p['mu'], fixos['N']),
+        'inicial': lambda fixos: [fixos['N'] - fixos['I0'], fixos['I0'], 0, 0],
+    },
+    'SIRD_duplo': {
+        'parametros': ('beta_A', 'gamma_A', 'mu_A', 'beta_B', 'gamma_B', 'mu_B', 'k_AB', 'k_BA'),
+        'derivada': modelo_sird_k,
+        'jacobiana': jacobiana_sird_k,
+        'derivada_parametros': _derivadas_parametros_duplo,
+        'argumentos': _argumentos_duplo,
+        'inicial': lambda fixos: [fixos['N_A'] - fixos['I0_A'], fixos['I0_A'], 0, 0,
+                                  fixos['N_B'] - fixos['I0_B'], fixos['I0_B'], 0, 0],
+    },
+    'SIRD_vital': {
+        'parametros': ('beta', 'gamma', 'delta', 'mu'),
+        'derivada': modelo_sird_vital,
+        'jacobiana': jacobiana_sird_vital,
+        'derivada_parametros': derivadas_parametros_sird_vital,
+        'argumentos': lambda p, fixos: (p['beta'], p['gamma'], p['delta'], p['mu']),
+        'inicial': lambda fixos: [fixos['N'] - fixos['I0'], fixos['I0'], 0, 0],
+    },
+}
+
+
+def integrar_sensibilidades(derivada, jacobiana, derivada_parametros, vetor_inicial, t, args=(),
+                            metodo='LSODA', rtol=RTOL_PADRAO, atol=ATOL_PADRAO):
+    """
+    Integra o estado e as sensibilidades em relação aos parâmetros em uma única passagem
+
+    Parâmetros:
+    derivada, jacobiana, derivada_parametros: funções do modelo no formato (vetor, t, *args)
+    vetor_inicial: condições iniciais (que não dependem dos parâmetros, logo s(0) = 0)
+    t: instantes em que a solução é amostrada
+    args: parâmetros repassados às funções do modelo
+    metodo, rtol, atol: método de integração e tolerâncias (ver integrar)
+
+    Retorna:
+    Tupla (resultado, sensibilidades) com formatos [len(t), n] e [len(t), n, p]
+    """
+    vetor_inicial = np.asarray(vetor_inicial, dtype=float)
+    n = vetor_inicial.size
+    p = np.shape(derivada_parametros(vetor_inicial, t[0], *args))[1]
+
+    def sistema_aumentado(z, tempo, *args):
+        y = z[:n]
+        s = z[n:].reshape(n, p)
+        ds = jacobiana(y, tempo, *args) @ s + derivada_parametros(y, tempo, *args)
+        return np.concatenate([derivada(y, tempo, *args), ds.ravel()])
+
+    z0 = np.concatenate([vetor_inicial, np.zeros(n * p)])
+    Z = integrar(sistema_aumentado, z0, t, args, None, metodo, rtol, atol).y.T
+    return Z[:, :n], Z[:, n:].reshape(len(t), n, p)
+
+
+def simular_sensibilidades(modelo, parametros, fixos, t, metodo='LSODA', rtol=RTOL_PADRAO, atol=ATOL_PADRAO):
+    """
+    Integra um dos modelos registrados em MODELOS_SENSIBILIDADE junto com as suas sensibilidades
+
+    Parâmetros:
+    modelo: nome do modelo, uma das chaves de MODELOS_SENSIBILIDADE
+    parametros: dicionário com os parâmetros diferenciáveis do modelo
+    fixos: dicionário com os valores que não são diferenciados (populações e infectados iniciais)
+    t: instantes em que a solução é amostrada
+    metodo, rtol, atol: método de integração e tolerâncias (ver integrar)
+
+    Retorna:
+    Tupla (resultado, sensibilidades) com formatos [len(t), n] e [len(t), n, p]; as colunas das
+    sensibilidades seguem a ordem de MODELOS_SENSIBILIDADE[modelo]['parametros']
+    """
+    especificacao = MODELOS_SENSIBILIDADE[modelo]
+    return integrar_sensibilidades(especificacao['derivada'], especificacao['jacobiana'],
+                                   especificacao['derivada_parametros'], especificacao['inicial'](fixos),
+                                   t, especificacao['argumentos'](parametros, fixos), metodo, rtol, atol)
+
+
+def simular_sir_sensibilidades(N, I0, beta, gamma, dias):
+    """
+    Integra o modelo SIR junto com as sensibilidades em relação a beta e gamma
+
+    Parâmetros:
+    Os mesmos de simular_sir
+
+    Retorna:
+    Tupla (t, resultado, sensibilidades), com resultado [len(t), 3] e sensibilidades [len(t), 3, 2]
+    """
+    t = periodo(dias)
+    resultado, sensibilidades = simular_sensibilidades('SIR', {'beta': beta, 'gamma': gamma},
+                                                       {'N': N, 'I0': I0}, t)
+    return t, resultado, sensibilidades
+
+
+def simular_sird_sensibilidades(N, I0, beta, gamma, mu, dias):
+    """
+    Integra o modelo SIRD junto com as sensibilidades em relação a beta, gamma e mu
+
+    Parâmetros:
+    Os mesmos de simular_sird
+
+    Retorna:
+    Tupla (t, resultado, sensibilidades), com resultado [len(t), 4] e sensibilidades [len(t), 4, 3]
+    """
+    t = periodo(dias)
+    resultado, sensibilidades = simular_sensibilidades('SIRD', {'beta': beta, 'gamma': gamma, 'mu': mu},
+                                                       {'N': N, 'I0': I0}, t)
+    return t, resultado, sensibilidades
+
+
+def simular_sird_duplo_sensibilidades(N_A, I0_A, beta_A, gamma_A, mu_A,
+                                      N_B, I0_B, beta_B, gamma_B, mu_B,
+                                      k_AB, k_BA, dias):
+    """
+    Integra o modelo SIRD de duas populações junto com as sensibilidades em relação aos oito parâmetros
+
+    Parâmetros:
+    Os mesmos de simular_sird_duplo
+
+    Retorna:
+    Tupla (t, resultado, sensibilidades), com resultado [len(t), 8] e sensibilidades [len(t), 8, 8];
+    as colunas seguem a ordem [beta_A, gamma_A, mu_A, beta_B, gamma_B, mu_B, k_AB, k_BA]
+    """
+    t = periodo(dias)
+    parametros = {'beta_A': beta_A, 'gamma_A': gamma_A, 'mu_A': mu_A,
+                  'beta_B': beta_B, 'gamma_B': gamma_B, 'mu_B': mu_B, 'k_AB': k_AB, 'k_BA': k_BA}
+    fixos = {'N_A': N_A, 'I0_A': I0_A, 'N_B': N_B, 'I0_B': I0_B}
+    resultado, sensibilidades = simular_sensibilidades('SIRD_duplo', parametros, fixos, t)
+    return t, resultado, sensibilidades
+
+
+def simular_sird_vital_sensibilidades(N, I0, beta, gamma, delta, mu, dias):
+    """
+    Integra o modelo SIRD com dinâmica vital junto com as sensibilidades em relação a beta, gamma, delta e mu
+
+    Parâmetros:
+    Os mesmos de simular_sird_vital
+
+    Retorna:
+    Tupla (t, resultado, sensibilidades), com resultado [len(t), 4] e sensibilidades [len(t), 4, 4]
+    """
+    t = periodo(dias)
+    parametros = {'beta': beta, 'gamma': gamma, 'delta': delta, 'mu': mu}
+    resultado, sensibilidades = simular_sensibilidades('SIRD_vital', parametros, {'N': N, 'I0': I0}, t)
+    return t, resultado, sensibilidades
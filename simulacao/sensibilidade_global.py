@@ -0,0 +1,286 @@
+"""
+Análise de sensibilidade global (Sobol e Morris) sobre os modelos compartimentais
+
+As amostras são avaliadas em blocos pelo Runge-Kutta em lote (ver simulacao.lote), e não
+com uma integração por amostra. Cada bloco é reduzido aos indicadores escalares (pico de
+infectados e total de mortos) dentro do próprio processo, de modo que apenas esses vetores
+trafegam entre os processos. Os intervalos de confiança dos índices vêm de bootstrap
+sobre as amostras base.
+
+Como os processos são iniciados do zero (contexto "spawn"), scripts que usam processos > 1
+devem proteger a chamada com if __name__ == '__main__'.
+"""
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy.stats import qmc
+
+from .varredura import SIMULADORES_LOTE, COMPARTIMENTOS, CONTEXTO_PROCESSOS, _inicializar_processo
+
+
+# Indicadores escalares extraídos de cada trajetória
+INDICADORES = ('pico_infectados', 'total_mortos')
+
+# Limite de elementos das amostras reamostradas de uma vez no bootstrap de Sobol; fAB reamostrado
+# tem reamostragens * d * n elementos, o que passaria de 2 GB com n = 10_000 e 1000 reamostragens
+ELEMENTOS_BOOTSTRAP = 2 ** 22
+
+
+def _indicadores(modelo, resultado):
+    """
+    Reduz as trajetórias [lote, tempo, compartimento] aos indicadores de INDICADORES
+
+    Em modelos com mais de uma população, infectados e mortos são somados entre elas.
+    O SIR não tem compartimento de mortos, então só devolve o pico de infectados.
+    """
+    colunas = COMPARTIMENTOS[modelo]
+    infectados = resultado[:, :, [k for k, nome in enumerate(colunas) if nome.startswith('I')]].sum(axis=2)
+    saida = {'pico_infectados': infectados.max(axis=1)}
+    mortos = [k for k, nome in enumerate(colunas) if nome.startswith('D')]
+    if mortos:
+        saida['total_mortos'] = resultado[:, -1, mortos].sum(axis=1)
+    return saida
+
+
+def _avaliar_bloco(modelo, nomes, amostras, fixos, dias, passos_por_dia, backend):
+    parametros = {nome: amostras[:, j] for j, nome in enumerate(nomes)}
+    _, resultado = SIMULADORES_LOTE[modelo](dias=dias, passos_por_dia=passos_por_dia, backend=backend,
+                                            **parametros, **fixos)
+    return _indicadores(modelo, resultado)
+
+
+def avaliar_amostras(modelo, nomes, amostras, dias, fixos=None, tamanho_bloco=10_000, processos=1,
+                     passos_por_dia=4, backend='auto'):
+    """
+    Avalia os indicadores do modelo para uma matriz de amostras de parâmetros
+
+    Parâmetros:
+    modelo: nome do modelo ('SIR', 'SIRD', 'SIRD_duplo' ou 'SIRD_vital')
+    nomes: nomes dos parâmetros, na ordem das colunas de amostras
+    amostras: array [amostras, parâmetros]
+    dias: número de dias de simulação
+    fixos: dicionário com os parâmetros que não variam
+    tamanho_bloco: número de amostras integradas de uma só vez
+    processos: número de processos; com 1, os blocos são integrados no processo atual
+    (o backend numba já usa todos os núcleos dentro de cada bloco)
+    passos_por_dia, backend: repassados ao Runge-Kutta em lote
+
+    Retorna:
+    Dicionário {indicador: array [amostras]}
+    """
+    fixos = dict(fixos or {})
+    amostras = np.asarray(amostras, dtype=float)
+    blocos = [amostras[inicio:inicio + tamanho_bloco] for inicio in range(0, len(amostras), tamanho_bloco)]
+    argumentos = (fixos, dias, passos_por_dia, backend)
+
+    if processos == 1:
+        resultados = [_avaliar_bloco(modelo, nomes, bloco, *argumentos) for bloco in blocos]
+    else:
+        with ProcessPoolExecutor(max_workers=processos, mp_context=CONTEXTO_PROCESSOS,
+                                 initializer=_inicializar_processo) as executor:
+            tarefas = [executor.submit(_avaliar_bloco, modelo, nomes, bloco, *argumentos) for bloco in blocos]
+            resultados = [tarefa.result() for tarefa in tarefas]
+
+    return {indicador: np.concatenate([r[indicador] for r in resultados]) for indicador in resultados[0]}
+
+
+def _escalar(unitarias, limites):
+    inferiores = np.array([limites[nome][0] for nome in limites], dtype=float)
+    superiores = np.array([limites[nome][1] for nome in limites], dtype=float)
+    return inferiores + unitarias * (superiores - inferiores)
+
+
+def amostras_saltelli(limites, n, semente=None):
+    """
+    Gera as amostras de Saltelli para os índices de Sobol de primeira ordem e totais
+
+    As matrizes A e B vêm de uma sequência de Sobol embaralhada em 2d dimensões; para cada
+    parâmetro i, a matriz AB_i é A com a coluna i tomada de B.
+
+    Parâmetros:
+    limites: dicionário {nome do parâmetro: (mínimo, máximo)}
+    n: número de amostras base (de preferência uma potência de 2)
+    semente: semente do embaralhamento
+
+    Retorna:
+    Array [n * (d + 2), d] com os blocos A, B, AB_1, ..., AB_d empilhados nessa ordem
+    """
+    d = len(limites)
+    base = qmc.Sobol(d=2 * d, scramble=True, seed=semente).random(n)
+    A, B = base[:, :d], base[:, d:]
+    AB = np.repeat(A[None], d, axis=0)
+    AB[np.arange(d), :, np.arange(d)] = B.T
+    return _escalar(np.concatenate([A, B, AB.reshape(d * n, d)]), limites)
+
+
+def _estimadores_sobol(fA, fB, fAB):
+    """
+    Estimadores de Saltelli (2010) para S1 e de Jansen para ST
+
+    fA, fB têm formato [..., n] e fAB [..., d, n]; as reduções são feitas no último eixo,
+    o que permite avaliar todas as reamostragens do bootstrap de uma vez.
+    """
+    variancia = np.var(np.concatenate([fA, fB], axis=-1), axis=-1)[..., None]
+    variancia = np.where(variancia > 0, variancia, np.nan)
+    primeira = np.mean(fB[..., None, :] * (fAB - fA[..., None, :]), axis=-1) / variancia
+    total = 0.5 * np.mean((fA[..., None, :] - fAB) ** 2, axis=-1) / variancia
+    return primeira, total
+
+
+def _sementes_bootstrap(semente):
+    # As amostras são sorteadas com a própria semente; o bootstrap usa uma sequência filha,
+    # independente daquela, para que as reamostragens não fiquem correlacionadas com as amostras
+    return np.random.SeedSequence(semente).spawn(2)[1]
+
+
+def _bootstrap_sobol(fA, fB, fAB, reamostragens, sementes):
+    """
+    Estimadores de Sobol de cada reamostragem do bootstrap, avaliados em grupos de reamostragens
+
+    sementes é a SeedSequence do sorteio: a mesma sequência reproduz as mesmas reamostragens
+    para todos os indicadores.
+
+    Retorna:
+    Tupla (primeira, total), cada uma com formato [reamostragens, d]
+    """
+    d, n = fAB.shape
+    gerador = np.random.default_rng(sementes)
+    por_grupo = max(1, ELEMENTOS_BOOTSTRAP // ((d + 2) * n))
+    primeira, total = [], []
+    for inicio in range(0, reamostragens, por_grupo):
+        sorteio = gerador.integers(0, n, size=(min(por_grupo, reamostragens - inicio), n))
+        primeira_b, total_b = _estimadores_sobol(fA[sorteio], fB[sorteio], fAB[:, sorteio].transpose(1, 0, 2))
+        primeira.append(primeira_b)
+        total.append(total_b)
+    return np.concatenate(primeira), np.concatenate(total)
+
+
+def _intervalo(reamostrado, confianca):
+    cauda = (1 - confianca) / 2 * 100
+    return np.nanpercentile(reamostrado, [cauda, 100 - cauda], axis=0)
+
+
+def indices_sobol(modelo, limites, dias, fixos=None, n=1024, reamostragens=1_000, confianca=0.95,
+                  semente=None, tamanho_bloco=10_000, processos=1, passos_por_dia=4, backend='auto'):
+    """
+    Calcula os índices de Sobol de primeira ordem (S1) e totais (ST) de cada parâmetro
+
+    O custo é de n * (d + 2) integrações, feitas em lote. Para o SIRD_duplo com os oito
+    parâmetros livres, n = 10_000 corresponde a 100 mil avaliações.
+
+    Parâmetros:
+    modelo: nome do modelo ('SIR', 'SIRD', 'SIRD_duplo' ou 'SIRD_vital')
+    limites: dicionário {nome do parâmetro: (mínimo, máximo)} com os parâmetros analisados
+    dias: número de dias de simulação
+    fixos: dicionário com os parâmetros que não variam (por exemplo N e I0)
+    n: número de amostras base
+    reamostragens: número de reamostragens do bootstrap
+    confianca: nível dos intervalos de confiança
+    semente: semente das amostras e do bootstrap
+    tamanho_bloco, processos, passos_por_dia, backend: ver avaliar_amostras
+
+    Retorna:
+    Dicionário {indicador: DataFrame}, com uma linha por parâmetro ordenada pelo índice total
+    e as colunas S1, S1_inf, S1_sup, ST, ST_inf, ST_sup
+    """
+    nomes = list(limites)
+    d = len(nomes)
+    amostras = amostras_saltelli(limites, n, semente)
+    saidas = avaliar_amostras(modelo, nomes, amostras, dias, fixos, tamanho_bloco, processos,
+                              passos_por_dia, backend)
+
+    sementes = _sementes_bootstrap(semente)
+    tabelas = {}
+    for indicador, valores in saidas.items():
+        fA, fB, fAB = valores[:n], valores[n:2 * n], valores[2 * n:].reshape(d, n)
+        primeira, total = _estimadores_sobol(fA, fB, fAB)
+        primeira_b, total_b = _bootstrap_sobol(fA, fB, fAB, reamostragens, sementes)
+        (S1_inf, S1_sup), (ST_inf, ST_sup) = _intervalo(primeira_b, confianca), _intervalo(total_b, confianca)
+        tabela = pd.DataFrame({'S1': primeira, 'S1_inf': S1_inf, 'S1_sup': S1_sup,
+                               'ST': total, 'ST_inf': ST_inf, 'ST_sup': ST_sup}, index=pd.Index(nomes, name='parametro'))
+        tabelas[indicador] = tabela.sort_values('ST', ascending=False)
+    return tabelas
+
+
+def amostras_morris(limites, trajetorias, niveis=4, semente=None):
+    """
+    Gera as trajetórias de Morris (um passo por parâmetro, em ordem aleatória)
+
+    Parâmetros:
+    limites: dicionário {nome do parâmetro: (mínimo, máximo)}
+    trajetorias: número de trajetórias
+    niveis: número de níveis da grade em cada dimensão (par)
+    semente: semente do sorteio
+
+    Retorna:
+    Tupla (amostras, ordem, sinais): amostras tem formato [trajetorias * (d + 1), d];
+    ordem [trajetorias, d] indica o parâmetro alterado em cada passo e sinais [trajetorias, d]
+    o sentido do passo
+    """
+    d = len(limites)
+    gerador = np.random.default_rng(semente)
+    delta = niveis / (2 * (niveis - 1))
+
+    # O ponto inicial fica na metade inferior da grade, para que o passo +delta ou -delta caiba em [0, 1]
+    inicio = gerador.integers(0, niveis // 2, size=(trajetorias, d)) / (niveis - 1)
+    sinais = gerador.choice([-1.0, 1.0], size=(trajetorias, d))
+    inicio = np.where(sinais < 0, inicio + delta, inicio)
+    ordem = np.argsort(gerador.random((trajetorias, d)), axis=1)
+
+    passos = np.zeros((trajetorias, d + 1, d))
+    linhas = np.arange(trajetorias)
+    for passo in range(d):
+        passos[:, passo + 1] = passos[:, passo]
+        coluna = ordem[:, passo]
+        passos[linhas, passo + 1, coluna] = sinais[linhas, coluna] * delta
+
+    unitarias = inicio[:, None, :] + passos
+    return _escalar(unitarias.reshape(-1, d), limites), ordem, sinais
+
+
+def indices_morris(modelo, limites, dias, fixos=None, trajetorias=100, niveis=4, reamostragens=1_000,
+                   confianca=0.95, semente=None, tamanho_bloco=10_000, processos=1,
+                   passos_por_dia=4, backend='auto'):
+    """
+    Calcula as medidas de Morris (mu*, mu e sigma dos efeitos elementares) de cada parâmetro
+
+    Bem mais barato que Sobol (trajetorias * (d + 1) integrações), serve para descartar
+    parâmetros pouco influentes antes de uma análise completa.
+
+    Parâmetros:
+    modelo, limites, dias, fixos: ver indices_sobol
+    trajetorias: número de trajetórias de Morris
+    niveis: número de níveis da grade
+    reamostragens, confianca, semente: bootstrap de mu*, como em indices_sobol
+    tamanho_bloco, processos, passos_por_dia, backend: ver avaliar_amostras
+
+    Retorna:
+    Dicionário {indicador: DataFrame}, com uma linha por parâmetro ordenada por mu*
+    e as colunas mu_estrela, mu_estrela_inf, mu_estrela_sup, mu, sigma.
+    Os efeitos são expressos por unidade do intervalo normalizado [0, 1] de cada parâmetro.
+    """
+    nomes = list(limites)
+    d = len(nomes)
+    amostras, ordem, sinais = amostras_morris(limites, trajetorias, niveis, semente)
+    saidas = avaliar_amostras(modelo, nomes, amostras, dias, fixos, tamanho_bloco, processos,
+                              passos_por_dia, backend)
+
+    delta = niveis / (2 * (niveis - 1))
+    linhas = np.arange(trajetorias)[:, None]
+    gerador = np.random.default_rng(_sementes_bootstrap(semente))
+    sorteio = gerador.integers(0, trajetorias, size=(reamostragens, trajetorias))
+    tabelas = {}
+    for indicador, valores in saidas.items():
+        valores = valores.reshape(trajetorias, d + 1)
+        # efeitos[r, i]: efeito elementar do parâmetro i na trajetória r
+        efeitos = np.empty((trajetorias, d))
+        efeitos[linhas, ordem] = np.diff(valores, axis=1) / (sinais[linhas, ordem] * delta)
+
+        absolutos = np.abs(efeitos)
+        inferior, superior = _intervalo(absolutos[sorteio].mean(axis=1), confianca)
+        tabela = pd.DataFrame({'mu_estrela': absolutos.mean(axis=0), 'mu_estrela_inf': inferior,
+                               'mu_estrela_sup': superior, 'mu': efeitos.mean(axis=0),
+                               'sigma': efeitos.std(axis=0, ddof=1)}, index=pd.Index(nomes, name='parametro'))
+        tabelas[indicador] = tabela.sort_values('mu_estrela', ascending=False)
+    return tabelas
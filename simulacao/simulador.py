@@ -0,0 +1,227 @@
+import numpy as np
+from scipy.integrate import solve_ivp
+
+from .modelos import (modelo_sir, modelo_sird, modelo_sird_vital, modelo_sird_k,
+                      jacobiana_sir, jacobiana_sird, jacobiana_sird_vital, jacobiana_sird_k,
+                      matriz_contato_duplo)
+
+
+# Métodos de integração do solve_ivp disponíveis; os implícitos (e o LSODA) usam a jacobiana analítica
+METODOS = ('RK45', 'LSODA', 'Radau', 'BDF')
+METODOS_COM_JACOBIANA = ('LSODA', 'Radau', 'BDF')
+
+# Tolerâncias padrão, próximas às usadas pelo odeint
+RTOL_PADRAO = 1e-8
+ATOL_PADRAO = 1e-8
+
+# As simulações são integradas em blocos de dias com inícios fixos (0, BLOCO_DIAS, 2 * BLOCO_DIAS, ...),
+# para que aumentar o horizonte apenas acrescente blocos, sem alterar os dias já calculados
+BLOCO_DIAS = 30
+
+
+def periodo(dias):
+    """
+    Gera a malha temporal usada por todas as simulações
+
+    Parâmetros:
+    dias: número de dias de simulação
+
+    Retorna:
+    Array com os dias inteiros 0, 1, ..., dias em que a solução é amostrada
+    """
+    return np.arange(dias + 1, dtype=float)
+
+
+def integrar(derivada, vetor_inicial, t, args=(), jacobiana=None, metodo='LSODA',
+             rtol=RTOL_PADRAO, atol=ATOL_PADRAO, saida_densa=False):
+    """
+    Integra um sistema de EDOs com o solve_ivp, usando funções no formato do odeint (vetor, t, *args)
+
+    Parâmetros:
+    derivada: função derivada(vetor, t, *args) que devolve as derivadas do sistema
+    vetor_inicial: condições iniciais
+    t: instantes em que a solução é amostrada (o primeiro é o instante inicial)
+    args: parâmetros adicionais repassados para a derivada e para a jacobiana
+    jacobiana: função jacobiana(vetor, t, *args) com a matriz jacobiana analítica, ou None
+    metodo: um dos métodos em METODOS
+    rtol, atol: tolerâncias relativa e absoluta do integrador
+    saida_densa: se True, a solução devolvida inclui o interpolante contínuo em .sol
+
+    Retorna:
+    Objeto de solução do solve_ivp; a trajetória amostrada em t está em .y.T e as
+    contagens de avaliações em .nfev, .njev e .nlu
+    """
+    if metodo not in METODOS:
+        raise ValueError(f'Método de integração desconhecido: {metodo}. Use um de {METODOS}')
+
+    opcoes = {}
+    if jacobiana is not None and metodo in METODOS_COM_JACOBIANA:
+        opcoes['jac'] = lambda tempo, vetor: jacobiana(vetor, tempo, *args)
+
+    solucao = solve_ivp(lambda tempo, vetor: derivada(vetor, tempo, *args),
+                        (t[0], t[-1]), np.asarray(vetor_inicial, dtype=float),
+                        method=metodo, t_eval=t, dense_output=saida_densa,
+                        rtol=rtol, atol=atol, **opcoes)
+    if not solucao.success:
+        raise RuntimeError(f'Falha na integração ({metodo}): {solucao.message}')
+    return solucao
+
+
+def integrar_blocos(derivada, vetor_inicial, dias, args=(), jacobiana=None, metodo='LSODA',
+                    rtol=RTOL_PADRAO, atol=ATOL_PADRAO, memoria=None):
+    """
+    Integra um sistema de EDOs do dia 0 até dias em blocos de BLOCO_DIAS dias
+
+    Cada bloco parte do estado final do bloco anterior e é sempre integrado por inteiro, mesmo
+    que dias caia no meio dele. Assim, o bloco k é o mesmo qualquer que seja o horizonte, e os
+    dias já calculados não mudam (bit a bit) quando o horizonte aumenta.
+
+    Parâmetros:
+    derivada, vetor_inicial, args, jacobiana, metodo, rtol, atol: ver integrar
+    dias: número de dias de simulação
+    memoria: função memoria(k, calcular) que devolve o bloco k já guardado ou o resultado de
+    calcular(); permite continuar uma trajetória sem refazer os blocos anteriores (ver simular_em_cache)
+
+    Retorna:
+    Array de formato [dias + 1, len(vetor_inicial)] com a solução em cada dia inteiro
+    """
+    estado = np.asarray(vetor_inicial, dtype=float)
+    partes = [estado[None, :]]
+    for k in range(-(-dias // BLOCO_DIAS)):
+        def calcular(k=k, estado=estado):
+            t = np.arange(k * BLOCO_DIAS, (k + 1) * BLOCO_DIAS + 1, dtype=float)
+            return integrar(derivada, estado, t, args, jacobiana, metodo, rtol, atol).y.T[1:]
+
+        bloco = memoria(k, calcular) if memoria is not None else calcular()
+        partes.append(bloco)
+        estado = bloco[-1]
+    return np.concatenate(partes)[:dias + 1]
+
+
+def simular_sir(N, I0, beta, gamma, dias, metodo='LSODA', rtol=RTOL_PADRAO, atol=ATOL_PADRAO, memoria=None):
+    """
+    Integra o modelo SIR clássico sem qualquer dependência de interface
+
+    Parâmetros:
+    N: população total
+    I0: infectados iniciais
+    beta: taxa de transmissão
+    gamma: taxa de recuperação
+    dias: número de dias de simulação
+    metodo, rtol, atol: método de integração e tolerâncias (ver integrar)
+    memoria: reaproveitamento de blocos já integrados (ver integrar_blocos)
+
+    Retorna:
+    Tupla (t, resultado), em que resultado tem formato [len(t), 3] com as colunas [S, I, R]
+    """
+    t = periodo(dias)
+    vetor_inicial = [N - I0, I0, 0]
+    resultado = integrar_blocos(modelo_sir, vetor_inicial, dias, (beta, gamma, N), jacobiana_sir,
+                                metodo, rtol, atol, memoria)
+    return t, resultado
+
+
+def simular_sird(N, I0, beta, gamma, mu, dias, metodo='LSODA', rtol=RTOL_PADRAO, atol=ATOL_PADRAO, memoria=None):
+    """
+    Integra o modelo SIRD clássico sem qualquer dependência de interface
+
+    Parâmetros:
+    N: população total
+    I0: infectados iniciais
+    beta: taxa de transmissão
+    gamma: taxa de recuperação
+    mu: taxa de mortalidade da doença
+    dias: número de dias de simulação
+    metodo, rtol, atol: método de integração e tolerâncias (ver integrar)
+    memoria: reaproveitamento de blocos já integrados (ver integrar_blocos)
+
+    Retorna:
+    Tupla (t, resultado), em que resultado tem formato [len(t), 4] com as colunas [S, I, R, D]
+    """
+    t = periodo(dias)
+    vetor_inicial = [N - I0, I0, 0, 0]
+    resultado = integrar_blocos(modelo_sird, vetor_inicial, dias, (beta, gamma, mu, N), jacobiana_sird,
+                                metodo, rtol, atol, memoria)
+    return t, resultado
+
+
+def simular_sird_k(N, I0, C, gamma, mu, dias, metodo='LSODA', rtol=RTOL_PADRAO, atol=ATOL_PADRAO, memoria=None):
+    """
+    Integra o modelo SIRD com K populações acopladas por uma matriz de contato
+
+    Parâmetros:
+    N, I0: arrays [K] com a população total e os infectados iniciais de cada grupo
+    C: matriz de contato [K, K]
+    gamma, mu: arrays [K] (ou escalares) com as taxas de recuperação e de mortalidade
+    dias: número de dias de simulação
+    metodo, rtol, atol: método de integração e tolerâncias (ver integrar)
+    memoria: reaproveitamento de blocos já integrados (ver integrar_blocos)
+
+    Retorna:
+    Tupla (t, resultado), em que resultado tem formato [len(t), 4K] com as colunas
+    [S_1, I_1, R_1, D_1, ..., S_K, I_K, R_K, D_K]
+    """
+    N, I0 = np.asarray(N, dtype=float), np.asarray(I0, dtype=float)
+    C = np.asarray(C, dtype=float)
+    gamma = np.broadcast_to(np.asarray(gamma, dtype=float), N.shape)
+    mu = np.broadcast_to(np.asarray(mu, dtype=float), N.shape)
+
+    t = periodo(dias)
+    zeros = np.zeros_like(N)
+    vetor_inicial = np.column_stack([N - I0, I0, zeros, zeros]).ravel()
+    resultado = integrar_blocos(modelo_sird_k, vetor_inicial, dias, (C, gamma, mu, N), jacobiana_sird_k,
+                                metodo, rtol, atol, memoria)
+    return t, resultado
+
+
+def simular_sird_duplo(N_A, I0_A, beta_A, gamma_A, mu_A,
+                       N_B, I0_B, beta_B, gamma_B, mu_B,
+                       k_AB, k_BA, dias, metodo='LSODA', rtol=RTOL_PADRAO, atol=ATOL_PADRAO, memoria=None):
+    """
+    Integra o modelo SIRD de duas populações interagentes sem qualquer dependência de interface
+
+    É o caso K = 2 do modelo com K populações, com a matriz de contato montada a partir
+    de beta_A, beta_B, k_AB e k_BA.
+
+    Parâmetros:
+    N_A, I0_A, beta_A, gamma_A, mu_A: população, infectados iniciais e parâmetros de A
+    N_B, I0_B, beta_B, gamma_B, mu_B: população, infectados iniciais e parâmetros de B
+    k_AB: fator de transmissão de A para B
+    k_BA: fator de transmissão de B para A
+    dias: número de dias de simulação
+    metodo, rtol, atol: método de integração e tolerâncias (ver integrar)
+    memoria: reaproveitamento de blocos já integrados (ver integrar_blocos)
+
+    Retorna:
+    Tupla (t, resultado), em que resultado tem formato [len(t), 8] com as colunas
+    [S_A, I_A, R_A, D_A, S_B, I_B, R_B, D_B]
+    """
+    C = matriz_contato_duplo(beta_A, beta_B, k_AB, k_BA)
+    return simular_sird_k([N_A, N_B], [I0_A, I0_B], C, [gamma_A, gamma_B], [mu_A, mu_B], dias,
+                          metodo, rtol, atol, memoria)
+
+
+def simular_sird_vital(N, I0, beta, gamma, delta, mu, dias, metodo='LSODA', rtol=RTOL_PADRAO, atol=ATOL_PADRAO,
+                       memoria=None):
+    """
+    Integra o modelo SIRD com dinâmica vital sem qualquer dependência de interface
+
+    Parâmetros:
+    N: população total
+    I0: infectados iniciais
+    beta: taxa de transmissão
+    gamma: taxa de recuperação
+    delta: taxa de mortalidade causada pela doença
+    mu: taxa de natalidade/mortalidade natural
+    dias: número de dias de simulação
+    metodo, rtol, atol: método de integração e tolerâncias (ver integrar)
+    memoria: reaproveitamento de blocos já integrados (ver integrar_blocos)
+
+    Retorna:
+    Tupla (t, resultado), em que resultado tem formato [len(t), 4] com as colunas [S, I, R, D]
+    """
+    t = periodo(dias)
+    vetor_inicial = [N - I0, I0, 0, 0]
+    resultado = integrar_blocos(modelo_sird_vital, vetor_inicial, dias, (beta, gamma, delta, mu),
+                                jacobiana_sird_vital, metodo, rtol, atol, memoria)
+    return t, resultado
@@ -0,0 +1,202 @@
+"""
+Varreduras de parâmetros distribuídas entre processos, com os resultados gravados em blocos no disco
+
+A grade é dividida em blocos de tamanho fixo; cada processo integra um bloco inteiro com o
+Runge-Kutta em lote e grava o resultado diretamente em um arquivo próprio, de modo que apenas
+o caminho do arquivo trafega entre os processos. Blocos já gravados são pulados, o que permite
+retomar uma varredura interrompida.
+
+Como os processos são iniciados do zero (contexto "spawn"), em novos interpretadores, scripts
+que chamam executar_varredura devem protegê-la com if __name__ == '__main__'.
+"""
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .jit import NUMBA_DISPONIVEL
+from .lote import simular_sir_lote, simular_sird_lote, simular_sird_duplo_lote, simular_sird_vital_lote
+
+
+# Funções de simulação em lote, indexadas pelo mesmo nome de modelo usado em SIMULADORES
+SIMULADORES_LOTE = {
+    'SIR': simular_sir_lote,
+    'SIRD': simular_sird_lote,
+    'SIRD_duplo': simular_sird_duplo_lote,
+    'SIRD_vital': simular_sird_vital_lote,
+}
+
+# Nomes dos compartimentos de cada modelo, usados nas colunas dos arquivos Parquet
+COMPARTIMENTOS = {
+    'SIR': ['S', 'I', 'R'],
+    'SIRD': ['S', 'I', 'R', 'D'],
+    'SIRD_duplo': ['S_A', 'I_A', 'R_A', 'D_A', 'S_B', 'I_B', 'R_B', 'D_B'],
+    'SIRD_vital': ['S', 'I', 'R', 'D'],
+}
+
+FORMATOS = ('npz', 'parquet')
+# Processos iniciados do zero ("spawn"): copiar com fork um processo em que o Numba já abriu o seu
+# pool de threads (núcleos paralelos chamados antes na thread principal) trava o interpretador ao encerrar
+CONTEXTO_PROCESSOS = multiprocessing.get_context('spawn')
+# O prefixo _ faz o pyarrow ignorar o manifesto (e os blocos temporários) ao ler o diretório
+# inteiro com pd.read_parquet
+ARQUIVO_MANIFESTO = '_varredura.json'
+
+
+def parametros_do_bloco(grade, inicio, fim):
+    """
+    Obtém os parâmetros das combinações [inicio, fim) da grade sem montar a grade inteira
+
+    Parâmetros:
+    grade: dicionário {nome do parâmetro: array de valores}; a grade é o produto cartesiano dos eixos
+    inicio, fim: intervalo de índices lineares das combinações
+
+    Retorna:
+    Dicionário {nome do parâmetro: array [fim - inicio]} com os valores de cada combinação
+    """
+    eixos = [np.asarray(valores, dtype=float) for valores in grade.values()]
+    indices = np.unravel_index(np.arange(inicio, fim), [len(eixo) for eixo in eixos])
+    return {nome: eixo[indice] for nome, eixo, indice in zip(grade, eixos, indices)}
+
+
+def _inicializar_processo():
+    # Cada processo já recebe um bloco inteiro; as threads do Numba só disputariam os mesmos núcleos
+    if NUMBA_DISPONIVEL:
+        import numba
+        numba.set_num_threads(1)
+
+
+def _caminho_bloco(diretorio, numero, formato):
+    return Path(diretorio) / f'bloco_{numero:06d}.{formato}'
+
+
+def _executar_bloco(modelo, grade, fixos, dias, inicio, fim, caminho, formato, float32, passos_por_dia, backend):
+    """
+    Integra um bloco da grade e grava o resultado; executada dentro de cada processo
+
+    O arquivo é escrito com um nome temporário e renomeado ao final, de forma que um bloco
+    interrompido no meio da escrita nunca é confundido com um bloco concluído.
+
+    Retorna:
+    Caminho do arquivo gravado
+    """
+    parametros = parametros_do_bloco(grade, inicio, fim)
+    t, resultado = SIMULADORES_LOTE[modelo](dias=dias, passos_por_dia=passos_por_dia, backend=backend,
+                                            **parametros, **fixos)
+    if float32:
+        resultado = resultado.astype(np.float32)
+
+    indices = np.arange(inicio, fim)
+    temporario = Path(caminho).with_name(f'_{Path(caminho).name}.tmp')
+    if formato == 'npz':
+        with open(temporario, 'wb') as arquivo:
+            np.savez(arquivo, indice=indices, t=t, resultado=resultado, **parametros)
+    else:
+        # Formato longo: uma linha por combinação e dia, com uma coluna por compartimento
+        lote, passos, _ = resultado.shape
+        colunas = {'indice': np.repeat(indices, passos)}
+        colunas.update({nome: np.repeat(valores, passos) for nome, valores in parametros.items()})
+        colunas['Dia'] = np.tile(t, lote)
+        for k, compartimento in enumerate(COMPARTIMENTOS[modelo]):
+            colunas[compartimento] = resultado[:, :, k].ravel()
+        pd.DataFrame(colunas).to_parquet(temporario, index=False)
+
+    os.replace(temporario, caminho)
+    return str(caminho)
+
+
+def _verificar_manifesto(diretorio, manifesto):
+    """
+    Grava o manifesto da varredura ou, ao retomar, confere se ele corresponde à mesma configuração
+    """
+    caminho = Path(diretorio) / ARQUIVO_MANIFESTO
+    if caminho.exists():
+        existente = json.loads(caminho.read_text(encoding='utf-8'))
+        if existente != manifesto:
+            raise ValueError(f'O diretório {diretorio} contém uma varredura com outra configuração')
+    else:
+        caminho.write_text(json.dumps(manifesto, indent=2, ensure_ascii=False), encoding='utf-8')
+
+
+def executar_varredura(modelo, grade, dias, diretorio, fixos=None, tamanho_bloco=5_000, processos=None,
+                       formato='npz', float32=False, passos_por_dia=4, backend='auto', progresso=None):
+    """
+    Executa uma varredura de parâmetros em vários processos, gravando os resultados em blocos
+
+    Parâmetros:
+    modelo: nome do modelo ('SIR', 'SIRD', 'SIRD_duplo' ou 'SIRD_vital')
+    grade: dicionário {nome do parâmetro: valores}; todas as combinações (produto cartesiano) são simuladas
+    dias: número de dias de simulação
+    diretorio: pasta onde os blocos e o manifesto são gravados
+    fixos: dicionário com os parâmetros que não variam na grade
+    tamanho_bloco: número de combinações integradas por tarefa
+    processos: número de processos (padrão: número de núcleos)
+    formato: 'npz' (arrays [lote, tempo, compartimento]) ou 'parquet' (tabela longa)
+    float32: se True, grava as trajetórias em precisão simples
+    passos_por_dia, backend: repassados ao Runge-Kutta em lote
+    progresso: função progresso(concluidos, total, decorrido, restante), chamada ao retomar e a cada
+    bloco concluído com o número de blocos prontos, o total de blocos e os segundos decorridos e
+    restantes (estimativa; None ao retomar, antes do primeiro bloco), ou None
+
+    Retorna:
+    Lista ordenada com os caminhos de todos os blocos da varredura
+    """
+    if formato not in FORMATOS:
+        raise ValueError(f'Formato desconhecido: {formato}. Use um de {FORMATOS}')
+
+    grade = {nome: [float(v) for v in np.atleast_1d(valores)] for nome, valores in grade.items()}
+    # Números do Python no manifesto JSON: escalares do NumPy (np.int64, np.float64) não são serializáveis
+    fixos = {nome: float(valor) for nome, valor in (fixos or {}).items()}
+    total = int(np.prod([len(valores) for valores in grade.values()]))
+    blocos = range((total + tamanho_bloco - 1) // tamanho_bloco)
+
+    diretorio = Path(diretorio)
+    diretorio.mkdir(parents=True, exist_ok=True)
+    _verificar_manifesto(diretorio, {
+        'modelo': modelo, 'grade': grade, 'fixos': fixos, 'dias': dias,
+        'tamanho_bloco': tamanho_bloco, 'formato': formato, 'float32': float32,
+        'passos_por_dia': passos_por_dia,
+    })
+
+    caminhos = [_caminho_bloco(diretorio, numero, formato) for numero in blocos]
+    pendentes = [numero for numero in blocos if not caminhos[numero].exists()]
+    concluidos = len(caminhos) - len(pendentes)
+    if progresso is not None and concluidos:
+        progresso(concluidos, len(caminhos), 0.0, None)
+
+    inicio_execucao = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=processos, mp_context=CONTEXTO_PROCESSOS,
+                             initializer=_inicializar_processo) as executor:
+        tarefas = [
+            executor.submit(_executar_bloco, modelo, grade, fixos, dias,
+                            numero * tamanho_bloco, min((numero + 1) * tamanho_bloco, total),
+                            caminhos[numero], formato, float32, passos_por_dia, backend)
+            for numero in pendentes
+        ]
+        for feitos, tarefa in enumerate(as_completed(tarefas), start=1):
+            tarefa.result()
+            if progresso is not None:
+                decorrido = time.perf_counter() - inicio_execucao
+                progresso(concluidos + feitos, len(caminhos), decorrido, decorrido / feitos * (len(tarefas) - feitos))
+
+    return [str(caminho) for caminho in caminhos]
+
+
+def ler_blocos(diretorio):
+    """
+    Percorre, em ordem, os blocos .npz gravados por executar_varredura sem carregá-los todos na memória
+
+    Parâmetros:
+    diretorio: pasta da varredura
+
+    Retorna:
+    Gerador de dicionários com os arrays de cada bloco (indice, t, resultado e os parâmetros da grade)
+    """
+    for caminho in sorted(Path(diretorio).glob('bloco_*.npz')):
+        with np.load(caminho) as bloco:
+            yield {nome: bloco[nome] for nome in bloco.files}
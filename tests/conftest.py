@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Os testes importam simulacao e servico a partir da raiz do repositório, como os benchmarks
+sys.path.append(str(Path(__file__).resolve().parents[1]))
@@ -0,0 +1,85 @@
+"""
+Concordância entre o resumo analítico (resumo_sir e resumo_sird) e a integração numérica longa das EDOs
+"""
+import numpy as np
+import pytest
+
+from simulacao import (integrar, jacobiana_sir, jacobiana_sird, modelo_sir, modelo_sird, resumo_sir, resumo_sird,
+                       simular_sir, simular_sird)
+
+
+# Horizonte longo o bastante para a epidemia se extinguir em todos os cenários (valores assintóticos)
+DIAS = 3000
+RTOL = ATOL = 1e-10
+
+# Tolerâncias: tamanho final e tamanho do pico relativos à população; dia do pico em dias
+TOLERANCIA_TAMANHO = 1e-6
+TOLERANCIA_DIA = 0.05
+
+CENARIOS_SIR = [
+    # N, I0, beta, gamma
+    (10_000, 10, 0.3, 0.1),
+    (1_000_000, 1, 0.5, 0.2),
+    (5_000, 100, 0.15, 0.1),
+]
+
+CENARIOS_SIRD = [
+    # N, I0, beta, gamma, mu
+    (10_000, 10, 0.3, 0.1, 0.01),
+    (1_000_000, 50, 0.4, 0.05, 0.05),
+    (2_000, 20, 0.25, 0.12, 0.005),
+]
+
+
+def _pico_fino(derivada, jacobiana, vetor_inicial, args, dia_aproximado):
+    """
+    Refina o pico de infectados integrando com passo de 0,001 dia em torno do dia aproximado
+
+    Retorna:
+    Tupla (dia do pico, máximo de infectados)
+    """
+    t = np.arange(0.0, dia_aproximado + 2.0, 0.001)
+    I = integrar(derivada, vetor_inicial, t, args=args, jacobiana=jacobiana, rtol=RTOL, atol=ATOL).y[1]
+    indice = np.argmax(I)
+    return t[indice], I[indice]
+
+
+@pytest.mark.parametrize('N, I0, beta, gamma', CENARIOS_SIR)
+def test_resumo_sir_concorda_com_integracao(N, I0, beta, gamma):
+    resumo = resumo_sir(N, I0, beta, gamma)
+    assert resumo['analitico']
+
+    t, resultado = simular_sir(N, I0, beta, gamma, DIAS, rtol=RTOL, atol=ATOL)
+    assert resultado[-1, 1] / N < 1e-9
+    assert resumo['S_final'] / N == pytest.approx(resultado[-1, 0] / N, abs=TOLERANCIA_TAMANHO)
+    assert resumo['R_final'] / N == pytest.approx(resultado[-1, 2] / N, abs=TOLERANCIA_TAMANHO)
+
+    dia_diario = t[np.argmax(resultado[:, 1])]
+    dia, maximo = _pico_fino(modelo_sir, jacobiana_sir, resultado[0], (beta, gamma, N), dia_diario)
+    assert resumo['max_infectados'] / N == pytest.approx(maximo / N, abs=TOLERANCIA_TAMANHO)
+    assert resumo['dia_pico'] == pytest.approx(dia, abs=TOLERANCIA_DIA)
+
+
+@pytest.mark.parametrize('N, I0, beta, gamma, mu', CENARIOS_SIRD)
+def test_resumo_sird_concorda_com_integracao(N, I0, beta, gamma, mu):
+    resumo = resumo_sird(N, I0, beta, gamma, mu)
+    assert resumo['analitico']
+
+    t, resultado = simular_sird(N, I0, beta, gamma, mu, DIAS, rtol=RTOL, atol=ATOL)
+    assert resultado[-1, 1] / N < 1e-9
+    for indice, nome in enumerate(['S_final', 'I_final', 'R_final', 'D_final']):
+        assert resumo[nome] / N == pytest.approx(resultado[-1, indice] / N, abs=TOLERANCIA_TAMANHO)
+
+    dia_diario = t[np.argmax(resultado[:, 1])]
+    dia, maximo = _pico_fino(modelo_sird, jacobiana_sird, resultado[0], (beta, gamma, mu, N), dia_diario)
+    assert resumo['max_infectados'] / N == pytest.approx(maximo / N, abs=TOLERANCIA_TAMANHO)
+    assert resumo['dia_pico'] == pytest.approx(dia, abs=TOLERANCIA_DIA)
+
+
+def test_sem_surto_pico_no_instante_inicial():
+    # Com R0 * s0 <= 1 os infectados só diminuem: o pico é o valor inicial, no dia 0
+    resumo = resumo_sir(10_000, 10, 0.05, 0.1)
+    t, resultado = simular_sir(10_000, 10, 0.05, 0.1, DIAS, rtol=RTOL, atol=ATOL)
+    assert resumo['dia_pico'] == 0.0
+    assert resumo['max_infectados'] == pytest.approx(resultado[:, 1].max())
+    assert resumo['S_final'] / 10_000 == pytest.approx(resultado[-1, 0] / 10_000, abs=TOLERANCIA_TAMANHO)
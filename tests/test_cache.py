@@ -0,0 +1,132 @@
+"""
+Cache de resultados: descarte LRU, nível em disco só com arrays .npy e reaproveitamento dos blocos
+"""
+import pickle
+import sqlite3
+
+import numpy as np
+import pytest
+
+from simulacao import BLOCO_DIAS, CacheResultados, simular_sir
+from simulacao import cache as modulo_cache
+
+
+def _contador():
+    # Conta as chamadas de calcular feitas por obter
+    chamadas = []
+
+    def calcular(valor):
+        def funcao():
+            chamadas.append(valor)
+            return valor
+        return funcao
+
+    return chamadas, calcular
+
+
+def test_descarta_o_item_usado_ha_mais_tempo():
+    cache = CacheResultados(capacidade=2)
+    cache.guardar('a', np.zeros(1))
+    cache.guardar('b', np.ones(1))
+    cache.consultar('a')
+    cache.guardar('c', np.full(1, 2.0))
+
+    assert cache.consultar('b') is None
+    assert cache.consultar('a') is not None
+    assert cache.consultar('c') is not None
+    estatisticas = cache.estatisticas()
+    assert estatisticas['itens'] == 2
+    assert (estatisticas['acertos'], estatisticas['falhas']) == (3, 1)
+
+
+def test_obter_calcula_uma_vez_e_normaliza_numeros():
+    cache = CacheResultados()
+    chamadas, calcular = _contador()
+    cache.obter(('SIR', 1), calcular(np.zeros(2)))
+    cache.obter(('SIR', 1.0), calcular(np.ones(2)))
+    assert len(chamadas) == 1
+
+
+def test_disco_ida_e_volta(tmp_path):
+    arquivo = tmp_path / 'cache.sqlite'
+    matriz = np.arange(12.0).reshape(3, 4)
+    tupla = (np.arange(3), np.ones((2, 2), dtype=np.float32))
+    CacheResultados(arquivo=arquivo).guardar(('x', 1), matriz)
+    CacheResultados(arquivo=arquivo).guardar(('y', 2.0), tupla)
+
+    # Outra instância (como outro processo) encontra os resultados no disco; 1 e 1.0 são a mesma chave
+    leitor = CacheResultados(arquivo=arquivo)
+    lida = leitor.consultar(('x', 1.0))
+    np.testing.assert_array_equal(lida, matriz)
+    assert not lida.flags.writeable
+    lidos = leitor.consultar(('y', 2))
+    assert isinstance(lidos, tuple)
+    for original, copia in zip(tupla, lidos):
+        np.testing.assert_array_equal(copia, original)
+        assert copia.dtype == original.dtype
+    assert leitor.estatisticas()['acertos_disco'] == 2
+
+
+def test_disco_guarda_apenas_arrays_npy(tmp_path):
+    arquivo = tmp_path / 'cache.sqlite'
+    cache = CacheResultados(arquivo=arquivo)
+    cache.guardar('matriz', np.zeros(3))
+    cache.guardar('dicionario', {'a': 1})
+    cache.guardar('objetos', np.array([None, 'a'], dtype=object))
+    cache.guardar('funcao', (len, np.zeros(3)))
+
+    linhas = sqlite3.connect(arquivo).execute('SELECT chave, valor FROM matrizes').fetchall()
+    assert [chave for chave, _ in linhas] == [repr('matriz')]
+    assert all(bytes(valor).startswith(b'\x93NUMPY') for _, valor in linhas)
+    # Os demais valores continuam disponíveis na memória
+    assert cache.consultar('dicionario') == {'a': 1}
+    assert CacheResultados(arquivo=arquivo).consultar('dicionario') is None
+
+
+def test_blob_com_pickle_nao_e_executado(tmp_path):
+    arquivo = tmp_path / 'cache.sqlite'
+    cache = CacheResultados(arquivo=arquivo)
+    cache.guardar('semente', np.zeros(1))
+    executado = []
+
+    class Carga:
+        def __reduce__(self):
+            return executado.append, ('executado',)
+
+    # Um array de objetos em .npy só pode ser lido com pickle, que o nível em disco recusa
+    with open(tmp_path / 'carga.npy', 'wb') as saida:
+        np.save(saida, np.array([Carga()], dtype=object), allow_pickle=True)
+    conexao = sqlite3.connect(arquivo)
+    conexao.execute('INSERT INTO matrizes VALUES (?, 0, ?)', (repr('carga'), (tmp_path / 'carga.npy').read_bytes()))
+    conexao.execute('INSERT INTO matrizes VALUES (?, 0, ?)', (repr('pickle'), pickle.dumps(Carga())))
+    conexao.commit()
+
+    leitor = CacheResultados(arquivo=arquivo)
+    for chave in ('carga', 'pickle'):
+        with pytest.raises(ValueError):
+            leitor.consultar(chave)
+    assert executado == []
+
+
+def test_aumentar_o_horizonte_reaproveita_os_blocos(monkeypatch):
+    cache = CacheResultados(capacidade=64)
+    monkeypatch.setattr(modulo_cache, 'cache_simulacoes', cache)
+    parametros = {'N': 10_000, 'I0': 10, 'beta': 0.3, 'gamma': 0.1}
+
+    _, curto = modulo_cache.simular_em_cache('SIR', 100, **parametros)
+    blocos = -(-100 // BLOCO_DIAS)
+    assert cache.estatisticas()['falhas'] == blocos
+
+    # 120 dias cabem nos mesmos 4 blocos de 30 dias: nenhum bloco novo é integrado
+    _, longo = modulo_cache.simular_em_cache('SIR', 120, **parametros)
+    estatisticas = cache.estatisticas()
+    assert (estatisticas['acertos'], estatisticas['falhas']) == (blocos, blocos)
+    np.testing.assert_array_equal(longo[:101], curto)
+
+    # Com 150 dias, só o quinto bloco é integrado
+    _, maior = modulo_cache.simular_em_cache('SIR', 150, **parametros)
+    estatisticas = cache.estatisticas()
+    assert (estatisticas['acertos'], estatisticas['falhas']) == (2 * blocos, blocos + 1)
+    np.testing.assert_array_equal(maior[:121], longo)
+    np.testing.assert_array_equal(maior, simular_sir(dias=150, **parametros)[1])
+    assert not maior.flags.writeable
@@ -0,0 +1,78 @@
+"""
+Intervenções: cronogramas, equivalência com os parâmetros constantes e cache dos segmentos
+"""
+import sqlite3
+
+import numpy as np
+import pytest
+
+from simulacao import CacheResultados, normalizar_cronograma, simular_intervencoes, simular_sird
+
+
+FIXOS = {'N': 10_000, 'I0': 10}
+
+
+def test_cronograma_com_funcoes_ordenado_pelo_inicio():
+    def cedo(t):
+        return 0.3
+
+    def tarde(t):
+        return 0.1
+
+    assert normalizar_cronograma([(30, tarde), (0, cedo)]) == ((0.0, cedo), (30.0, tarde))
+    assert normalizar_cronograma(0.2) == ((0.0, 0.2),)
+
+
+@pytest.mark.parametrize('cronograma, mensagem', [
+    ([(0, lambda t: 0.3), (0, lambda t: 0.1)], 'mesmo início'),
+    ([(10, 0.3)], 'dia 0'),
+])
+def test_cronograma_invalido(cronograma, mensagem):
+    with pytest.raises(ValueError, match=mensagem):
+        normalizar_cronograma(cronograma)
+
+
+def test_parametros_constantes_equivalem_a_simular_sird():
+    t, resultado = simular_intervencoes('SIRD', FIXOS, {'beta': 0.3, 'gamma': 0.1, 'mu': 0.01}, 100, cache=None)
+    t_sird, esperado = simular_sird(beta=0.3, gamma=0.1, mu=0.01, dias=100, **FIXOS)
+    np.testing.assert_array_equal(t, t_sird)
+    np.testing.assert_allclose(resultado, esperado, rtol=1e-6, atol=1e-6)
+
+
+def test_mudanca_depois_do_dia_60_recalcula_apenas_os_segmentos_seguintes():
+    cache = CacheResultados(capacidade=64)
+    base = {'gamma': 0.1, 'mu': 0.01}
+    simular_intervencoes('SIRD', FIXOS, {**base, 'beta': [(0, 0.3), (60, 0.2)]}, 120, cache=cache)
+    # Segmentos de 30 dias: [0, 30), [30, 60), [60, 90) e [90, 120)
+    assert cache.estatisticas()['falhas'] == 4
+
+    simular_intervencoes('SIRD', FIXOS, {**base, 'beta': [(0, 0.3), (60, 0.1)]}, 120, cache=cache)
+    estatisticas = cache.estatisticas()
+    assert (estatisticas['acertos'], estatisticas['falhas']) == (2, 6)
+
+
+def test_segmentos_reaproveitados_dao_o_mesmo_resultado():
+    parametros = {'beta': [(0, 0.3), (45, 0.15)], 'gamma': 0.1, 'mu': 0.01}
+    _, sem_cache = simular_intervencoes('SIRD', FIXOS, parametros, 120, cache=None)
+    cache = CacheResultados(capacidade=64)
+    simular_intervencoes('SIRD', FIXOS, parametros, 120, cache=cache)
+    _, com_cache = simular_intervencoes('SIRD', FIXOS, parametros, 120, cache=cache)
+    np.testing.assert_array_equal(com_cache, sem_cache)
+
+
+def test_chaves_com_funcoes_ficam_fora_do_disco(tmp_path):
+    arquivo = tmp_path / 'cache.sqlite'
+    cache = CacheResultados(arquivo=arquivo)
+
+    def beta(t):
+        return 0.3
+
+    cache.guardar(('intervencoes', ((0.0, beta),)), np.zeros(3))
+    cache.guardar(('intervencoes', ((0.0, 0.3),)), np.ones(3))
+    chaves = [chave for chave, in sqlite3.connect(arquivo).execute('SELECT chave FROM matrizes')]
+    assert chaves == [repr(('intervencoes', ((0.0, 0.3),)))]
+
+    # Na memória a chave com a função continua valendo
+    np.testing.assert_array_equal(cache.consultar(('intervencoes', ((0.0, beta),))), np.zeros(3))
+    assert CacheResultados(arquivo=arquivo).consultar(('intervencoes', ((0.0, beta),))) is None
+
@@ -0,0 +1,89 @@
+"""
+Núcleos do Numba: concordância com o backend NumPy e escolha do núcleo sequencial fora da thread principal
+"""
+import threading
+
+import numpy as np
+import pytest
+
+from simulacao import (NUMBA_DISPONIVEL, simular_sir_lote, simular_sird_duplo_lote, simular_sird_espacial,
+                       simular_sird_lote, simular_sird_vital_lote)
+from simulacao import espacial, jit, lote
+
+
+pytestmark = pytest.mark.skipif(not NUMBA_DISPONIVEL, reason='numba não instalado')
+
+BETA = np.linspace(0.1, 0.6, 7)
+
+SIMULACOES = {
+    'SIR': lambda backend: simular_sir_lote(BETA, 0.1, 10_000, 10, dias=120, backend=backend),
+    'SIRD': lambda backend: simular_sird_lote(BETA, 0.1, 0.01, 10_000, 10, dias=120, backend=backend),
+    'SIRD_vital': lambda backend: simular_sird_vital_lote(BETA, 0.1, 0.01, 0.01, 10_000, 10, dias=120,
+                                                          backend=backend),
+    'SIRD_duplo': lambda backend: simular_sird_duplo_lote(10_000, 10, BETA, 0.1, 0.01, 5_000, 0, 0.25, 0.12, 0.02,
+                                                          0.05, 0.02, dias=120, backend=backend),
+}
+
+
+def _em_outra_thread(funcao):
+    # Executa funcao em uma thread separada, como o Streamlit faz com as páginas, e devolve o resultado
+    saida = {}
+    thread = threading.Thread(target=lambda: saida.setdefault('resultado', funcao()))
+    thread.start()
+    thread.join()
+    return saida['resultado']
+
+
+def _registrar(monkeypatch, modulo, nomes):
+    # Troca os núcleos do módulo por versões que anotam qual deles foi chamado
+    chamados = []
+    for nome in nomes:
+        original = getattr(modulo, nome)
+
+        def registrado(*args, nome=nome, original=original):
+            chamados.append(nome)
+            return original(*args)
+
+        monkeypatch.setattr(modulo, nome, registrado)
+    return chamados
+
+
+@pytest.mark.parametrize('modelo', list(SIMULACOES))
+def test_numba_e_numpy_concordam(modelo):
+    _, numpy = SIMULACOES[modelo]('numpy')
+    _, numba = SIMULACOES[modelo]('numba')
+    np.testing.assert_allclose(numba, numpy, rtol=1e-12, atol=1e-9)
+
+
+@pytest.mark.parametrize('modelo', list(SIMULACOES))
+def test_nucleo_sequencial_concorda_com_o_paralelo(modelo):
+    _, paralelo = SIMULACOES[modelo]('numba')
+    _, sequencial = _em_outra_thread(lambda: SIMULACOES[modelo]('numba'))
+    np.testing.assert_array_equal(sequencial, paralelo)
+
+
+def test_em_thread_principal():
+    assert jit.em_thread_principal()
+    assert not _em_outra_thread(jit.em_thread_principal)
+
+
+def test_lote_usa_nucleo_sequencial_fora_da_thread_principal(monkeypatch):
+    chamados = _registrar(monkeypatch, lote, ['rk4_lote_jit', 'rk4_lote_sequencial_jit'])
+    SIMULACOES['SIR']('numba')
+    assert chamados == ['rk4_lote_jit']
+    chamados.clear()
+    _em_outra_thread(lambda: SIMULACOES['SIR']('numba'))
+    assert chamados == ['rk4_lote_sequencial_jit']
+
+
+def test_espacial_usa_nucleo_sequencial_fora_da_thread_principal(monkeypatch):
+    chamados = _registrar(monkeypatch, espacial, ['rk4_sird_celulas_jit', 'rk4_sird_celulas_sequencial_jit'])
+
+    def simular():
+        return simular_sird_espacial(np.full((4, 4), 1_000.0), 1.0, 0.3, 0.1, 0.01, 0.1, dias=2, backend='numba')
+
+    simular()
+    assert set(chamados) == {'rk4_sird_celulas_jit'}
+    chamados.clear()
+    _em_outra_thread(simular)
+    assert set(chamados) == {'rk4_sird_celulas_sequencial_jit'}
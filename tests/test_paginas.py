@@ -0,0 +1,29 @@
+"""
+Execução das páginas SIR e SIRD com as faixas de incerteza ligadas, pelo AppTest do Streamlit
+
+As páginas rodam fora da thread principal; se usassem os núcleos paralelos do Numba, o processo
+do pytest não encerraria ao final (ver em_thread_principal).
+"""
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip('streamlit.testing.v1')
+from streamlit.testing.v1 import AppTest
+
+
+PRINCIPAL = str(Path(__file__).resolve().parents[1] / 'main.py')
+
+
+@pytest.mark.parametrize('modelo', ['SIR', 'SIRD'])
+@pytest.mark.parametrize('modo', ['Interativo', 'Imagem'])
+def test_faixas_de_incerteza(modelo, modo):
+    app = AppTest.from_file(PRINCIPAL, default_timeout=120)
+    app.run()
+    app.selectbox[0].select(modelo).run()
+    radio = app.sidebar.radio[0]
+    radio.set_value(next(opcao for opcao in radio.options if opcao.startswith(modo))).run()
+
+    caixa = next(caixa for caixa in app.sidebar.checkbox if caixa.label.startswith('Mostrar faixa'))
+    caixa.check().run()
+    assert not app.exception
@@ -0,0 +1,61 @@
+"""
+Índices de Sobol e de Morris: reprodutibilidade e bootstrap
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from simulacao import indices_morris, indices_sobol
+from simulacao import sensibilidade_global
+
+
+LIMITES = {'beta': (0.1, 0.5), 'gamma': (0.05, 0.2), 'mu': (0.0, 0.05)}
+FIXOS = {'N': 10_000, 'I0': 10}
+OPCOES = {'fixos': FIXOS, 'reamostragens': 200, 'semente': 3, 'backend': 'numpy'}
+
+
+def test_sobol_reprodutivel_e_independente_do_agrupamento_do_bootstrap(monkeypatch):
+    inteiro = indices_sobol('SIRD', LIMITES, 60, n=128, **OPCOES)
+    # Grupos de poucas reamostragens: o sorteio e os intervalos não podem mudar
+    monkeypatch.setattr(sensibilidade_global, 'ELEMENTOS_BOOTSTRAP', 1_000)
+    agrupado = indices_sobol('SIRD', LIMITES, 60, n=128, **OPCOES)
+    for indicador, tabela in inteiro.items():
+        pd.testing.assert_frame_equal(agrupado[indicador], tabela)
+
+
+def test_sobol_intervalos_contem_as_estimativas():
+    tabela = indices_sobol('SIRD', LIMITES, 60, n=256, **OPCOES)['total_mortos']
+    assert list(tabela.columns) == ['S1', 'S1_inf', 'S1_sup', 'ST', 'ST_inf', 'ST_sup']
+    assert ((tabela['ST_inf'] <= tabela['ST']) & (tabela['ST'] <= tabela['ST_sup'])).all()
+
+
+def test_bootstrap_usa_sequencia_independente_das_amostras():
+    # O sorteio das amostras usa default_rng(semente); o bootstrap não pode repetir essa sequência
+    amostras = np.random.default_rng(3).integers(0, 100, size=1_000)
+    bootstrap = np.random.default_rng(sensibilidade_global._sementes_bootstrap(3)).integers(0, 100, size=1_000)
+    assert not np.array_equal(amostras, bootstrap)
+    reproduzido = np.random.default_rng(sensibilidade_global._sementes_bootstrap(3)).integers(0, 100, size=1_000)
+    np.testing.assert_array_equal(bootstrap, reproduzido)
+
+
+def test_morris_reprodutivel():
+    primeira = indices_morris('SIRD', LIMITES, 60, trajetorias=20, **OPCOES)
+    segunda = indices_morris('SIRD', LIMITES, 60, trajetorias=20, **OPCOES)
+    for indicador, tabela in primeira.items():
+        pd.testing.assert_frame_equal(segunda[indicador], tabela)
+        assert (tabela['mu_estrela_inf'] <= tabela['mu_estrela_sup']).all()
+
+
+@pytest.mark.parametrize('funcao', [indices_sobol, indices_morris])
+def test_semente_diferente_muda_o_resultado(funcao):
+    tamanho = {'n': 64} if funcao is indices_sobol else {'trajetorias': 10}
+    a = funcao('SIRD', LIMITES, 30, **tamanho, **{**OPCOES, 'semente': 1})
+    b = funcao('SIRD', LIMITES, 30, **tamanho, **{**OPCOES, 'semente': 2})
+    assert not a['pico_infectados'].equals(b['pico_infectados'])
+
+
+def test_processos_dao_o_mesmo_resultado():
+    um = indices_sobol('SIRD', LIMITES, 30, n=64, tamanho_bloco=100, **OPCOES)
+    dois = indices_sobol('SIRD', LIMITES, 30, n=64, tamanho_bloco=100, processos=2, **OPCOES)
+    for indicador, tabela in um.items():
+        pd.testing.assert_frame_equal(dois[indicador], tabela)
@@ -0,0 +1,111 @@
+"""
+Validação das requisições e tratamento de trajetórias divergentes no serviço HTTP
+"""
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+pytest.importorskip('starlette')
+
+import servico
+from simulacao import CacheResultados
+
+
+SIR = {'N': 10_000, 'I0': 10, 'beta': 0.3, 'gamma': 0.1}
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    # Cache isolado em memória, para que um teste não enxergue os resultados dos demais
+    cache = CacheResultados(capacidade=64)
+    monkeypatch.setattr(servico, 'cache_simulacoes', cache)
+    return cache
+
+
+def _requisitar(modelo, corpo):
+    """
+    Envia um POST /simulacoes/{modelo} diretamente à aplicação ASGI, sem o ciclo de vida
+
+    Retorna:
+    Tupla (status, corpo da resposta decodificado)
+    """
+    mensagens = [{'type': 'http.request', 'body': json.dumps(corpo).encode(), 'more_body': False}]
+    enviadas = []
+
+    async def receber():
+        return mensagens.pop(0)
+
+    async def enviar(mensagem):
+        enviadas.append(mensagem)
+
+    async def executar():
+        with ThreadPoolExecutor(1) as executor:
+            servico.app.state.agrupador = servico.AgrupadorLotes(executor)
+            escopo = {'type': 'http', 'method': 'POST', 'path': f'/simulacoes/{modelo}', 'raw_path': b'',
+                      'root_path': '', 'scheme': 'http', 'query_string': b'', 'headers': [],
+                      'server': ('teste', 80), 'client': ('teste', 1), 'http_version': '1.1', 'app': servico.app}
+            await servico.app(escopo, receber, enviar)
+
+    asyncio.run(executar())
+    status = enviadas[0]['status']
+    return status, json.loads(b''.join(m.get('body', b'') for m in enviadas[1:]))
+
+
+@pytest.mark.parametrize('alteracao', [
+    {'N': 0, 'I0': 0},
+    {'N': -5},
+    {'N': 1e20},
+    {'I0': 20_000},
+    {'beta': -0.1},
+    {'beta': 50},
+    {'beta': 1e308},
+])
+def test_parametros_fora_dos_limites_sao_rejeitados(alteracao):
+    with pytest.raises(ValueError):
+        servico.validar_requisicao('SIR', {'dias': 30, 'parametros': {**SIR, **alteracao}})
+
+
+def test_infectados_iniciais_comparados_com_a_propria_populacao():
+    parametros = {'N_A': 100, 'I0_A': 1, 'beta_A': 0.3, 'gamma_A': 0.1, 'mu_A': 0.01,
+                  'N_B': 100, 'I0_B': 101, 'beta_B': 0.3, 'gamma_B': 0.1, 'mu_B': 0.01, 'k_AB': 0.1, 'k_BA': 0.1}
+    with pytest.raises(ValueError, match='I0_B'):
+        servico.validar_requisicao('SIRD_duplo', {'dias': 10, 'parametros': parametros})
+
+
+def test_requisicao_fora_dos_limites_responde_422(cache):
+    status, corpo = _requisitar('SIR', {'dias': 30, 'parametros': {**SIR, 'beta': 1e308}})
+    assert status == 422
+    assert 'beta' in corpo['erro']
+
+
+def test_requisicao_valida_integra_em_lote_e_guarda_no_cache(cache):
+    status, corpo = _requisitar('SIR', {'dias': 30, 'parametros': SIR})
+    assert status == 200
+    assert corpo['origem'] == 'lote'
+    assert len(corpo['compartimentos']['I']) == 31
+
+    status, corpo = _requisitar('SIR', {'dias': 30, 'parametros': SIR})
+    assert corpo['origem'] == 'cache'
+
+
+def test_trajetoria_divergente_nao_e_devolvida_nem_guardada(cache):
+    # Parâmetros que a validação recusaria, passados direto ao agrupador: o Runge-Kutta diverge
+    divergente = {**{nome: float(valor) for nome, valor in SIR.items()}, 'beta': 50.0}
+    valida = {nome: float(valor) for nome, valor in SIR.items()}
+
+    async def executar():
+        with ThreadPoolExecutor(1) as executor:
+            agrupador = servico.AgrupadorLotes(executor)
+            futuros = [agrupador.simular('SIR', 30, divergente), agrupador.simular('SIR', 30, valida)]
+            resultados = await asyncio.gather(*futuros, return_exceptions=True)
+            await asyncio.gather(*agrupador._tarefas)
+            return resultados
+
+    erro, trajetoria = asyncio.run(executar())
+    assert isinstance(erro, ValueError)
+    assert np.isfinite(trajetoria).all()
+    assert cache.consultar(servico.chave_lote('SIR', 30, divergente)) is None
+    assert cache.consultar(servico.chave_lote('SIR', 30, valida)) is not None
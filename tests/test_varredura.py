@@ -0,0 +1,90 @@
+"""
+Varreduras em blocos: manifesto, retomada e leitura dos blocos gravados
+"""
+import json
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from simulacao import executar_varredura, ler_blocos, simular_sird_lote
+from simulacao.varredura import ARQUIVO_MANIFESTO
+
+
+GRADE = {'beta': np.linspace(0.1, 0.5, 5), 'gamma': np.linspace(0.05, 0.2, 4)}
+FIXOS = {'N': np.int64(10_000), 'I0': np.int64(10), 'mu': np.float64(0.01)}
+
+
+def _varrer(diretorio, progresso=None, **opcoes):
+    argumentos = {'fixos': FIXOS, 'tamanho_bloco': 6, 'processos': 1, 'backend': 'numpy', **opcoes}
+    return executar_varredura('SIRD', GRADE, 30, diretorio, progresso=progresso, **argumentos)
+
+
+def test_manifesto_aceita_escalares_do_numpy(tmp_path):
+    caminhos = _varrer(tmp_path)
+    assert len(caminhos) == 4
+    manifesto = json.loads((tmp_path / ARQUIVO_MANIFESTO).read_text(encoding='utf-8'))
+    assert manifesto['fixos'] == {'N': 10_000, 'I0': 10, 'mu': 0.01}
+
+
+def test_blocos_reproduzem_a_simulacao_em_lote(tmp_path):
+    _varrer(tmp_path)
+    blocos = list(ler_blocos(tmp_path))
+    resultado = np.concatenate([bloco['resultado'] for bloco in blocos])
+    beta, gamma = (eixo.ravel() for eixo in np.meshgrid(*GRADE.values(), indexing='ij'))
+    _, esperado = simular_sird_lote(beta, gamma, 0.01, 10_000, 10, dias=30, backend='numpy')
+    np.testing.assert_allclose(resultado, esperado)
+    np.testing.assert_array_equal(np.concatenate([bloco['indice'] for bloco in blocos]), np.arange(20))
+
+
+def test_retomada_integra_apenas_os_blocos_pendentes(tmp_path):
+    caminhos = _varrer(tmp_path)
+    gravados = {caminho: (tmp_path / caminho).stat().st_mtime_ns for caminho in caminhos}
+    (tmp_path / caminhos[2]).unlink()
+
+    chamadas = []
+    _varrer(tmp_path, progresso=lambda *args: chamadas.append(args))
+    # Uma chamada ao retomar (3 de 4 blocos prontos) e outra quando o bloco que faltava termina
+    assert [(concluidos, total) for concluidos, total, _, _ in chamadas] == [(3, 4), (4, 4)]
+    assert chamadas[0][3] is None
+    for caminho in caminhos:
+        if caminho != caminhos[2]:
+            assert (tmp_path / caminho).stat().st_mtime_ns == gravados[caminho]
+    assert (tmp_path / caminhos[2]).exists()
+
+
+def test_retomada_com_outra_configuracao_e_recusada(tmp_path):
+    _varrer(tmp_path)
+    with pytest.raises(ValueError, match='outra configuração'):
+        _varrer(tmp_path, fixos={**FIXOS, 'mu': 0.02})
+
+
+def test_diretorio_parquet_lido_inteiro(tmp_path):
+    pytest.importorskip('pyarrow')
+    _varrer(tmp_path, formato='parquet')
+    tabela = pd.read_parquet(tmp_path)
+    assert len(tabela) == 20 * 31
+    assert sorted(tabela['indice'].unique()) == list(range(20))
+
+
+def test_encerra_depois_dos_nucleos_paralelos(tmp_path):
+    # Núcleo paralelo do Numba na thread principal antes da varredura: com processos copiados por
+    # fork, o interpretador travava ao encerrar
+    script = textwrap.dedent(f"""
+        import sys
+        sys.path.insert(0, {str(Path(__file__).resolve().parents[1])!r})
+        import numpy as np
+        from simulacao import executar_varredura, simular_sir_lote
+
+        if __name__ == '__main__':
+            simular_sir_lote(np.linspace(0.1, 0.5, 8), 0.1, 10_000, 10, dias=10)
+            executar_varredura('SIR', {{'beta': [0.2, 0.3]}}, 10, {str(tmp_path / 'varredura')!r},
+                               fixos={{'gamma': 0.1, 'N': 10_000, 'I0': 10}}, processos=1)
+    """)
+    (tmp_path / 'script.py').write_text(script, encoding='utf-8')
+    processo = subprocess.run([sys.executable, str(tmp_path / 'script.py')], timeout=120, capture_output=True)
+    assert processo.returncode == 0, processo.stderr.decode()